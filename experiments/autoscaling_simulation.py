@@ -0,0 +1,117 @@
+import sys
+import os
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.autoscaler import AutoScaler, PredictivePolicy
+
+class SimulatedLimiter:
+    """内存中的资源限制器，下发立即生效"""
+    def __init__(self):
+        self.limits = {}
+
+    def get_resource_limits(self, workload_id):
+        return self.limits.get(workload_id)
+
+    def apply_limits(self, workload_id, limits):
+        self.limits[workload_id] = dict(limits)
+        return True
+
+    def apply_limits_many(self, limits_by_workload):
+        for workload_id, limits in limits_by_workload.items():
+            self.limits[workload_id] = dict(limits)
+        return {
+            workload_id: {'success': True, 'skipped': False, 'latency': 0.0}
+            for workload_id in limits_by_workload
+        }
+
+def generate_demand(n_workloads, n_steps, step_at, rng):
+    """生成需求轨迹：平稳噪声、step_at 时刻阶跃变化，部分工作负载附加线性增长
+
+    返回 (n_steps, n_workloads, 2)，最后一维为 cpu 核数和内存 MB
+    """
+    base = rng.uniform(0.5, 2.0, size=(n_workloads, 1)) * np.array([1.0, 512.0])
+    jump = rng.choice([0.4, 2.0, 3.0], size=(n_workloads, 1))  # 需求下降或上升
+    ramp = rng.uniform(0, 0.01, size=(n_workloads, 1)) * (rng.random((n_workloads, 1)) < 0.3)
+
+    t = np.arange(n_steps)[:, None, None]
+    level = base[None] * np.where(t >= step_at, jump[None], 1.0)
+    level = level * (1 + ramp[None] * np.maximum(t - step_at, 0))
+    noise = rng.normal(1.0, 0.05, size=(n_steps, n_workloads, 2))
+    return np.maximum(level * noise, 1e-3)
+
+def simulate(policy, demand, initial_limits, step_seconds=30, cooldown=60, step_at=0,
+             band=(0.2, 0.85)):
+    """运行一次扩缩容仿真
+
+    每步按当前限制计算使用率（需求超过限制时被截断为 100%），交给 AutoScaler.scale_fleet 决策；
+    SLA 违约为需求超过限制的工作负载-步数；收敛时间为阶跃后首次进入并保持在利用率区间内的时间
+    """
+    n_steps, n_workloads, _ = demand.shape
+    ids = [f'w{i}' for i in range(n_workloads)]
+    limiter = SimulatedLimiter()
+    for i, workload_id in enumerate(ids):
+        limiter.limits[workload_id] = {'cpu': initial_limits[i, 0], 'memory': initial_limits[i, 1]}
+
+    clock = [0.0]
+    scaler = AutoScaler(limiter, clock=lambda: clock[0], policy=policy)
+    scaler.scale_cooldown = cooldown
+
+    violations = 0
+    in_band = np.zeros((n_steps, n_workloads), dtype=bool)
+    overprovision = []
+    actions = 0
+    for step in range(n_steps):
+        limits = np.array([[limiter.limits[w]['cpu'], limiter.limits[w]['memory']] for w in ids])
+        utilization = np.minimum(demand[step] / limits, 1.0)
+        violations += int((demand[step] > limits).any(axis=1).sum())
+        in_band[step] = ((utilization >= band[0]) & (utilization <= band[1])).all(axis=1)
+        overprovision.append(np.mean(limits / demand[step]))
+
+        results = scaler.scale_fleet(ids, utilization * 100, current_limits=limits, now=clock[0])
+        actions += len(results)
+        clock[0] += step_seconds
+
+    # 阶跃后首次进入区间且之后 90% 的时间保持在区间内
+    convergence = []
+    for i in range(n_workloads):
+        after = in_band[step_at:, i]
+        converged_at = None
+        for k in range(len(after)):
+            if after[k] and after[k:].mean() >= 0.9:
+                converged_at = k
+                break
+        convergence.append((converged_at if converged_at is not None else len(after)) * step_seconds)
+
+    return {
+        'sla_violation_rate': violations / (n_steps * n_workloads),
+        'mean_convergence_seconds': float(np.mean(convergence)),
+        'p95_convergence_seconds': float(np.percentile(convergence, 95)),
+        'scale_actions': actions,
+        'mean_overprovision': float(np.mean(overprovision))
+    }
+
+def run_simulation(n_workloads=500, n_steps=240, step_at=40, seed=0):
+    """对比阈值策略和预测式策略"""
+    rng = np.random.default_rng(seed)
+    demand = generate_demand(n_workloads, n_steps, step_at, rng)
+    # 初始限制按阶跃前需求的 1/0.6 配置
+    initial_limits = demand[0] / 0.6
+    return {
+        'threshold': simulate(None, demand, initial_limits, step_at=step_at),
+        'predictive': simulate(PredictivePolicy(), demand, initial_limits, step_at=step_at)
+    }
+
+if __name__ == "__main__":
+    results = run_simulation()
+
+    print("\n扩缩容策略仿真对比:")
+    print("=" * 50)
+    for name, result in results.items():
+        print(f"{name}: SLA违约率 {result['sla_violation_rate']:.2%}, "
+              f"平均收敛 {result['mean_convergence_seconds']:.0f}秒, "
+              f"P95收敛 {result['p95_convergence_seconds']:.0f}秒, "
+              f"调整次数 {result['scale_actions']}, "
+              f"平均超配 {result['mean_overprovision']:.2f}倍")
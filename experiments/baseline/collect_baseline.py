@@ -1,5 +1,6 @@
 import sys
 import json
+import argparse
 from datetime import datetime
 
 # 添加项目根目录到 Python 路径
@@ -8,12 +9,24 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 # 修改导入语句
 from src.resource.allocator import ResourceAllocator
+from src.resource.clock import SimulatedClock
 from src.analysis.performance_analyzer import PerformanceAnalyzer
 
-def collect_baseline_data(duration=3600):  # 1小时测试
-    """收集基准性能数据"""
+DEFAULT_SEED = 0
+
+def collect_baseline_data(duration=3600, simulated=False, seed=None, start=None):  # 1小时测试
+    """收集基准性能数据
+
+    simulated=True 时使用虚拟时钟，一小时的样本在毫秒级内生成；
+    未指定 seed 时使用 DEFAULT_SEED，未指定 start 时使用固定起始时间，多次运行结果一致
+    """
     # 初始化资源分配器（使用默认配置）
-    allocator = ResourceAllocator()
+    clock = None
+    if simulated:
+        clock = SimulatedClock(start=start)
+        seed = DEFAULT_SEED if seed is None else seed
+    collected_at = clock.now() if clock else datetime.now()
+    allocator = ResourceAllocator(clock=clock, seed=seed)
     analyzer = PerformanceAnalyzer()
     
     # 运行测试并收集数据
@@ -22,7 +35,7 @@ def collect_baseline_data(duration=3600):  # 1小时测试
     
     # 格式化基准数据
     baseline_data = {
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'timestamp': collected_at.strftime('%Y-%m-%d %H:%M:%S'),
         'metrics': {
             'latency': {
                 'avg': results['latency']['avg_latency'],
@@ -59,5 +72,11 @@ def collect_baseline_data(duration=3600):  # 1小时测试
     return baseline_data
 
 if __name__ == "__main__":
-    baseline_data = collect_baseline_data()
+    parser = argparse.ArgumentParser(description='收集基准性能数据')
+    parser.add_argument('--simulated', action='store_true', help='使用虚拟时钟')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子，虚拟时钟模式默认为 0')
+    parser.add_argument('--start', type=datetime.fromisoformat, default=None,
+                        help='虚拟时钟起始时间（ISO 格式），默认 2025-01-01')
+    args = parser.parse_args()
+    baseline_data = collect_baseline_data(simulated=args.simulated, seed=args.seed, start=args.start)
     print("基准数据收集完成，已保存到 baseline_metrics.json")
\ No newline at end of file
@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import heapq
+import random
+from datetime import datetime
+
+# 添加项目根目录到 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.priority_queue import WorkloadPriorityQueue
+
+class LegacyPriorityQueue:
+    """改造前的实现：只支持入队和出队，取消需要重建堆"""
+    def __init__(self):
+        self.queue = []
+        self.priority_levels = {'high': 3, 'normal': 2, 'low': 1}
+        
+    def enqueue(self, workload_id, priority, requirements):
+        priority_value = self.priority_levels.get(priority, 1)
+        timestamp = datetime.now().timestamp()
+        heapq.heappush(self.queue, (-priority_value, timestamp, workload_id, requirements))
+        return True
+        
+    def dequeue(self):
+        if not self.queue:
+            return None
+        _, _, workload_id, requirements = heapq.heappop(self.queue)
+        return workload_id, requirements
+        
+    def remove(self, workload_id):
+        self.queue = [entry for entry in self.queue if entry[2] != workload_id]
+        heapq.heapify(self.queue)
+        return True
+        
+    def update_priority(self, workload_id, priority):
+        for entry in self.queue:
+            if entry[2] == workload_id:
+                self.remove(workload_id)
+                return self.enqueue(workload_id, priority, entry[3])
+        return False
+
+def run_case(queue_class, n, n_changes, bulk=False):
+    """入队 n 个工作负载，执行 n_changes 次取消/调整后全部出队"""
+    rng = random.Random(0)
+    priorities = ['high', 'normal', 'low']
+    items = [(f'w{i}', rng.choice(priorities), {'cpu': 1}) for i in range(n)]
+    queue = queue_class()
+    
+    start = time.perf_counter()
+    if bulk and hasattr(queue, 'bulk_enqueue'):
+        queue.bulk_enqueue(items)
+    else:
+        for item in items:
+            queue.enqueue(*item)
+    enqueue_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for i in range(n_changes):
+        workload_id = f'w{rng.randrange(n)}'
+        if i % 2:
+            queue.remove(workload_id)
+        else:
+            queue.update_priority(workload_id, rng.choice(priorities))
+    change_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    while queue.dequeue() is not None:
+        pass
+    dequeue_time = time.perf_counter() - start
+    
+    return {
+        'enqueue_ops_per_sec': n / enqueue_time,
+        'change_ops_per_sec': n_changes / change_time if n_changes else 0,
+        'dequeue_seconds': dequeue_time
+    }
+
+def run_benchmark(n=100000, n_changes=200):
+    """对比改造前后的吞吐量"""
+    return {
+        'legacy': run_case(LegacyPriorityQueue, n, n_changes),
+        'indexed': run_case(WorkloadPriorityQueue, n, n_changes),
+        'indexed_bulk': run_case(WorkloadPriorityQueue, n, n_changes, bulk=True)
+    }
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    results = run_benchmark(n)
+    
+    print(f"\n{n} 个工作负载的队列吞吐量:")
+    print("=" * 50)
+    for name, result in results.items():
+        print(f"{name}: 入队 {result['enqueue_ops_per_sec']:.0f} 次/秒, "
+              f"取消/调整 {result['change_ops_per_sec']:.0f} 次/秒, "
+              f"全部出队 {result['dequeue_seconds']:.2f}秒")
@@ -0,0 +1,79 @@
+import sys
+import os
+import time
+import heapq
+import random
+
+# 添加项目根目录到 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.timing_wheel import TimingWheel
+
+class HeapDelayQueue:
+    """对照实现：按到期时间排序的二叉堆，取消需要线性查找"""
+    def __init__(self):
+        self.queue = []
+
+    def schedule(self, item_id, when, payload=None):
+        heapq.heappush(self.queue, (when, item_id, payload))
+
+    def cancel(self, item_id):
+        self.queue = [entry for entry in self.queue if entry[1] != item_id]
+        heapq.heapify(self.queue)
+        return True
+
+    def advance(self, now):
+        due = []
+        while self.queue and self.queue[0][0] <= now:
+            when, item_id, payload = heapq.heappop(self.queue)
+            due.append((item_id, payload))
+        return due
+
+def run_case(make_queue, n, n_cancels, horizon=3600.0, step=0.5):
+    """插入 n 个延迟条目，取消 n_cancels 个，再按 step 推进直到全部到期"""
+    rng = random.Random(0)
+    deadlines = [rng.uniform(0, horizon) for _ in range(n)]
+    queue = make_queue()
+
+    start = time.perf_counter()
+    for i, when in enumerate(deadlines):
+        queue.schedule(i, when)
+    insert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n_cancels):
+        queue.cancel(rng.randrange(n))
+    cancel_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fired = 0
+    now = 0.0
+    while now <= horizon + step:
+        fired += len(queue.advance(now))
+        now += step
+    expire_time = time.perf_counter() - start
+
+    return {
+        'insert_ops_per_sec': n / insert_time,
+        'cancel_ops_per_sec': n_cancels / cancel_time if n_cancels else 0,
+        'expire_seconds': expire_time,
+        'fired': fired
+    }
+
+def run_benchmark(n=300000, n_cancels=200):
+    """对比时间轮与二叉堆"""
+    return {
+        'heap': run_case(HeapDelayQueue, n, n_cancels),
+        'timing_wheel': run_case(lambda: TimingWheel(tick=0.1), n, n_cancels)
+    }
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    results = run_benchmark(n)
+
+    print(f"\n{n} 个延迟条目的处理吞吐量:")
+    print("=" * 50)
+    for name, result in results.items():
+        print(f"{name}: 插入 {result['insert_ops_per_sec']:.0f} 次/秒, "
+              f"取消 {result['cancel_ops_per_sec']:.0f} 次/秒, "
+              f"全部到期 {result['expire_seconds']:.2f}秒 ({result['fired']} 个)")
@@ -0,0 +1,78 @@
+import sys
+import os
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+# 添加项目根目录到 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.workload_manager import WorkloadManager
+
+def build_legacy_workloads(n):
+    """按原有嵌套字典结构构建工作负载"""
+    workloads = {}
+    workload_states = {}
+    for i in range(n):
+        workload_id = f'workload-{i}'
+        workloads[workload_id] = {
+            'id': workload_id,
+            'requirements': {'cpu': 2, 'memory': 4096},
+            'created_at': datetime.now(),
+            'status': 'pending',
+            'retries': 0,
+            'priority': 'normal',
+            'metrics': {
+                'cpu_usage': [],
+                'memory_usage': [],
+                'execution_time': 0
+            }
+        }
+        workload_states[workload_id] = {
+            'state': 'pending',
+            'message': None,
+            'updated_at': datetime.now()
+        }
+    return workloads, workload_states
+
+def build_compact_workloads(n):
+    """使用 WorkloadManager 的紧凑记录构建工作负载"""
+    manager = WorkloadManager()
+    for i in range(n):
+        workload_id = f'workload-{i}'
+        manager.create_workload(workload_id, {'cpu': 2, 'memory': 4096})
+        manager.update_workload_state(workload_id, 'pending')
+    return manager
+
+def measure(builder, n):
+    """测量构建 n 个工作负载的内存占用与耗时"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = builder(n)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return current, elapsed
+
+def run_benchmark(n=1_000_000):
+    """对比两种存储结构"""
+    results = {}
+    for name, builder in [('legacy_dict', build_legacy_workloads), ('slotted_record', build_compact_workloads)]:
+        memory, elapsed = measure(builder, n)
+        results[name] = {'memory_mb': memory / 1024 / 1024, 'seconds': elapsed}
+    return results
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    results = run_benchmark(n)
+
+    print(f"\n{n} 个工作负载的内存占用:")
+    print("=" * 50)
+    for name, result in results.items():
+        print(f"{name}: {result['memory_mb']:.1f}MB, 构建耗时 {result['seconds']:.2f}秒")
+    saving = 1 - results['slotted_record']['memory_mb'] / results['legacy_dict']['memory_mb']
+    print(f"内存节省: {saving * 100:.1f}%")
@@ -0,0 +1,94 @@
+import math
+
+class P2Quantile:
+    """P² 流式分位数估计
+
+    只保存5个标记点，每次更新 O(1)，不保留原始样本
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        """加入一个样本"""
+        x = float(x)
+        self.count += 1
+        if self.count <= 5:
+            self.heights.append(x)
+            self.heights.sort()
+            return
+
+        q = self.heights
+        n = self.positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # 调整中间三个标记点
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = candidate
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        """抛物线插值"""
+        q = self.heights
+        n = self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        """当前分位数估计"""
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            # 样本不足时直接在已排序样本上线性插值
+            rank = self.p * (len(self.heights) - 1)
+            lower = math.floor(rank)
+            upper = min(lower + 1, len(self.heights) - 1)
+            return self.heights[lower] + (rank - lower) * (self.heights[upper] - self.heights[lower])
+        return self.heights[2]
+
+    def get_state(self):
+        """导出可序列化状态"""
+        return {
+            'p': self.p,
+            'count': self.count,
+            'heights': list(self.heights),
+            'positions': list(self.positions),
+            'desired': list(self.desired)
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """从序列化状态恢复"""
+        sketch = cls(state['p'])
+        sketch.count = state['count']
+        sketch.heights = list(state['heights'])
+        sketch.positions = list(state['positions'])
+        sketch.desired = list(state['desired'])
+        return sketch
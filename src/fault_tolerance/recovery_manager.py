@@ -1,32 +1,76 @@
+import logging
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
+from ..workload.timing_wheel import TimingWheel
 
 class RecoveryManager:
-    def __init__(self):
+    def __init__(self, clock=time.monotonic, on_complete=None):
         self.recovery_pool = ThreadPoolExecutor(max_workers=4)
         self.backup_resources = {}
         self.recovery_timeout = 30  # 秒
         self.max_retries = 3
+        self.clock = clock
+        # 退避中的恢复任务放入时间轮，不阻塞调用线程；WorkloadMonitor 每个周期执行到期的重试
+        self.retry_queue = TimingWheel(tick=0.1, start=clock())
+        self.pending_retries = {}  # 资源ID -> (工作负载, 已尝试次数)
+        self.on_complete = on_complete  # 恢复结束时调用 on_complete(资源ID, 是否恢复成功)
+        self._lock = threading.Lock()  # 只保护重试状态，恢复过程不持有锁
+        self.logger = logging.getLogger(__name__)
         
     def handle_failure(self, resource_id, workload):
-        """处理资源故障"""
-        for attempt in range(self.max_retries):
-            try:
-                # 并行执行恢复任务
-                recovery_future = self.recovery_pool.submit(
-                    self._recover_resource, resource_id, workload
-                )
-                
-                # 等待恢复完成
-                result = recovery_future.result(timeout=self.recovery_timeout)
-                if result:
-                    return True
-                    
-            except Exception as e:
-                print(f"恢复尝试 {attempt + 1} 失败: {e}")
-                time.sleep(2 ** attempt)  # 指数退避
-                
-        return False
+        """处理资源故障
+
+        恢复成功返回 True；失败时按指数退避安排重试并立即返回 False，最终结果通过 on_complete 通知
+        """
+        with self._lock:
+            self.retry_queue.cancel(resource_id)
+            entry = self.pending_retries[resource_id] = (workload, 0)
+        return self._run_attempt(resource_id, entry)
+
+    def process_due_retries(self, now=None):
+        """执行已到期的恢复重试，返回 {资源ID: 是否恢复成功}"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            due = [
+                (resource_id, self.pending_retries[resource_id])
+                for resource_id, _ in self.retry_queue.advance(now)
+                if resource_id in self.pending_retries
+            ]
+        return {resource_id: self._run_attempt(resource_id, entry) for resource_id, entry in due}
+
+    def is_recovering(self, resource_id):
+        """资源是否仍在等待重试"""
+        return resource_id in self.pending_retries
+
+    def _run_attempt(self, resource_id, entry):
+        """执行一次恢复尝试"""
+        workload, attempt = entry
+        success = False
+        try:
+            # 并行执行恢复任务
+            recovery_future = self.recovery_pool.submit(
+                self._recover_resource, resource_id, workload
+            )
+
+            # 等待恢复完成
+            success = bool(recovery_future.result(timeout=self.recovery_timeout))
+
+        except Exception as e:
+            self.logger.warning(f"资源 {resource_id} 恢复尝试 {attempt + 1} 失败: {e}")
+
+        with self._lock:
+            if self.pending_retries.get(resource_id) is not entry:
+                # 恢复期间资源再次故障，由新的恢复流程负责
+                return success
+            if not success and attempt + 1 < self.max_retries:
+                self.pending_retries[resource_id] = (workload, attempt + 1)
+                self.retry_queue.schedule(resource_id, self.clock() + 2 ** attempt)  # 指数退避
+                return False
+            del self.pending_retries[resource_id]
+        if self.on_complete:
+            self.on_complete(resource_id, success)
+        return success
         
     def _recover_resource(self, resource_id, workload):
         """执行资源恢复"""
@@ -64,7 +108,7 @@ class RecoveryManager:
             return True
             
         except Exception as e:
-            print(f"从备份恢复失败: {e}")
+            self.logger.error(f"从备份恢复失败: {e}")
             return False
             
     def _reallocate_resource(self, workload):
@@ -98,7 +142,7 @@ class RecoveryManager:
             return True
             
         except Exception as e:
-            print(f"资源重分配失败: {e}")
+            self.logger.error(f"资源重分配失败: {e}")
             return False
             
     def _validate_backup(self, backup):
@@ -0,0 +1,196 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+class CgroupReader:
+    """cgroup v2 工作负载指标读取器
+
+    直接读取每个工作负载 cgroup 目录下的 cpu.stat、memory.current、memory.stat、io.stat；
+    文件描述符按工作负载缓存，每次用 pread 从偏移 0 重新读取，无需重复打开；
+    缓存最多保留 max_open 个工作负载，超出时关闭最久未读取的工作负载的文件描述符。
+    CPU 使用率和 IO 速率由相邻两次读取的差值计算，CPU 使用率相对 cpu.max 配额
+    （未设置配额时为在线核数），100 表示用满上限
+    """
+
+    def __init__(self, root='/sys/fs/cgroup', path_template='system.slice/docker-{workload_id}.scope',
+                 memory_total=None, clock=time.monotonic, cpu_count=None, max_open=256):
+        self.root = root
+        self.path_template = path_template  # 工作负载ID到 cgroup 相对路径的映射
+        self.memory_total = memory_total or self._host_memory_total()
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.clock = clock
+        self.max_open = max_open  # 同时缓存文件描述符的工作负载数上限
+        self.paths = {}    # 工作负载ID -> cgroup 目录（显式注册的路径优先）
+        self._fds = OrderedDict()  # 工作负载ID -> {文件名: 文件描述符}，按最近读取排序
+        self._previous = {}  # 工作负载ID -> 上一次的累计计数器
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """配置 monitoring.metrics_source 为 cgroup 时创建，否则返回 None"""
+        if config.get('monitoring', {}).get('metrics_source', 'host') != 'cgroup':
+            return None
+        resources = config.get('resources', {})
+        return cls(
+            root=resources.get('cgroup_root', '/sys/fs/cgroup'),
+            path_template=resources.get('cgroup_path_template', 'system.slice/docker-{workload_id}.scope'),
+            **kwargs
+        )
+
+    def register(self, workload_id, path=None):
+        """登记工作负载的 cgroup 目录，path 为相对 root 的路径"""
+        self.release(workload_id)
+        relative = path if path is not None else self.path_template.format(workload_id=workload_id)
+        self.paths[workload_id] = os.path.join(self.root, relative)
+
+    def release(self, workload_id):
+        """关闭工作负载的文件描述符"""
+        self._close_fds(workload_id)
+        self._previous.pop(workload_id, None)
+
+    def unwatch(self, workload_id):
+        """工作负载结束后关闭文件描述符并清除登记的路径"""
+        self.release(workload_id)
+        self.paths.pop(workload_id, None)
+
+    def close(self):
+        """关闭全部文件描述符"""
+        for workload_id in list(self._fds):
+            self.release(workload_id)
+
+    def _close_fds(self, workload_id):
+        """只关闭文件描述符，保留计数器基线"""
+        for fd in self._fds.pop(workload_id, {}).values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def read(self, workload_id):
+        """读取单个工作负载的指标，cgroup 不存在时返回 None"""
+        if workload_id not in self.paths:
+            self.register(workload_id)
+        try:
+            cpu = self._parse_flat(self._read_file(workload_id, 'cpu.stat'))
+            memory_current = int(self._read_file(workload_id, 'memory.current'))
+            memory_stat = self._parse_flat(self._read_file(workload_id, 'memory.stat'))
+            memory_max = self._read_optional(workload_id, 'memory.max')
+            cpu_max = self._read_optional(workload_id, 'cpu.max')
+            io = self._parse_io(self._read_file(workload_id, 'io.stat'))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"读取工作负载 {workload_id} 的 cgroup 指标失败: {e}")
+            self.release(workload_id)
+            return None
+
+        now = self.clock()
+        limit = int(memory_max) if memory_max and memory_max != 'max' else self.memory_total
+        cpu_limit = self._cpu_limit(cpu_max)
+        metrics = {
+            'timestamp': datetime.now(),
+            'cpu_usage': 0.0,
+            'cpu_limit': cpu_limit,  # 核数
+            'cpu_usage_usec': cpu.get('usage_usec', 0),
+            'cpu_throttled_usec': cpu.get('throttled_usec', 0),
+            'memory_usage': memory_current / limit * 100 if limit else 0.0,
+            'memory_bytes': memory_current,
+            'memory_anon': memory_stat.get('anon', 0),
+            'memory_file': memory_stat.get('file', 0),
+            'io_read_bytes': io['rbytes'],
+            'io_write_bytes': io['wbytes'],
+            'io_read_rate': 0.0,   # 字节/秒
+            'io_write_rate': 0.0
+        }
+
+        previous = self._previous.get(workload_id)
+        self._previous[workload_id] = (now, metrics['cpu_usage_usec'], io['rbytes'], io['wbytes'])
+        if previous:
+            elapsed = now - previous[0]
+            if elapsed > 0:
+                # 100 表示用满 CPU 上限，与 memory_usage 同为相对上限的百分比
+                cores = max(metrics['cpu_usage_usec'] - previous[1], 0) / 1e6 / elapsed
+                metrics['cpu_usage'] = cores / cpu_limit * 100
+                metrics['io_read_rate'] = max(io['rbytes'] - previous[2], 0) / elapsed
+                metrics['io_write_rate'] = max(io['wbytes'] - previous[3], 0) / elapsed
+        return metrics
+
+    def has_baseline(self, workload_id):
+        """是否已有上一次的计数器，没有时本次读取的 CPU 使用率和速率为 0"""
+        return workload_id in self._previous
+
+    def read_many(self, workload_ids):
+        """批量读取，返回 {工作负载ID: 指标}，读取失败的工作负载不包含在结果中"""
+        results = {}
+        for workload_id in workload_ids:
+            metrics = self.read(workload_id)
+            if metrics is not None:
+                results[workload_id] = metrics
+        return results
+
+    def _cpu_limit(self, cpu_max):
+        """由 cpu.max（“配额 周期”）计算可用核数，未设置配额时为在线核数"""
+        if cpu_max:
+            parts = cpu_max.split()
+            if len(parts) == 2 and parts[0] != 'max' and int(parts[1]) > 0:
+                return int(parts[0]) / int(parts[1])
+        return self.cpu_count
+
+    def _read_file(self, workload_id, name):
+        """用缓存的文件描述符从偏移 0 读取整个文件"""
+        fds = self._fds.get(workload_id)
+        if fds is None:
+            # 超过上限时关闭最久未读取的工作负载的文件描述符，下次读取时重新打开
+            while len(self._fds) >= self.max_open:
+                self._close_fds(next(iter(self._fds)))
+            fds = self._fds[workload_id] = {}
+        else:
+            self._fds.move_to_end(workload_id)
+        fd = fds.get(name)
+        if fd is None:
+            fd = fds[name] = os.open(os.path.join(self.paths[workload_id], name), os.O_RDONLY)
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(fd, 65536, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+        return b''.join(chunks).decode()
+
+    def _read_optional(self, workload_id, name):
+        """读取可能不存在的文件（如根 cgroup 没有 memory.max）"""
+        try:
+            return self._read_file(workload_id, name).strip()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _parse_flat(text):
+        """解析 “键 值” 格式"""
+        values = {}
+        for line in text.splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                values[parts[0]] = int(parts[1])
+        return values
+
+    @staticmethod
+    def _parse_io(text):
+        """解析 io.stat，累加所有设备"""
+        totals = {'rbytes': 0, 'wbytes': 0, 'rios': 0, 'wios': 0}
+        for line in text.splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition('=')
+                if key in totals:
+                    totals[key] += int(value)
+        return totals
+
+    @staticmethod
+    def _host_memory_total():
+        """主机物理内存总量"""
+        try:
+            return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        except (ValueError, OSError, AttributeError):
+            return None
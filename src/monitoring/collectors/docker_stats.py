@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class DockerStatsStreamer:
+    """Docker 容器统计流
+
+    每个容器保持一个 stats(stream=True) 生成器，在线程池中持续解析并写入共享的最新值表；
+    流中断后按指数退避重连。docker 的流式接口是阻塞的，每个打开的流占用一个工作线程，
+    流数量达到 max_workers 后 watch 返回 False，调用方需要自行退回一次性查询
+    """
+
+    def __init__(self, docker_client=None, max_workers=256, reconnect_delay=1.0,
+                 max_reconnect_delay=30.0):
+        if docker_client is None:
+            import docker
+            # 连接池大小与工作线程数一致，避免流之间争抢连接
+            docker_client = docker.from_env(max_pool_size=max_workers)
+        self.docker_client = docker_client
+        self.max_workers = max_workers
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.latest = {}      # 容器ID -> 最近一次解析结果，整体替换
+        self.reconnects = {}  # 容器ID -> 重连次数
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='docker-stats')
+        self._watching = {}   # 容器ID -> 停止事件
+        self._streams = {}    # 容器ID -> 当前打开的流
+        self._refused = set()  # 因达到上限被拒绝的容器，只记录一次警告
+        self._lock = threading.Lock()  # 保护 latest、_watching 和 _streams
+
+    def watch(self, container_id):
+        """开始持续读取容器统计，已在读取或达到流数量上限时返回 False"""
+        with self._lock:
+            if container_id in self._watching:
+                return False
+            if len(self._watching) >= self.max_workers:
+                if container_id not in self._refused:
+                    self._refused.add(container_id)
+                    self.logger.warning(f"统计流数量已达上限 {self.max_workers}，不读取容器 {container_id}")
+                return False
+            self._refused.discard(container_id)
+            stop_event = threading.Event()
+            self._watching[container_id] = stop_event
+        self._executor.submit(self._stream, container_id, stop_event)
+        return True
+
+    def watch_many(self, container_ids):
+        """批量开始读取，返回成功数量"""
+        return sum(1 for container_id in container_ids if self.watch(container_id))
+
+    def unwatch(self, container_id):
+        """停止读取容器统计并关闭打开的流"""
+        with self._lock:
+            self._refused.discard(container_id)
+            stop_event = self._watching.pop(container_id, None)
+            if stop_event is None:
+                return False
+            stop_event.set()
+            stream = self._streams.pop(container_id, None)
+            self.latest.pop(container_id, None)
+        self._close(stream)
+        return True
+
+    def is_watching(self, container_id):
+        """容器是否正在读取"""
+        with self._lock:
+            return container_id in self._watching
+
+    def get_stats(self, container_id):
+        """读取容器最近一次统计，不阻塞"""
+        with self._lock:
+            return self.latest.get(container_id)
+
+    def get_all_stats(self):
+        """所有容器最近一次统计的副本"""
+        with self._lock:
+            return dict(self.latest)
+
+    def stop(self, wait=True):
+        """停止全部统计流"""
+        with self._lock:
+            events = list(self._watching.values())
+            streams = list(self._streams.values())
+            self._watching.clear()
+            self._streams.clear()
+            self._refused.clear()
+        for stop_event in events:
+            stop_event.set()
+        for stream in streams:
+            self._close(stream)
+        self._executor.shutdown(wait=wait)
+
+    def _stream(self, container_id, stop_event):
+        """单个容器的读取循环，中断后重连"""
+        delay = self.reconnect_delay
+        while not stop_event.is_set():
+            stream = None
+            try:
+                stream = self._open_stream(container_id)
+                with self._lock:
+                    if stop_event.is_set():
+                        break
+                    self._streams[container_id] = stream
+                for raw in stream:
+                    stats = self.parse_stats(raw)
+                    with self._lock:
+                        if stop_event.is_set():
+                            break
+                        self.latest[container_id] = stats
+                    delay = self.reconnect_delay  # 成功读到数据后重置退避
+                else:
+                    if not stop_event.is_set():
+                        raise ConnectionError('统计流已结束')
+            except Exception as e:
+                if stop_event.is_set():
+                    break
+                self.reconnects[container_id] = self.reconnects.get(container_id, 0) + 1
+                self.logger.warning(f"容器 {container_id} 统计流中断，{delay:.1f}秒后重连: {e}")
+                stop_event.wait(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            finally:
+                with self._lock:
+                    if self._streams.get(container_id) is stream:
+                        del self._streams[container_id]
+                self._close(stream)
+
+    def _open_stream(self, container_id):
+        """通过 docker SDK 公开接口 APIClient.stats 打开容器的统计流"""
+        return self.docker_client.api.stats(container_id, stream=True, decode=True)
+
+    @staticmethod
+    def _close(stream):
+        """关闭流；读取线程正在执行生成器时无法关闭，读取线程在下一条消息（约每秒一条）到达后
+        检查停止事件退出，并关闭生成器释放 HTTP 响应"""
+        close = getattr(stream, 'close', None)
+        if close:
+            try:
+                close()
+            except ValueError:
+                pass
+
+    @staticmethod
+    def parse_stats(raw):
+        """解析 Docker stats 响应"""
+        cpu_stats = raw.get('cpu_stats', {})
+        precpu_stats = raw.get('precpu_stats', {})
+        total_usage = cpu_stats.get('cpu_usage', {}).get('total_usage', 0)
+        cpu_delta = total_usage - precpu_stats.get('cpu_usage', {}).get('total_usage', 0)
+        system_delta = cpu_stats.get('system_cpu_usage', 0) - precpu_stats.get('system_cpu_usage', 0)
+        online_cpus = cpu_stats.get('online_cpus') or len(
+            cpu_stats.get('cpu_usage', {}).get('percpu_usage') or [1]
+        )
+        cpu_percent = cpu_delta / system_delta * online_cpus * 100 if system_delta > 0 and cpu_delta > 0 else 0.0
+
+        memory_stats = raw.get('memory_stats', {})
+        memory_usage = memory_stats.get('usage', 0)
+        memory_limit = memory_stats.get('limit', 0)
+        networks = raw.get('networks', {})
+
+        return {
+            'cpu_usage': total_usage,
+            'cpu_percent': cpu_percent,
+            'memory_usage': memory_usage,
+            'memory_percent': memory_usage / memory_limit * 100 if memory_limit else 0.0,
+            'network_io': networks,
+            'rx_bytes': sum(n.get('rx_bytes', 0) for n in networks.values()),
+            'tx_bytes': sum(n.get('tx_bytes', 0) for n in networks.values()),
+            'read_at': time.monotonic()
+        }
+
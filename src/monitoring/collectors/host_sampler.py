@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from datetime import datetime
+import psutil
+
+class HostSampler:
+    """主机指标采样器
+
+    后台线程按固定周期读取 CPU 时间、内存、磁盘和网络计数器，
+    使用率和速率由相邻两次计数器的差值计算；首次采样间隔 prime_delay 读取两次计数器，
+    第一份快照的 CPU 使用率即为有效值。快照整体替换，读取方无需加锁也不会阻塞
+    """
+
+    def __init__(self, interval=1.0, max_staleness=5.0, clock=time.monotonic, prime_delay=0.1):
+        self.interval = interval  # 采样周期（秒）
+        self.max_staleness = max_staleness  # 快照最大允许陈旧时间（秒）
+        self.prime_delay = prime_delay  # 首次采样两次读取之间的间隔（秒）
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._previous = None  # 上一次的原始计数器
+        self._snapshot = None
+        self._sample_lock = threading.Lock()  # 只串行化采样，读取不加锁
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        """读取一次计数器并刷新快照"""
+        with self._sample_lock:
+            if self._previous is None:
+                # 没有上一次计数器时先读取一次作为基线，避免第一份快照的 CPU 使用率为 0
+                self._previous = self._read_counters()
+                time.sleep(self.prime_delay)
+            counters = self._read_counters()
+            previous = self._previous
+            self._previous = counters
+            self._snapshot = self._build_snapshot(counters, previous)
+            return self._snapshot
+
+    def is_stale(self):
+        """检查快照是否超过陈旧上限"""
+        snapshot = self._snapshot
+        return snapshot is None or self.clock() - snapshot['sampled_at'] > self.max_staleness
+
+    def get_snapshot(self):
+        """获取最近一次快照，未启动或过期时同步刷新一次"""
+        if self.is_stale():
+            return self.sample()
+        return self._snapshot
+
+    def start(self):
+        """启动后台采样线程"""
+        if self._thread and self._thread.is_alive():
+            return False
+        self._stop_event.clear()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name='host-sampler', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        """停止后台采样线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """后台采样循环"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error(f"主机指标采样失败: {e}")
+
+    def _read_counters(self):
+        """读取原始计数器（均为非阻塞调用）"""
+        return {
+            'sampled_at': self.clock(),
+            'cpu_times': psutil.cpu_times(),
+            'memory': psutil.virtual_memory(),
+            'disk_usage': psutil.disk_usage('/').percent,
+            'disk_io': psutil.disk_io_counters(),
+            'net_io': psutil.net_io_counters()
+        }
+
+    def _build_snapshot(self, counters, previous):
+        """由当前和上一次计数器计算快照"""
+        snapshot = {
+            'timestamp': datetime.now(),
+            'sampled_at': counters['sampled_at'],
+            'cpu_usage': 0.0,
+            'memory_usage': counters['memory'].percent,
+            'disk_usage': counters['disk_usage'],
+            'io_counters': counters['disk_io'],
+            'disk_read_rate': 0.0,   # 字节/秒
+            'disk_write_rate': 0.0,
+            'net_sent_rate': 0.0,
+            'net_recv_rate': 0.0
+        }
+        if previous is None:
+            return snapshot
+
+        snapshot['cpu_usage'] = self._cpu_percent(previous['cpu_times'], counters['cpu_times'])
+        elapsed = counters['sampled_at'] - previous['sampled_at']
+        if elapsed > 0:
+            for key, source, field in (
+                ('disk_read_rate', 'disk_io', 'read_bytes'),
+                ('disk_write_rate', 'disk_io', 'write_bytes'),
+                ('net_sent_rate', 'net_io', 'bytes_sent'),
+                ('net_recv_rate', 'net_io', 'bytes_recv')
+            ):
+                if counters[source] is not None and previous[source] is not None:
+                    delta = getattr(counters[source], field) - getattr(previous[source], field)
+                    snapshot[key] = max(delta, 0) / elapsed
+        return snapshot
+
+    @staticmethod
+    def _cpu_percent(before, after):
+        """由两次 CPU 时间计算使用率"""
+        idle_fields = ('idle', 'iowait')
+        total = sum(after) - sum(before)
+        if total <= 0:
+            return 0.0
+        idle = sum(getattr(after, f, 0) - getattr(before, f, 0) for f in idle_fields)
+        return round(min(max((total - idle) / total, 0.0), 1.0) * 100, 1)
+
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+def get_host_sampler(interval=None):
+    """获取进程内共享的主机采样器，首次调用时启动后台线程（默认周期 1 秒）
+
+    共享采样器只有一个周期，之后传入不同的 interval 时抛出 ValueError
+    """
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = HostSampler(interval=interval or 1.0)
+            _shared_sampler.start()
+        elif interval is not None and interval != _shared_sampler.interval:
+            raise ValueError(
+                f"共享主机采样器的周期为 {_shared_sampler.interval} 秒，不能改为 {interval} 秒"
+            )
+        return _shared_sampler
@@ -1,9 +1,11 @@
 import psutil
 import time
 from datetime import datetime
+from .host_sampler import get_host_sampler
 
 class MetricsCollector:
-    def __init__(self):
+    def __init__(self, host_sampler=None):
+        self.host_sampler = host_sampler or get_host_sampler()
         self.metrics_cache = {}
         self.cache_duration = 60  # 缓存时间（秒）
         
@@ -32,12 +34,13 @@ class MetricsCollector:
         
     def _collect_latency(self):
         """收集延迟数据"""
-        return psutil.cpu_percent(interval=1)  # 使用CPU使用率作为延迟指标
+        # 使用CPU使用率作为延迟指标，读取共享采样器快照而不是阻塞采样1秒
+        return self.host_sampler.get_snapshot()['cpu_usage']
         
     def _collect_throughput(self):
         """收集吞吐量数据"""
-        net_io = psutil.net_io_counters()
-        return (net_io.bytes_sent + net_io.bytes_recv) / 1024  # KB/s
+        snapshot = self.host_sampler.get_snapshot()
+        return (snapshot['net_sent_rate'] + snapshot['net_recv_rate']) / 1024  # KB/s
         
     def _collect_resource_utilization(self):
         """收集资源利用率"""
@@ -47,4 +50,5 @@ class MetricsCollector:
     def _collect_recovery_time(self):
         """收集恢复时间"""
         # 模拟恢复时间数据
-        return 30 + (psutil.cpu_percent() / 100) * 10  # 基础恢复时间 + 负载影响
\ No newline at end of file
+        cpu_usage = self.host_sampler.get_snapshot()['cpu_usage']
+        return 30 + (cpu_usage / 100) * 10  # 基础恢复时间 + 负载影响
\ No newline at end of file
@@ -1,6 +1,9 @@
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from enum import Enum
+from ..workload.timing_wheel import TimingWheel
 
 class FailureType(Enum):
     RESOURCE_EXHAUSTED = "resource_exhausted"
@@ -8,58 +11,107 @@ class FailureType(Enum):
     NETWORK_ERROR = "network_error"
     
 class FailureHandler:
-    def __init__(self, config):
+    """故障处理器
+
+    恢复失败后不阻塞等待，而是把下一次尝试放入时间轮，
+    由 process_due_retries 在到期后继续执行（WorkloadMonitor 每个周期调用）；
+    重试用尽再尝试故障转移。恢复结束时通过 on_complete(工作负载ID, 结果) 通知调用方
+    """
+
+    def __init__(self, config, clock=time.monotonic, on_complete=None):
         self.logger = logging.getLogger(__name__)
         self.max_retries = config.get('max_retries', 3)
         self.retry_interval = config.get('retry_interval', 5)  # 秒
         self.failover_threshold = config.get('failover_threshold', 0.8)
+        self.clock = clock
+        self.retry_queue = TimingWheel(tick=config.get('retry_tick', 0.1), start=clock())
+        self.pending_recoveries = {}  # 工作负载ID -> 恢复进度
+        self.on_complete = on_complete
+        self._lock = threading.Lock()  # 调用方线程和监控周期线程都会推进恢复，只保护重试状态
         
     def handle_failure(self, workload_id, failure_type, context):
         """处理故障"""
         try:
-            # 记录故障开始时间
-            failure_start = datetime.now()
-            
-            # 尝试自动恢复
-            recovery_success = self._attempt_recovery(workload_id, failure_type, context)
-            
-            if not recovery_success:
-                # 如果自动恢复失败，尝试故障转移
-                recovery_success = self._attempt_failover(workload_id, context)
-                
-            recovery_time = datetime.now() - failure_start
-            
-            return {
-                'success': recovery_success,
-                'recovery_time': recovery_time.total_seconds(),
-                'actions_taken': context.get('actions', [])
-            }
-            
+            with self._lock:
+                self.retry_queue.cancel(workload_id)
+                state = self.pending_recoveries[workload_id] = {
+                    'failure_type': failure_type,
+                    'context': context,
+                    'attempt': 0,
+                    'failure_start': datetime.now()
+                }
+            return self._run_attempt(workload_id, state)
+
         except Exception as e:
             self.logger.error(f"故障处理失败: {e}")
             return {'success': False, 'error': str(e)}
-            
-    def _attempt_recovery(self, workload_id, failure_type, context):
+
+    def process_due_retries(self, now=None):
+        """执行已到期的恢复重试，返回 {工作负载ID: 处理结果}"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            due = [
+                (workload_id, self.pending_recoveries[workload_id])
+                for workload_id, _ in self.retry_queue.advance(now)
+                if workload_id in self.pending_recoveries
+            ]
+        return {workload_id: self._run_attempt(workload_id, state) for workload_id, state in due}
+
+    def cancel_recovery(self, workload_id):
+        """放弃尚未完成的恢复"""
+        with self._lock:
+            self.retry_queue.cancel(workload_id)
+            return self.pending_recoveries.pop(workload_id, None) is not None
+
+    def _run_attempt(self, workload_id, state):
+        """执行一次恢复尝试；失败且仍有次数时安排下一次重试
+
+        恢复、故障转移和 on_complete 回调都不持有锁，只有重试状态的读写在锁内
+        """
+        context = state['context']
+        attempt = state['attempt']
+        recovery_success = self._attempt_recovery(workload_id, state['failure_type'], context, attempt)
+        retry = not recovery_success and attempt + 1 < self.max_retries
+        if not recovery_success and not retry:
+            # 如果自动恢复失败，尝试故障转移
+            recovery_success = self._attempt_failover(workload_id, context)
+
+        result = {
+            'success': recovery_success,
+            'recovery_time': (datetime.now() - state['failure_start']).total_seconds(),
+            'actions_taken': context.get('actions', [])
+        }
+        with self._lock:
+            if self.pending_recoveries.get(workload_id) is not state:
+                # 恢复期间被取消或再次故障，由新的恢复流程负责
+                result['superseded'] = True
+                return result
+            if retry:
+                state['attempt'] = attempt + 1
+                retry_at = self.clock() + self.retry_interval * (attempt + 1)
+                self.retry_queue.schedule(workload_id, retry_at)
+                # 与最终结果字段一致，另外标明仍在重试
+                result.update(pending=True, retry_at=retry_at)
+                return result
+            del self.pending_recoveries[workload_id]
+
+        if self.on_complete:
+            self.on_complete(workload_id, result)
+        return result
+
+    def _attempt_recovery(self, workload_id, failure_type, context, attempt=0):
         """尝试自动恢复"""
-        for attempt in range(self.max_retries):
-            try:
-                if failure_type == FailureType.RESOURCE_EXHAUSTED:
-                    success = self._handle_resource_exhaustion(workload_id, context)
-                elif failure_type == FailureType.SYSTEM_OVERLOAD:
-                    success = self._handle_system_overload(workload_id, context)
-                else:
-                    success = self._handle_general_failure(workload_id, context)
-                    
-                if success:
-                    return True
-                    
-                # 等待重试间隔
-                time.sleep(self.retry_interval * (attempt + 1))
-                
-            except Exception as e:
-                self.logger.warning(f"恢复尝试 {attempt + 1} 失败: {e}")
-                
-        return False
+        try:
+            if failure_type == FailureType.RESOURCE_EXHAUSTED:
+                return self._handle_resource_exhaustion(workload_id, context)
+            elif failure_type == FailureType.SYSTEM_OVERLOAD:
+                return self._handle_system_overload(workload_id, context)
+            else:
+                return self._handle_general_failure(workload_id, context)
+
+        except Exception as e:
+            self.logger.warning(f"恢复尝试 {attempt + 1} 失败: {e}")
+            return False
         
     def _attempt_failover(self, workload_id, context):
         """尝试故障转移"""
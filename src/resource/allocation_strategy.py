@@ -1,6 +1,38 @@
+import bisect
+import heapq
+import itertools
 import logging
+import math
 from typing import Dict, List
 
+class _CapacityClass:
+    """容量等级相同的一组资源及其排名索引
+
+    每个维度的剩余容量按 2 的幂分级，同一等级内资源的容量落在 [2^level, 2^(level+1)) 区间
+    """
+    __slots__ = ('levels', 'members', 'performance_heap', 'load_heap', 'cost_list')
+
+    def __init__(self, levels):
+        self.levels = levels
+        self.members = set()
+        self.performance_heap = []  # (-performance, version, resource_id)
+        self.load_heap = []         # (load, version, resource_id)
+        self.cost_list = []         # 有序列表 (cost, resource_id)
+
+    def fit(self, required):
+        """判断等级内资源能否满足需求：True 全部满足，False 需逐个检查，None 全部不满足"""
+        full = True
+        for key, value in required.items():
+            if value <= 0:
+                continue
+            level = self.levels.get(key)
+            if level is None or math.ldexp(1.0, level + 1) <= value:
+                return None
+            if math.ldexp(1.0, level) < value:
+                full = False
+        return full
+
+
 class ResourceAllocationStrategy:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -9,9 +41,52 @@ class ResourceAllocationStrategy:
             'normal': self._allocate_normal_priority,
             'low': self._allocate_low_priority
         }
-        
-    def allocate_resources(self, workload, available_resources):
-        """分配资源"""
+        # 资源索引：随资源状态增量维护，按容量等级分组，避免每次分配全量扫描
+        self.resource_index = {}
+        self._classes = {}  # 容量等级 -> _CapacityClass
+        self._version = 0
+
+    def update_resource(self, resource_id, state):
+        """更新资源状态并维护索引
+
+        state 包含 available（剩余容量）、performance、load、cost
+        """
+        self._unindex(resource_id)
+
+        self._version += 1
+        entry = {
+            'available': dict(state.get('available', {})),
+            'performance': state.get('performance', 1.0),
+            'load': state.get('load', 0.0),
+            'cost': state.get('cost', 1.0),
+            'version': self._version
+        }
+        entry['class_key'] = self._class_key(entry['available'])
+        self.resource_index[resource_id] = entry
+
+        capacity_class = self._classes.get(entry['class_key'])
+        if capacity_class is None:
+            capacity_class = self._classes[entry['class_key']] = _CapacityClass(dict(entry['class_key']))
+        capacity_class.members.add(resource_id)
+        # 堆中旧条目通过版本号惰性删除
+        heapq.heappush(capacity_class.performance_heap, (-entry['performance'], entry['version'], resource_id))
+        heapq.heappush(capacity_class.load_heap, (entry['load'], entry['version'], resource_id))
+        bisect.insort(capacity_class.cost_list, (entry['cost'], resource_id))
+        self._compact_heaps(capacity_class)
+
+    def remove_resource(self, resource_id):
+        """移除资源"""
+        if not self._unindex(resource_id):
+            return False
+        del self.resource_index[resource_id]
+        return True
+
+    def allocate_resources(self, workload, available_resources=None):
+        """分配资源
+
+        available_resources 为可选的候选资源集合（资源ID的 set/dict），
+        为空时在全部已索引资源中选择
+        """
         try:
             priority = workload.get('priority', 'normal')
             allocator = self.allocation_policies.get(priority, self._allocate_normal_priority)
@@ -19,24 +94,178 @@ class ResourceAllocationStrategy:
         except Exception as e:
             self.logger.error(f"资源分配失败: {e}")
             return None
-            
+
     def _allocate_high_priority(self, workload, resources):
         """高优先级资源分配策略"""
         required = workload['requirements']
         # 优先选择性能最好的资源
         best_resources = self._select_best_performing_resources(resources, required)
         return best_resources
-        
+
     def _allocate_normal_priority(self, workload, resources):
         """普通优先级资源分配策略"""
         required = workload['requirements']
         # 选择满足要求且负载较低的资源
         suitable_resources = self._select_suitable_resources(resources, required)
         return suitable_resources
-        
+
     def _allocate_low_priority(self, workload, resources):
         """低优先级资源分配策略"""
         required = workload['requirements']
         # 选择最经济的资源配置
         economic_resources = self._select_economic_resources(resources, required)
-        return economic_resources
\ No newline at end of file
+        return economic_resources
+
+    def _select_best_performing_resources(self, resources, required):
+        """按性能排名选择满足需求的资源"""
+        return self._select_ranked('performance_heap', resources, required,
+                                   lambda rid, e: (-e['performance'], e['version'], rid))
+
+    def _select_suitable_resources(self, resources, required):
+        """按负载排名选择满足需求的资源"""
+        return self._select_ranked('load_heap', resources, required,
+                                   lambda rid, e: (e['load'], e['version'], rid))
+
+    def _select_economic_resources(self, resources, required):
+        """按成本排名选择满足需求的资源"""
+        candidates = self._as_candidate_set(resources)
+        if self._scan_candidates(candidates):
+            return self._select_from_candidates(candidates, required, lambda rid, e: (e['cost'], rid))
+
+        best = None
+        for capacity_class, full in self._fitting_classes(required):
+            if full and candidates is None:
+                item = capacity_class.cost_list[0]
+                if best is None or item < best:
+                    best = item
+                continue
+            # 只检查成本低于当前结果的条目
+            stop = bisect.bisect_left(capacity_class.cost_list, best) if best is not None else None
+            for item in itertools.islice(capacity_class.cost_list, stop):
+                if self._is_eligible(item[1], candidates, required):
+                    best = item
+                    break
+        return best[1] if best is not None else None
+
+    def _select_ranked(self, heap_name, resources, required, rank):
+        """在各容量等级的堆中选择排名最高且满足需求的资源
+
+        全部满足需求的等级直接取堆顶；部分满足的等级按堆序遍历但不弹出条目，
+        排名不优于当前结果时停止
+        """
+        candidates = self._as_candidate_set(resources)
+        if self._scan_candidates(candidates):
+            return self._select_from_candidates(candidates, required, rank)
+
+        best = None
+        for capacity_class, full in self._fitting_classes(required):
+            heap = getattr(capacity_class, heap_name)
+            if full and candidates is None:
+                item = self._peek(heap)
+                if item is not None and (best is None or item < best):
+                    best = item
+                continue
+            for item in self._iter_heap(heap):
+                if best is not None and item >= best:
+                    break
+                if self._is_current(item) and self._is_eligible(item[2], candidates, required):
+                    best = item
+                    break
+        return best[2] if best is not None else None
+
+    def _select_from_candidates(self, candidates, required, rank):
+        """直接比较候选资源"""
+        best = None
+        for resource_id in candidates:
+            entry = self.resource_index.get(resource_id)
+            if entry is None or not self._is_eligible(resource_id, None, required):
+                continue
+            item = rank(resource_id, entry)
+            if best is None or item < best:
+                best = item
+        return best[-1] if best is not None else None
+
+    def _scan_candidates(self, candidates):
+        """候选集合小于索引规模时直接遍历候选资源"""
+        return candidates is not None and len(candidates) < len(self.resource_index)
+
+    def _fitting_classes(self, required):
+        """返回可能满足需求的容量等级及是否全部满足"""
+        for capacity_class in self._classes.values():
+            full = capacity_class.fit(required)
+            if full is not None:
+                yield capacity_class, full
+
+    def _peek(self, heap):
+        """丢弃堆顶过期条目后返回堆顶"""
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _iter_heap(self, heap):
+        """按排名顺序遍历堆，不修改堆"""
+        if not heap:
+            return
+        frontier = [(heap[0], 0)]
+        while frontier:
+            item, index = heapq.heappop(frontier)
+            yield item
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    def _is_current(self, item):
+        """检查堆条目是否对应资源的最新状态"""
+        entry = self.resource_index.get(item[2])
+        return entry is not None and entry['version'] == item[1]
+
+    def _is_eligible(self, resource_id, candidates, required):
+        """检查资源是否在候选集合中且剩余容量满足需求"""
+        if candidates is not None and resource_id not in candidates:
+            return False
+        available = self.resource_index[resource_id]['available']
+        return all(available.get(k, 0) >= v for k, v in required.items())
+
+    def _as_candidate_set(self, resources):
+        """将候选资源转换为便于查找的集合"""
+        if resources is None or isinstance(resources, (set, frozenset, dict)):
+            return resources
+        return set(resources)
+
+    def _class_key(self, available):
+        """各维度剩余容量的 2 的幂等级，容量为 0 的维度不计入"""
+        return tuple(sorted(
+            (key, math.frexp(value)[1] - 1) for key, value in available.items() if value > 0
+        ))
+
+    def _unindex(self, resource_id):
+        """将资源移出所属容量等级，堆中旧条目留待惰性删除"""
+        entry = self.resource_index.get(resource_id)
+        if entry is None:
+            return False
+        capacity_class = self._classes[entry['class_key']]
+        capacity_class.members.discard(resource_id)
+        if not capacity_class.members:
+            del self._classes[entry['class_key']]
+            return True
+        cost_list = capacity_class.cost_list
+        index = bisect.bisect_left(cost_list, (entry['cost'], resource_id))
+        if index < len(cost_list) and cost_list[index] == (entry['cost'], resource_id):
+            del cost_list[index]
+        self._compact_heaps(capacity_class)
+        return True
+
+    def _compact_heaps(self, capacity_class):
+        """过期条目过多时重建堆"""
+        limit = 2 * len(capacity_class.members) + 64
+        index = self.resource_index
+        if len(capacity_class.performance_heap) > limit:
+            capacity_class.performance_heap = [
+                (-index[rid]['performance'], index[rid]['version'], rid) for rid in capacity_class.members
+            ]
+            heapq.heapify(capacity_class.performance_heap)
+        if len(capacity_class.load_heap) > limit:
+            capacity_class.load_heap = [
+                (index[rid]['load'], index[rid]['version'], rid) for rid in capacity_class.members
+            ]
+            heapq.heapify(capacity_class.load_heap)
@@ -1,19 +1,23 @@
-import random
-import time
-from datetime import datetime, timedelta
+from datetime import timedelta
+import numpy as np
+from .clock import SystemClock
 
 class ResourceAllocator:
-    def __init__(self):
+    def __init__(self, clock=None, seed=None):
         self.resources = {
             'cpu': {'total': 100, 'allocated': 0},
             'memory': {'total': 1024, 'allocated': 0}  # GB
         }
-        
+        self.clock = clock or SystemClock()
+        self.rng = np.random.default_rng(seed)
+        self.sample_interval = 1  # 秒
+
     def run_test(self, duration):
         """运行测试并收集性能数据"""
-        start_time = datetime.now()
+        clock = self.clock
+        start_time = clock.now()
         end_time = start_time + timedelta(seconds=duration)
-        
+
         test_data = {
             'latency_metrics': [],
             'throughput_metrics': [],
@@ -23,33 +27,40 @@ class ResourceAllocator:
             },
             'failure_events': []
         }
-        
-        while datetime.now() < end_time:
-            # 模拟资源使用
-            cpu_usage = random.uniform(40, 90)
-            memory_usage = random.uniform(50, 85)
-            
+
+        while clock.now() < end_time:
+            # 真实时钟每次一个样本，虚拟时钟一次生成一批
+            remaining = (end_time - clock.now()).total_seconds()
+            batch = clock.batch_size(remaining, self.sample_interval)
+            samples = self._generate_samples(batch)
+
             # 记录指标
-            test_data['metrics']['cpu_usage'].append(cpu_usage)
-            test_data['metrics']['memory_usage'].append(memory_usage)
-            
-            # 模拟延迟
-            latency = random.uniform(100, 200)
-            test_data['latency_metrics'].append(latency)
-            
-            # 模拟吞吐量
-            throughput = random.uniform(500, 1000)
-            test_data['throughput_metrics'].append(throughput)
-            
+            test_data['metrics']['cpu_usage'].extend(samples['cpu_usage'].tolist())
+            test_data['metrics']['memory_usage'].extend(samples['memory_usage'].tolist())
+            test_data['latency_metrics'].extend(samples['latency'].tolist())
+            test_data['throughput_metrics'].extend(samples['throughput'].tolist())
+
             # 模拟故障事件
-            if random.random() < 0.01:  # 1%的故障概率
-                failure_time = datetime.now()
-                recovery_time = failure_time + timedelta(seconds=random.uniform(30, 40))
+            batch_start = clock.now().timestamp()
+            for index in np.flatnonzero(samples['failed']):
+                failure_time = batch_start + index * self.sample_interval
                 test_data['failure_events'].append({
-                    'failure_time': failure_time.timestamp(),
-                    'recovery_time': recovery_time.timestamp()
+                    'failure_time': failure_time,
+                    'recovery_time': failure_time + float(samples['recovery_delay'][index])
                 })
-            
-            time.sleep(1)  # 每秒采样一次
-            
-        return test_data
\ No newline at end of file
+
+            clock.sleep(batch * self.sample_interval)  # 每秒采样一次
+
+        return test_data
+
+    def _generate_samples(self, n):
+        """批量生成模拟样本"""
+        rng = self.rng
+        return {
+            'cpu_usage': rng.uniform(40, 90, n),
+            'memory_usage': rng.uniform(50, 85, n),
+            'latency': rng.uniform(100, 200, n),
+            'throughput': rng.uniform(500, 1000, n),
+            'failed': rng.random(n) < 0.01,  # 1%的故障概率
+            'recovery_delay': rng.uniform(30, 40, n)
+        }
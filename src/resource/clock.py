@@ -0,0 +1,43 @@
+import time
+from datetime import datetime, timedelta
+import math
+
+class SystemClock:
+    """真实时钟：读取系统时间并实际休眠"""
+    simulated = False
+
+    def now(self):
+        """当前时间"""
+        return datetime.now()
+
+    def sleep(self, seconds):
+        """阻塞等待"""
+        time.sleep(seconds)
+
+    def batch_size(self, remaining, interval):
+        """每次只生成一个样本，保持逐秒采样的行为"""
+        return 1
+
+
+class SimulatedClock:
+    """虚拟时钟：sleep 只推进虚拟时间，不阻塞调用方"""
+    simulated = True
+    # 默认起始时间固定，不依赖系统时间，保证多次运行结果一致
+    DEFAULT_START = datetime(2025, 1, 1)
+
+    def __init__(self, start=None, max_batch=4096):
+        # 固定起始时间可以让故障时间戳也完全可复现
+        self._now = start or self.DEFAULT_START
+        self.max_batch = max_batch
+
+    def now(self):
+        """当前虚拟时间"""
+        return self._now
+
+    def sleep(self, seconds):
+        """推进虚拟时间"""
+        self._now += timedelta(seconds=seconds)
+
+    def batch_size(self, remaining, interval):
+        """按剩余虚拟时长批量生成样本"""
+        return max(1, min(self.max_batch, math.ceil(remaining / interval)))
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from ..monitoring.collectors.host_sampler import get_host_sampler
+
+class HealthSampler:
+    """资源健康采样器
+
+    主机健康由共享主机采样器的快照计算，不再单独采样主机指标；
+    后台线程按固定周期刷新健康表并执行自定义检查，查询只读取最近一次结果，
+    不在查询路径上执行检查（尚无结果时除外）
+    """
+
+    def __init__(self, capacity_thresholds, interval=1.0, max_staleness=5.0, host_sampler=None,
+                 clock=time.monotonic):
+        self.capacity_thresholds = capacity_thresholds
+        self.interval = interval  # 采样周期（秒）
+        self.max_staleness = max_staleness  # 快照最大允许陈旧时间（秒）
+        self.host_sampler = host_sampler or get_host_sampler()
+        self.clock = clock
+        self.probes = {}  # 资源ID -> 自定义健康检查函数
+        self.logger = logging.getLogger(__name__)
+        # 快照整体替换，读取方无需加锁
+        self._snapshot = {'host': False, 'resources': {}, 'sampled_at': None, 'host_sampled_at': None}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def register_probe(self, resource_id, probe):
+        """为非本机资源注册独立的健康检查函数"""
+        self.probes[resource_id] = probe
+
+    def unregister_probe(self, resource_id):
+        """移除自定义健康检查函数"""
+        self.probes.pop(resource_id, None)
+
+    def sample(self, host=None):
+        """由主机快照计算一次健康表，并执行自定义检查"""
+        host = host or self.host_sampler.get_snapshot()
+        host_healthy = self._check_host_health(host)
+        resources = {}
+        for resource_id, probe in list(self.probes.items()):
+            try:
+                resources[resource_id] = bool(probe())
+            except Exception as e:
+                self.logger.warning(f"资源 {resource_id} 健康检查失败: {e}")
+                resources[resource_id] = False
+
+        self._snapshot = {
+            'host': host_healthy,
+            'resources': resources,
+            'sampled_at': self.clock(),
+            'host_sampled_at': host['sampled_at']
+        }
+        return self._snapshot
+
+    def is_stale(self):
+        """检查快照是否超过陈旧上限"""
+        sampled_at = self._snapshot['sampled_at']
+        return sampled_at is None or self.clock() - sampled_at > self.max_staleness
+
+    def get_snapshot(self):
+        """获取最近一次健康快照，只在从未采样时同步计算一次"""
+        snapshot = self._snapshot
+        if snapshot['sampled_at'] is None:
+            return self.sample()
+        return snapshot
+
+    def is_healthy(self, resource_id, snapshot=None):
+        """查询资源健康状态"""
+        snapshot = snapshot or self.get_snapshot()
+        return snapshot['resources'].get(resource_id, snapshot['host'])
+
+    def start(self):
+        """启动共享主机采样器和健康采样线程"""
+        self.host_sampler.start()
+        if self._thread and self._thread.is_alive():
+            return False
+        self._stop_event.clear()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name='health-sampler', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        """停止健康采样线程，共享主机采样器继续运行"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """后台采样循环"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error(f"健康采样失败: {e}")
+
+    def _check_host_health(self, host):
+        """由主机快照检查本机资源使用情况"""
+        try:
+            return (host['cpu_usage'] < self.capacity_thresholds['cpu'] * 100 and
+                   host['memory_usage'] < self.capacity_thresholds['memory'] * 100 and
+                   host['disk_usage'] < self.capacity_thresholds['disk'] * 100)
+        except Exception:
+            return False
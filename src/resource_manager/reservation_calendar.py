@@ -0,0 +1,222 @@
+import heapq
+import itertools
+import logging
+import random
+from datetime import datetime
+
+class _IntervalNode:
+    __slots__ = ('key', 'end', 'booking_id', 'priority', 'max_end', 'left', 'right')
+
+    def __init__(self, start, end, booking_id, priority):
+        self.key = (start, booking_id)
+        self.end = end
+        self.booking_id = booking_id
+        self.priority = priority
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+
+class IntervalTree:
+    """区间树（以起始时间为键的 treap，节点维护子树最大结束时间）
+
+    插入、删除期望 O(log n)，重叠查询 O(log n + k)
+    """
+
+    def __init__(self, seed=None):
+        self.root = None
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, start, end, booking_id):
+        """插入区间 [start, end)"""
+        node = _IntervalNode(start, end, booking_id, self._random.random())
+        self.root = self._insert(self.root, node)
+        self._size += 1
+
+    def remove(self, start, booking_id):
+        """删除区间"""
+        self.root, removed = self._remove(self.root, (start, booking_id))
+        if removed:
+            self._size -= 1
+        return removed
+
+    def overlapping(self, start, end):
+        """返回与 [start, end) 重叠的区间 (start, end, booking_id)"""
+        result = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            # 子树中所有区间都在查询开始前结束，整棵剪枝
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            if node.key[0] < end:
+                if node.end > start:
+                    result.append((node.key[0], node.end, node.booking_id))
+                stack.append(node.right)
+        return result
+
+    def _insert(self, root, node):
+        if root is None:
+            return node
+        if node.key < root.key:
+            root.left = self._insert(root.left, node)
+            if root.left.priority > root.priority:
+                root = self._rotate_right(root)
+        else:
+            root.right = self._insert(root.right, node)
+            if root.right.priority > root.priority:
+                root = self._rotate_left(root)
+        self._update(root)
+        return root
+
+    def _remove(self, root, key):
+        if root is None:
+            return None, False
+        if key < root.key:
+            root.left, removed = self._remove(root.left, key)
+        elif key > root.key:
+            root.right, removed = self._remove(root.right, key)
+        else:
+            removed = True
+            if root.left is None:
+                return root.right, True
+            if root.right is None:
+                return root.left, True
+            # 将待删节点旋转到子节点位置后继续删除
+            if root.left.priority > root.right.priority:
+                root = self._rotate_right(root)
+                root.right, _ = self._remove(root.right, key)
+            else:
+                root = self._rotate_left(root)
+                root.left, _ = self._remove(root.left, key)
+        self._update(root)
+        return root, removed
+
+    def _rotate_right(self, node):
+        left = node.left
+        node.left = left.right
+        left.right = node
+        self._update(node)
+        self._update(left)
+        return left
+
+    def _rotate_left(self, node):
+        right = node.right
+        node.right = right.left
+        right.left = node
+        self._update(node)
+        self._update(right)
+        return right
+
+    def _update(self, node):
+        node.max_end = node.end
+        if node.left is not None and node.left.max_end > node.max_end:
+            node.max_end = node.left.max_end
+        if node.right is not None and node.right.max_end > node.max_end:
+            node.max_end = node.right.max_end
+
+
+class ReservationCalendar:
+    """提前预约日历
+
+    每个资源一棵区间树，支持时间段内的剩余容量查询、
+    新预约的准入检查，以及过期预约的自动释放
+    """
+
+    def __init__(self):
+        self.capacities = {}  # 资源ID -> 容量
+        self.trees = {}       # 资源ID -> IntervalTree
+        self.bookings = {}    # 预约ID -> 预约信息
+        self._expiry_heap = []  # (结束时间, 预约ID)
+        self._ids = itertools.count(1)
+        self.logger = logging.getLogger(__name__)
+
+    def set_capacity(self, resource_id, capacity):
+        """设置资源可预约容量"""
+        self.capacities[resource_id] = dict(capacity)
+        self.trees.setdefault(resource_id, IntervalTree())
+
+    def reserve(self, resource_id, start, end, amount, now=None):
+        """预约资源，准入失败返回 None"""
+        self.release_expired(now)
+        if resource_id not in self.capacities or not start < end:
+            return None
+
+        free = self.free_capacity(resource_id, start, end)
+        if any(free.get(k, 0) < v for k, v in amount.items()):
+            self.logger.info(f"资源 {resource_id} 在 {start} - {end} 容量不足，拒绝预约")
+            return None
+
+        booking_id = next(self._ids)
+        self.bookings[booking_id] = {
+            'resource_id': resource_id,
+            'start': start,
+            'end': end,
+            'amount': dict(amount)
+        }
+        self.trees[resource_id].insert(start, end, booking_id)
+        heapq.heappush(self._expiry_heap, (end, booking_id))
+        return booking_id
+
+    def cancel(self, booking_id):
+        """取消预约"""
+        booking = self.bookings.pop(booking_id, None)
+        if booking is None:
+            return False
+        # 过期堆中的条目在弹出时惰性跳过
+        self.trees[booking['resource_id']].remove(booking['start'], booking_id)
+        return True
+
+    def release_expired(self, now=None):
+        """释放已结束的预约"""
+        now = now or datetime.now()
+        released = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, booking_id = heapq.heappop(self._expiry_heap)
+            if self.cancel(booking_id):
+                released.append(booking_id)
+        return released
+
+    def booked_peak(self, resource_id, start, end):
+        """时间段内各维度同时预约量的峰值"""
+        tree = self.trees.get(resource_id)
+        if tree is None:
+            return {}
+
+        # 只对重叠区间做扫描线，得到峰值并发量
+        events = []
+        for b_start, b_end, booking_id in tree.overlapping(start, end):
+            amount = self.bookings[booking_id]['amount']
+            events.append((max(b_start, start), 1, amount))
+            events.append((min(b_end, end), 0, amount))
+        events.sort(key=lambda e: (e[0], e[1]))
+
+        current, peak = {}, {}
+        for _, is_start, amount in events:
+            sign = 1 if is_start else -1
+            for key, value in amount.items():
+                current[key] = current.get(key, 0) + sign * value
+                if current[key] > peak.get(key, 0):
+                    peak[key] = current[key]
+        return peak
+
+    def free_capacity(self, resource_id, start, end):
+        """时间段内可再预约的剩余容量"""
+        capacity = self.capacities.get(resource_id, {})
+        peak = self.booked_peak(resource_id, start, end)
+        return {key: value - peak.get(key, 0) for key, value in capacity.items()}
+
+    def get_bookings(self, resource_id, start, end):
+        """查询时间段内的预约"""
+        tree = self.trees.get(resource_id)
+        if tree is None:
+            return []
+        return [
+            dict(self.bookings[booking_id], id=booking_id)
+            for _, _, booking_id in tree.overlapping(start, end)
+        ]
@@ -1,8 +1,13 @@
+from bisect import bisect_left, insort
 from datetime import datetime
-import psutil
+from itertools import islice
+import numpy as np
+from ..resource.allocation_strategy import ResourceAllocationStrategy
+from .health_sampler import HealthSampler
+from .reservation_calendar import ReservationCalendar
 
 class ResourceManager:
-    def __init__(self):
+    def __init__(self, health_interval=1.0, health_staleness=5.0, host_sampler=None):
         self.resources = {}
         self.resource_states = {}
         self.capacity_thresholds = {
@@ -10,58 +15,250 @@ class ResourceManager:
             'memory': 0.8,
             'disk': 0.9
         }
-        
+        self.health_sampler = HealthSampler(
+            self.capacity_thresholds,
+            interval=health_interval,
+            max_staleness=health_staleness,
+            host_sampler=host_sampler
+        )
+        # 可用资源索引
+        self.available_ids = set()
+        # 剩余容量矩阵：每行一个资源，每列一个资源维度
+        self._dimensions = {}
+        self._row_of = {}
+        self._row_ids = []
+        self._headroom = np.zeros((0, 0))
+        self._available_mask = np.zeros(0, dtype=bool)
+        # 每个维度一个按剩余容量排序的 (剩余容量, 行) 列表，查询时二分定位候选
+        self._by_headroom = []
+        # 提前预约日历
+        self.reservations = ReservationCalendar()
+        # 按优先级选择资源的分配策略，只索引可用资源
+        self.allocation_strategy = ResourceAllocationStrategy()
+
     def register_resource(self, resource_id, capacity):
-        """注册新资源"""
+        """注册新资源，重复注册时更新容量并保留已放置的工作负载"""
+        previous = self.resources.get(resource_id)
         self.resources[resource_id] = capacity
-        self.resource_states[resource_id] = {
-            'status': 'available',
-            'workloads': [],
-            'last_updated': datetime.now()
-        }
-        
+        state = self.resource_states.get(resource_id)
+        if state is None:
+            self.resource_states[resource_id] = {
+                'status': 'available',
+                'workloads': [],
+                'last_updated': datetime.now()
+            }
+        else:
+            state['status'] = 'available'
+            state['last_updated'] = datetime.now()
+        self._index_resource(resource_id, capacity, previous)
+        self._set_available(resource_id, True)
+        self.reservations.set_capacity(resource_id, capacity)
+
+    def set_resource_status(self, resource_id, status):
+        """更新资源状态并同步可用索引"""
+        state = self.resource_states.get(resource_id)
+        if state is None:
+            return False
+        state['status'] = status
+        state['last_updated'] = datetime.now()
+        self._set_available(resource_id, status == 'available')
+        return True
+
+    def place_workload(self, workload):
+        """按工作负载优先级选择资源并分配，返回资源ID，没有合适资源时返回 None"""
+        resource_id = self.allocation_strategy.allocate_resources(
+            {'priority': workload.get('priority', 'normal'), 'requirements': self._get_requirements(workload)}
+        )
+        if resource_id is None or not self.health_sampler.is_healthy(resource_id):
+            return None
+        return resource_id if self.allocate_resource(resource_id, workload) else None
+
     def get_available_resources(self):
         """获取可用资源列表"""
         available = []
-        for resource_id, state in self.resource_states.items():
-            if (state['status'] == 'available' and 
-                self._check_resource_health(resource_id)):
+        # 整个扫描共用同一份健康快照
+        snapshot = self.health_sampler.get_snapshot()
+        for resource_id in self.available_ids:
+            if self.health_sampler.is_healthy(resource_id, snapshot):
                 available.append(resource_id)
         return available
-        
+
+    def find_fitting_resources(self, requirements):
+        """查找剩余容量满足需求的可用资源
+
+        在各维度的有序索引中二分定位满足需求的行，取候选最少的维度，
+        只对这些候选做向量化过滤，开销与候选数而非资源总数成正比
+        """
+        best = None
+        for key, value in requirements.items():
+            column = self._dimensions.get(key)
+            if column is None:
+                return []
+            index = self._by_headroom[column]
+            start = bisect_left(index, (value, -1))
+            if best is None or len(index) - start < len(best[0]) - best[1]:
+                best = (index, start)
+
+        if best is None:
+            rows = np.flatnonzero(self._available_mask[:len(self._row_ids)])
+        else:
+            index, start = best
+            rows = np.fromiter(
+                (row for _, row in islice(index, start, None)), dtype=np.intp, count=len(index) - start
+            )
+            mask = self._available_mask[rows]
+            for key, value in requirements.items():
+                mask &= self._headroom[rows, self._dimensions[key]] >= value
+            rows = np.sort(rows[mask])
+        if len(rows) == 0:
+            return []
+
+        snapshot = self.health_sampler.get_snapshot()
+        return [
+            self._row_ids[row] for row in rows
+            if self.health_sampler.is_healthy(self._row_ids[row], snapshot)
+        ]
+
+    def get_remaining_capacity(self, resource_id):
+        """获取资源剩余容量"""
+        row = self._row_of.get(resource_id)
+        if row is None:
+            return None
+        return {key: float(self._headroom[row, column]) for key, column in self._dimensions.items()}
+
+    def reserve_capacity(self, resource_id, start, end, requirements):
+        """预约未来时间段的资源容量，准入失败返回 None"""
+        return self.reservations.reserve(resource_id, start, end, requirements)
+
+    def cancel_reservation(self, booking_id):
+        """取消预约"""
+        return self.reservations.cancel(booking_id)
+
+    def start_health_sampling(self):
+        """启动后台健康采样"""
+        return self.health_sampler.start()
+
+    def stop_health_sampling(self):
+        """停止后台健康采样"""
+        self.health_sampler.stop()
+
     def allocate_resource(self, resource_id, workload):
         """分配资源"""
         if not self._check_capacity(resource_id, workload):
             return False
-            
+
         try:
             state = self.resource_states[resource_id]
             state['workloads'].append(workload)
             state['last_updated'] = datetime.now()
+            self._adjust_headroom(resource_id, self._get_requirements(workload), -1)
             return True
         except Exception:
             return False
-            
+
+    def release_resource(self, resource_id, workload):
+        """释放工作负载占用的资源"""
+        try:
+            state = self.resource_states[resource_id]
+            state['workloads'].remove(workload)
+            state['last_updated'] = datetime.now()
+            self._adjust_headroom(resource_id, self._get_requirements(workload), 1)
+            return True
+        except Exception:
+            return False
+
     def _check_resource_health(self, resource_id):
         """检查资源健康状态"""
         try:
-            # 检查系统资源使用情况
-            cpu_usage = psutil.cpu_percent()
-            memory_usage = psutil.virtual_memory().percent
-            disk_usage = psutil.disk_usage('/').percent
-            
-            return (cpu_usage < self.capacity_thresholds['cpu'] * 100 and
-                   memory_usage < self.capacity_thresholds['memory'] * 100 and
-                   disk_usage < self.capacity_thresholds['disk'] * 100)
+            # 读取最近一次健康快照，不再逐个资源采样
+            return self.health_sampler.is_healthy(resource_id)
         except:
             return False
-            
+
     def _check_capacity(self, resource_id, workload):
         """检查资源容量"""
         try:
-            capacity = self.resources[resource_id]
-            required = workload.get_resource_requirements()
-            
-            return all(capacity[k] >= v for k, v in required.items())
+            row = self._row_of[resource_id]
+            required = self._get_requirements(workload)
+
+            # 与剩余容量比较，已放置的工作负载占用不可重复分配
+            return all(self._headroom[row, self._dimensions[k]] >= v for k, v in required.items())
         except:
-            return False
\ No newline at end of file
+            return False
+
+    def _get_requirements(self, workload):
+        """获取工作负载资源需求"""
+        if hasattr(workload, 'get_resource_requirements'):
+            return workload.get_resource_requirements()
+        return workload['requirements']
+
+    def _index_resource(self, resource_id, capacity, previous=None):
+        """将资源容量写入剩余容量矩阵，重复注册时扣除已占用的容量"""
+        for key in capacity:
+            if key not in self._dimensions:
+                self._dimensions[key] = len(self._dimensions)
+                self._headroom = np.pad(self._headroom, ((0, 0), (0, 1)))
+                self._by_headroom.append([(0.0, r) for r in range(len(self._row_ids))])
+
+        values = np.zeros(len(self._dimensions))
+        for key, value in capacity.items():
+            values[self._dimensions[key]] = value
+
+        row = self._row_of.get(resource_id)
+        if row is not None:
+            used = -self._headroom[row]
+            for key, value in (previous or {}).items():
+                used[self._dimensions[key]] += value
+            self._set_headroom(row, values - used)
+        else:
+            row = len(self._row_ids)
+            if row >= self._headroom.shape[0]:
+                # 按倍数扩容，摊销追加开销
+                extra = max(16, self._headroom.shape[0])
+                self._headroom = np.pad(self._headroom, ((0, extra), (0, 0)))
+                self._available_mask = np.pad(self._available_mask, (0, extra))
+            self._row_of[resource_id] = row
+            self._row_ids.append(resource_id)
+            self._headroom[row] = values
+            for column, index in enumerate(self._by_headroom):
+                insort(index, (float(values[column]), row))
+
+    def _adjust_headroom(self, resource_id, required, sign):
+        """按需求增减剩余容量"""
+        row = self._row_of[resource_id]
+        values = self._headroom[row].copy()
+        for key, value in required.items():
+            values[self._dimensions[key]] += sign * value
+        self._set_headroom(row, values)
+        self._sync_strategy(resource_id)
+
+    def _sync_strategy(self, resource_id):
+        """把可用资源的剩余容量和负载同步到分配策略索引"""
+        if resource_id not in self.available_ids:
+            self.allocation_strategy.remove_resource(resource_id)
+            return
+        remaining = self.get_remaining_capacity(resource_id)
+        capacity = self.resources[resource_id]
+        used = [1 - remaining[key] / value for key, value in capacity.items() if value > 0]
+        self.allocation_strategy.update_resource(resource_id, {
+            'available': remaining,
+            'load': sum(used) / len(used) if used else 0.0
+        })
+
+    def _set_headroom(self, row, values):
+        """更新一行剩余容量并同步有序索引"""
+        for column, index in enumerate(self._by_headroom):
+            old, new = float(self._headroom[row, column]), float(values[column])
+            if old != new:
+                del index[bisect_left(index, (old, row))]
+                insort(index, (new, row))
+        self._headroom[row] = values
+
+    def _set_available(self, resource_id, available):
+        """维护可用资源集合与掩码"""
+        if available:
+            self.available_ids.add(resource_id)
+        else:
+            self.available_ids.discard(resource_id)
+        self._available_mask[self._row_of[resource_id]] = available
+        self._sync_strategy(resource_id)
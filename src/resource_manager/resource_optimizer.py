@@ -1,18 +1,69 @@
+import time
+import numpy as np
+
 class ResourceOptimizer:
-    def __init__(self):
+    def __init__(self, hysteresis=0.05, cooldown=60, min_delta=0.05, min_abs_delta=1e-6):
         self.min_utilization = 0.6
         self.max_utilization = 0.8
-        
-    def optimize_allocation(self, current_allocation, resource_usage):
-        """优化资源分配"""
-        optimized_allocation = current_allocation.copy()
-        
-        for resource_id, usage in resource_usage.items():
-            if usage < self.min_utilization:
-                # 减少资源分配
-                optimized_allocation[resource_id] *= 0.8
-            elif usage > self.max_utilization:
-                # 增加资源分配
-                optimized_allocation[resource_id] *= 1.2
-                
-        return optimized_allocation
\ No newline at end of file
+        self.scale_down_factor = 0.8
+        self.scale_up_factor = 1.2
+        self.hysteresis = hysteresis  # 反向调整需额外越过的利用率带宽
+        self.cooldown = cooldown      # 单个资源两次调整的最小间隔（秒）
+        self.min_delta = min_delta    # 相对变化小于该比例时不下发
+        self.min_abs_delta = min_abs_delta  # 绝对变化不超过该值时不下发（如分配为 0）
+        # 每个资源一行状态
+        self._slot = {}
+        self._last_direction = np.zeros(0, dtype=np.int8)
+        self._last_change = np.zeros(0)
+
+    def optimize_allocation(self, current_allocation, resource_usage, now=None):
+        """优化资源分配，只返回发生变化的条目"""
+        resource_ids = list(resource_usage)
+        allocation = np.fromiter(
+            (current_allocation[rid] for rid in resource_ids), dtype=float, count=len(resource_ids)
+        )
+        usage = np.fromiter(
+            (resource_usage[rid] for rid in resource_ids), dtype=float, count=len(resource_ids)
+        )
+        changed, new_values = self.optimize_arrays(resource_ids, allocation, usage, now)
+        return {resource_ids[i]: float(v) for i, v in zip(changed, new_values)}
+
+    def optimize_arrays(self, resource_ids, allocation, usage, now=None):
+        """向量化计算调整结果，返回 (变化位置, 新分配值)"""
+        now = time.monotonic() if now is None else now
+        rows = self._rows(resource_ids)
+        last_direction = self._last_direction[rows]
+
+        # 滞回：上次为扩容时，缩容阈值下移；上次为缩容时，扩容阈值上移
+        low = np.where(last_direction > 0, self.min_utilization - self.hysteresis, self.min_utilization)
+        high = np.where(last_direction < 0, self.max_utilization + self.hysteresis, self.max_utilization)
+        direction = np.where(usage > high, 1, np.where(usage < low, -1, 0)).astype(np.int8)
+
+        # 冷却期内的资源不调整
+        direction[now - self._last_change[rows] < self.cooldown] = 0
+
+        factor = np.where(direction > 0, self.scale_up_factor,
+                          np.where(direction < 0, self.scale_down_factor, 1.0))
+        proposed = allocation * factor
+
+        # 过滤变化过小的调整：须严格超过相对阈值和绝对阈值
+        threshold = np.maximum(self.min_delta * np.abs(allocation), self.min_abs_delta)
+        significant = np.abs(proposed - allocation) > threshold
+        changed = np.flatnonzero((direction != 0) & significant)
+
+        changed_rows = rows[changed]
+        self._last_direction[changed_rows] = direction[changed]
+        self._last_change[changed_rows] = now
+        return changed, proposed[changed]
+
+    def _rows(self, resource_ids):
+        """资源ID映射为状态行号，新资源按需扩容"""
+        slot = self._slot
+        for rid in resource_ids:
+            if rid not in slot:
+                slot[rid] = len(slot)
+        if len(slot) > len(self._last_change):
+            extra = max(16, len(slot) - len(self._last_change), len(self._last_change))
+            self._last_direction = np.pad(self._last_direction, (0, extra))
+            self._last_change = np.pad(self._last_change, (0, extra), constant_values=-np.inf)
+        return np.fromiter((slot[rid] for rid in resource_ids), dtype=np.int64, count=len(resource_ids))
@@ -1,44 +1,104 @@
 from datetime import datetime, timedelta
-import numpy as np
+from .rolling_window import RollingWindow
+from .seasonal_profile import SeasonalProfile
+from .reservation_calendar import ReservationCalendar
 
 class ResourceReserve:
-    def __init__(self):
+    def __init__(self, profile_path=None, calendar=None, resource_type='cpu', profile_save_every=1000):
         self.reserve_ratio = 0.2  # 基础预留比例
         self.peak_hours = [(9, 12), (14, 18)]  # 高峰时段
-        self.usage_history = []
         self.forecast_window = 24  # 预测窗口（小时）
-        
-    def calculate_reserve(self, resource, current_usage):
+        self.trend_window = 6
+        self.usage_history = RollingWindow(self.forecast_window)
+        self.usage_windows = {}  # 资源ID -> 滑动窗口
+        self.peak_reserve_ratio = 0.3
+        # 学习到的星期 × 小时需求画像，可持久化
+        self.seasonal_profile = SeasonalProfile(storage_path=profile_path, save_every=profile_save_every)
+        # 提前预约日历（可与 ResourceManager 共享），只在预约时段内预留
+        self.calendar = calendar or ReservationCalendar()
+        self.resource_type = resource_type
+
+    def record_usage(self, usage, resource_id=None, timestamp=None):
+        """记录资源使用量"""
+        self._get_window(resource_id).append(usage)
+        self.seasonal_profile.update(self._profile_key(resource_id), usage, timestamp)
+
+    def save_profile(self, path=None):
+        """保存需求画像"""
+        return self.seasonal_profile.save(path)
+
+    def stop(self):
+        """停止时保存需求画像，未配置存储路径时直接返回"""
+        if not self.seasonal_profile.storage_path:
+            return False
+        return self.save_profile()
+
+    def calculate_reserve(self, resource, current_usage, resource_id=None):
         """计算资源预留量"""
+        history = self._get_window(resource_id)
         base_reserve = self._calculate_base_reserve(resource)
-        dynamic_reserve = self._calculate_dynamic_reserve(current_usage)
-        peak_reserve = self._calculate_peak_reserve()
-        
-        return max(base_reserve, dynamic_reserve, peak_reserve)
-        
+        dynamic_reserve = self._calculate_dynamic_reserve(current_usage, history)
+        peak_reserve = self._calculate_peak_reserve(history, resource_id)
+        booked_reserve = self._calculate_booked_reserve(resource_id)
+
+        return max(base_reserve, dynamic_reserve, peak_reserve, booked_reserve)
+
+    def _get_window(self, resource_id):
+        """获取资源对应的滑动窗口"""
+        if resource_id is None:
+            return self.usage_history
+        window = self.usage_windows.get(resource_id)
+        if window is None:
+            window = self.usage_windows[resource_id] = RollingWindow(self.forecast_window)
+        return window
+
+    def _profile_key(self, resource_id):
+        """需求画像中的资源键"""
+        return 'default' if resource_id is None else str(resource_id)
+
     def _calculate_base_reserve(self, resource):
         """计算基础预留量"""
         capacity = resource.get_capacity()
         return capacity * self.reserve_ratio
-        
-    def _calculate_dynamic_reserve(self, current_usage):
+
+    def _calculate_dynamic_reserve(self, current_usage, history=None):
         """计算动态预留量"""
-        if len(self.usage_history) < 24:
+        if history is None:
+            history = self.usage_history
+        if len(history) < 24:
             return current_usage * 0.2
-            
-        # 使用历史数据预测
-        usage_std = np.std(self.usage_history[-24:])
-        usage_trend = np.mean(np.diff(self.usage_history[-6:]))
-        
+
+        # 使用滑动窗口统计预测
+        usage_std = history.std()
+        usage_trend = history.trend(self.trend_window)
+
         return current_usage * (0.1 + 0.1 * usage_std + 0.1 * max(0, usage_trend))
-        
-    def _calculate_peak_reserve(self):
+
+    def _calculate_booked_reserve(self, resource_id, now=None):
+        """计算当前已预约的资源量"""
+        if resource_id is None:
+            return 0
+        now = now or datetime.now()
+        self.calendar.release_expired(now)
+        peak = self.calendar.booked_peak(resource_id, now, now + timedelta(seconds=1))
+        return peak.get(self.resource_type, 0)
+
+    def _calculate_peak_reserve(self, history=None, resource_id=None, now=None):
         """计算高峰期预留量"""
-        current_hour = datetime.now().hour
-        
+        now = now or datetime.now()
+        # 优先使用学习到的当前时段需求分位数
+        learned_peak = self.seasonal_profile.lookup(self._profile_key(resource_id), now)
+        if learned_peak is not None:
+            return learned_peak * self.peak_reserve_ratio
+
+        # 样本不足时退回固定高峰时段
+        if history is None:
+            history = self.usage_history
+        current_hour = now.hour
+
         # 检查是否在高峰期
         in_peak = any(start <= current_hour < end for start, end in self.peak_hours)
-        
+
         if in_peak:
-            return self.usage_history[-24:].max() * 0.3 if self.usage_history else 0
-        return 0
\ No newline at end of file
+            return history.max() * self.peak_reserve_ratio if len(history) else 0
+        return 0
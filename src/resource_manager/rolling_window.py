@@ -0,0 +1,74 @@
+from collections import deque
+import math
+
+class RollingWindow:
+    """定长滑动窗口统计
+
+    追加与查询均为摊销 O(1)：有界缓冲区保存原始值，
+    累计和/平方和维护均值与标准差，单调队列维护窗口最大值
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._values = deque(maxlen=size)
+        self._max_queue = deque()  # (序号, 值)，值单调递减
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def append(self, value):
+        """追加一个样本"""
+        value = float(value)
+        if len(self._values) == self.size:
+            evicted = self._values[0]
+            self._sum -= evicted
+            self._sum_sq -= evicted * evicted
+        self._values.append(value)
+        self._sum += value
+        self._sum_sq += value * value
+
+        while self._max_queue and self._max_queue[-1][1] <= value:
+            self._max_queue.pop()
+        self._max_queue.append((self._count, value))
+        if self._max_queue[0][0] <= self._count - self.size:
+            self._max_queue.popleft()
+        self._count += 1
+
+        # 定期重算累计和，避免浮点误差累积
+        if self._count % (self.size * 64) == 0:
+            self._sum = math.fsum(self._values)
+            self._sum_sq = math.fsum(v * v for v in self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def mean(self):
+        """窗口均值"""
+        if not self._values:
+            return 0.0
+        return self._sum / len(self._values)
+
+    def std(self):
+        """窗口总体标准差（与 np.std 一致）"""
+        n = len(self._values)
+        if n == 0:
+            return 0.0
+        mean = self._sum / n
+        return math.sqrt(max(self._sum_sq / n - mean * mean, 0.0))
+
+    def max(self):
+        """窗口最大值"""
+        if not self._max_queue:
+            return 0.0
+        return self._max_queue[0][1]
+
+    def trend(self, span):
+        """最近 span 个样本的平均差分（与 np.mean(np.diff(x[-span:])) 一致）"""
+        span = min(span, len(self._values))
+        if span < 2:
+            return 0.0
+        return (self._values[-1] - self._values[-span]) / (span - 1)
+
+    def values(self):
+        """窗口内的原始值"""
+        return list(self._values)
@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+from datetime import datetime
+import numpy as np
+from ..analysis.quantile_sketch import P2Quantile
+
+class SeasonalProfile:
+    """按资源维护 星期 × 小时 的需求分位数表
+
+    每个单元格用 P² 估计器增量更新，更新后立即写回分位数表，
+    查询只需一次数组读取。配置了存储路径时每 save_every 次更新自动保存一次
+    """
+
+    def __init__(self, quantiles=(0.5, 0.95), storage_path=None, min_samples=5, save_every=1000):
+        self.quantiles = tuple(quantiles)
+        self.storage_path = storage_path
+        self.min_samples = min_samples  # 单元格可用前的最少样本数
+        self.save_every = save_every    # 自动保存间隔（更新次数），为空时不自动保存
+        self._unsaved = 0               # 上次保存后的更新次数
+        self.tables = {}    # 资源ID -> (7, 24, 分位数个数) 数组
+        self.counts = {}    # 资源ID -> (7, 24) 样本计数
+        self.sketches = {}  # 资源ID -> {(星期, 小时): [P2Quantile, ...]}
+        self.logger = logging.getLogger(__name__)
+
+        if storage_path and os.path.exists(storage_path):
+            self.load(storage_path)
+
+    def update(self, resource_id, usage, timestamp=None):
+        """记录一个使用量样本"""
+        day, hour = self._cell(timestamp)
+        table, counts, sketches = self._get_resource(resource_id)
+
+        cell = sketches.get((day, hour))
+        if cell is None:
+            cell = sketches[(day, hour)] = [P2Quantile(q) for q in self.quantiles]
+        for i, sketch in enumerate(cell):
+            sketch.add(usage)
+            # 加载后新增的分位数从零开始学习，样本不足前不参与查询
+            table[day, hour, i] = sketch.value() if sketch.count >= self.min_samples else np.nan
+        counts[day, hour] += 1
+
+        self._unsaved += 1
+        if self.storage_path and self.save_every and self._unsaved >= self.save_every:
+            self.save()
+
+    def lookup(self, resource_id, timestamp=None, quantile=0.95):
+        """查询当前时段的需求分位数，样本不足或未跟踪该分位数时返回 None"""
+        table = self.tables.get(resource_id)
+        if table is None or quantile not in self.quantiles:
+            return None
+        day, hour = self._cell(timestamp)
+        if self.counts[resource_id][day, hour] < self.min_samples:
+            return None
+        value = table[day, hour, self.quantiles.index(quantile)]
+        return None if np.isnan(value) else float(value)
+
+    def save(self, path=None):
+        """持久化分位数估计状态，未指定路径时返回 False"""
+        path = path or self.storage_path
+        if not path:
+            self.logger.error("保存季节性需求画像失败: 未指定存储路径")
+            return False
+        try:
+            data = {
+                'quantiles': list(self.quantiles),
+                'resources': {
+                    str(resource_id): {
+                        f'{day},{hour}': [sketch.get_state() for sketch in cell]
+                        for (day, hour), cell in sketches.items()
+                    }
+                    for resource_id, sketches in self.sketches.items()
+                }
+            }
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+            self._unsaved = 0
+            return True
+        except Exception as e:
+            self.logger.error(f"保存季节性需求画像失败: {e}")
+            return False
+
+    def load(self, path=None):
+        """从磁盘恢复分位数估计状态
+
+        配置的分位数保持不变：文件中已有的分位数恢复估计状态，缺少的从零开始学习，
+        文件中多出的分位数一并保留
+        """
+        path = path or self.storage_path
+        if not path:
+            self.logger.error("加载季节性需求画像失败: 未指定存储路径")
+            return False
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            saved = list(data['quantiles'])
+            self.quantiles = self.quantiles + tuple(q for q in saved if q not in self.quantiles)
+            self.tables, self.counts, self.sketches = {}, {}, {}
+
+            for resource_id, cells in data['resources'].items():
+                table, counts, sketches = self._get_resource(resource_id)
+                for key, states in cells.items():
+                    day, hour = (int(v) for v in key.split(','))
+                    restored = {q: P2Quantile.from_state(state) for q, state in zip(saved, states)}
+                    cell = sketches[(day, hour)] = [restored.get(q) or P2Quantile(q) for q in self.quantiles]
+                    counts[day, hour] = max(sketch.count for sketch in restored.values())
+                    for i, sketch in enumerate(cell):
+                        table[day, hour, i] = sketch.value() if sketch.count >= self.min_samples else np.nan
+            return True
+        except Exception as e:
+            self.logger.error(f"加载季节性需求画像失败: {e}")
+            return False
+
+    def _get_resource(self, resource_id):
+        """获取或创建资源的分位数表"""
+        if resource_id not in self.tables:
+            self.tables[resource_id] = np.full((7, 24, len(self.quantiles)), np.nan)
+            self.counts[resource_id] = np.zeros((7, 24), dtype=np.int64)
+            self.sketches[resource_id] = {}
+        return self.tables[resource_id], self.counts[resource_id], self.sketches[resource_id]
+
+    def _cell(self, timestamp):
+        """时间戳对应的 (星期, 小时) 单元格"""
+        timestamp = timestamp or datetime.now()
+        return timestamp.weekday(), timestamp.hour
@@ -7,11 +7,35 @@ class PersistenceManager:
     def __init__(self, db_path):
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
+        self._init_db()
+        
+    def _init_db(self):
+        """初始化数据表"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS workloads '
+                    '(id TEXT PRIMARY KEY, data TEXT, created_at TIMESTAMP, updated_at TIMESTAMP)'
+                )
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS metrics '
+                    '(workload_id TEXT, metric_type TEXT, value REAL, timestamp TIMESTAMP)'
+                )
+        except Exception as e:
+            self.logger.error(f"初始化数据库失败: {e}")
+        
+    def _workload_payload(self, workload_data):
+        """工作负载的持久化内容，不含指标（指标单独写入 metrics 表），避免展开指标环"""
+        if hasattr(workload_data, 'to_dict'):
+            return {key: workload_data[key] for key in workload_data if key != 'metrics'}
+        return workload_data
         
     def _datetime_handler(self, obj):
         """处理日期序列化"""
         if isinstance(obj, datetime):
             return obj.isoformat()
+        if hasattr(obj, 'to_dict'):
+            return obj.to_dict()
         raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
         
     def save_workload(self, workload_id, workload_data):
@@ -21,7 +45,7 @@ class PersistenceManager:
                 cursor = conn.cursor()
                 now = datetime.now()
                 # 使用自定义的JSON编码器
-                json_data = json.dumps(workload_data, default=self._datetime_handler)
+                json_data = json.dumps(self._workload_payload(workload_data), default=self._datetime_handler)
                 cursor.execute(
                     'INSERT OR REPLACE INTO workloads (id, data, created_at, updated_at) VALUES (?, ?, ?, ?)',
                     (workload_id, json_data, now, now)
@@ -32,6 +56,28 @@ class PersistenceManager:
             self.logger.error(f"保存工作负载失败: {e}")
             return False
             
+    def save_workloads(self, workloads):
+        """在一个事务中批量保存工作负载数据
+
+        workloads 为 (workload_id, workload_data) 序列，任一条失败则整批回滚
+        """
+        try:
+            now = datetime.now()
+            rows = [
+                (workload_id, json.dumps(self._workload_payload(workload_data), default=self._datetime_handler),
+                 now, now)
+                for workload_id, workload_data in workloads
+            ]
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO workloads (id, data, created_at, updated_at) VALUES (?, ?, ?, ?)',
+                    rows
+                )
+            return True
+        except Exception as e:
+            self.logger.error(f"批量保存工作负载失败: {e}")
+            return False
+            
     def save_metrics(self, workload_id, metrics):
         """保存指标数据"""
         try:
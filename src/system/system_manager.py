@@ -3,6 +3,8 @@ from ..storage.persistence_manager import PersistenceManager
 from ..workload.priority_queue import WorkloadPriorityQueue
 from ..resource.allocation_strategy import ResourceAllocationStrategy
 from ..reporting.performance_reporter import PerformanceReporter
+from ..monitoring.health_checker import HealthChecker
+from ..alerts.alert_notifier import AlertNotifier
 import logging
 
 class SystemManager:
@@ -42,4 +44,39 @@ class SystemManager:
             
         except Exception as e:
             self.logger.error(f"提交工作负载失败: {e}")
-            return False
\ No newline at end of file
+            return False
+            
+    def submit_many(self, workloads):
+        """批量提交工作负载
+
+        workloads 为 (workload_id, requirements[, priority]) 元组或同名键的字典；
+        校验失败的条目单独报告，不影响其余条目；整批持久化失败时撤销已创建的工作负载，不加入队列
+        """
+        try:
+            created, errors = self.workload_manager.create_many(workloads)
+            records = [self.workload_manager.workloads[wid] for wid in created]
+            
+            # 一个事务内持久化整批数据
+            persisted = self.persistence_manager.save_workloads(
+                (record.id, record) for record in records
+            )
+            if not persisted:
+                for workload_id in created:
+                    self.workload_manager.delete_workload(workload_id)
+                errors['batch'] = '持久化失败，整批未提交'
+                return {'submitted': [], 'errors': errors, 'persisted': False}
+            
+            # 一次性堆化加入优先级队列
+            self.priority_queue.bulk_enqueue(
+                (record.id, record.priority, record.requirements) for record in records
+            )
+            
+            return {
+                'submitted': created,
+                'errors': errors,
+                'persisted': persisted
+            }
+            
+        except Exception as e:
+            self.logger.error(f"批量提交工作负载失败: {e}")
+            return {'submitted': [], 'errors': {'batch': str(e)}, 'persisted': False}
@@ -0,0 +1,128 @@
+import time
+import numpy as np
+
+class AnomalyDetector:
+    """在线异常检测
+
+    对 (工作负载 × 指标) 矩阵维护 EWMA 均值和 EWMVar 方差，每个周期一次 NumPy 运算完成
+    z 分数计算和状态更新；只在指标由正常变为异常时产生事件，持续异常不重复上报。
+    设置 seasonal_buckets 后按时间分桶（如一天 24 个小时桶）分别维护基线
+    """
+
+    def __init__(self, metrics=('cpu_usage', 'memory_usage'), alpha=0.1, threshold=3.0, warmup=10,
+                 min_std=1.0, seasonal_buckets=None, bucket_seconds=3600, clock=time.time):
+        self.metrics = tuple(metrics)
+        self.alpha = alpha
+        self.threshold = threshold  # z 分数阈值
+        self.warmup = warmup        # 基线样本数达到后才判断
+        self.min_std = min_std      # 标准差下限，避免平稳指标的微小波动被判为异常
+        self.seasonal_buckets = seasonal_buckets
+        self.bucket_seconds = bucket_seconds
+        self.clock = clock
+        self._slot = {}  # 工作负载ID -> 状态行
+        self._ids = []
+        buckets = seasonal_buckets or 1
+        n_metrics = len(self.metrics)
+        self._mean = np.zeros((buckets, 0, n_metrics))
+        self._var = np.zeros((buckets, 0, n_metrics))
+        self._count = np.zeros((buckets, 0, n_metrics), dtype=np.int64)
+        self._active = np.zeros((0, n_metrics), dtype=bool)
+
+    def update(self, workload_ids, values, timestamp=None):
+        """更新一个周期的指标矩阵，返回新出现的异常列表
+
+        values 为 (工作负载数, 指标数) 矩阵，缺失值用 NaN 表示
+        """
+        timestamp = self.clock() if timestamp is None else timestamp
+        values = np.asarray(values, dtype=float).reshape(len(workload_ids), len(self.metrics))
+        rows = self._rows(workload_ids)
+        bucket = self._bucket(timestamp)
+
+        mean = self._mean[bucket, rows]
+        var = self._var[bucket, rows]
+        count = self._count[bucket, rows]
+        valid = ~np.isnan(values)
+
+        std = np.sqrt(np.maximum(var, self.min_std ** 2))
+        zscore = np.where(valid, (values - mean) / std, 0.0)
+        anomalous = valid & (count >= self.warmup) & (np.abs(zscore) > self.threshold)
+        active = self._active[rows]
+        new = anomalous & ~active
+        self._active[rows] = np.where(valid, anomalous, active)
+
+        # 预热期内按累计均值更新，之后按固定 alpha 指数加权；
+        # 预热后偏差截断到阈值范围内，异常值只能缓慢拉动基线
+        alpha = np.maximum(self.alpha, 1.0 / (count + 1))
+        diff = np.where(valid, values - mean, 0.0)
+        bound = np.where(count >= self.warmup, self.threshold * std, np.inf)
+        diff = np.clip(diff, -bound, bound)
+        increment = alpha * diff
+        self._mean[bucket, rows] = mean + increment
+        self._var[bucket, rows] = np.where(valid, (1 - alpha) * (var + diff * increment), var)
+        self._count[bucket, rows] = count + valid
+
+        return [
+            {
+                'workload_id': workload_ids[i],
+                'metric': self.metrics[j],
+                'value': float(values[i, j]),
+                'zscore': float(zscore[i, j]),
+                'timestamp': timestamp
+            }
+            for i, j in zip(*np.nonzero(new))
+        ]
+
+    def update_one(self, workload_id, metrics, timestamp=None):
+        """更新单个工作负载的一组指标（字典）"""
+        row = [[metrics.get(name, np.nan) for name in self.metrics]]
+        return self.update([workload_id], row, timestamp)
+
+    def is_anomalous(self, workload_id):
+        """工作负载当前是否处于异常状态"""
+        row = self._slot.get(workload_id)
+        return row is not None and bool(self._active[row].any())
+
+    def get_baseline(self, workload_id, timestamp=None):
+        """返回工作负载当前时间桶的基线 {指标: (均值, 标准差)}"""
+        row = self._slot.get(workload_id)
+        if row is None:
+            return None
+        bucket = self._bucket(self.clock() if timestamp is None else timestamp)
+        return {
+            metric: (float(self._mean[bucket, row, j]), float(np.sqrt(self._var[bucket, row, j])))
+            for j, metric in enumerate(self.metrics)
+        }
+
+    def reset(self, workload_id):
+        """清除工作负载的基线和异常状态"""
+        row = self._slot.get(workload_id)
+        if row is None:
+            return False
+        self._mean[:, row] = 0
+        self._var[:, row] = 0
+        self._count[:, row] = 0
+        self._active[row] = False
+        return True
+
+    def _bucket(self, timestamp):
+        """时间对应的季节桶"""
+        if not self.seasonal_buckets:
+            return 0
+        return int(timestamp // self.bucket_seconds) % self.seasonal_buckets
+
+    def _rows(self, workload_ids):
+        """工作负载ID映射为状态行号，新工作负载按需扩容"""
+        slot = self._slot
+        for workload_id in workload_ids:
+            if workload_id not in slot:
+                slot[workload_id] = len(self._ids)
+                self._ids.append(workload_id)
+        capacity = self._active.shape[0]
+        if len(slot) > capacity:
+            extra = max(16, len(slot) - capacity, capacity)
+            self._mean = np.pad(self._mean, ((0, 0), (0, extra), (0, 0)))
+            self._var = np.pad(self._var, ((0, 0), (0, extra), (0, 0)))
+            self._count = np.pad(self._count, ((0, 0), (0, extra), (0, 0)))
+            self._active = np.pad(self._active, ((0, extra), (0, 0)))
+        return np.fromiter((slot[workload_id] for workload_id in workload_ids),
+                           dtype=np.int64, count=len(workload_ids))
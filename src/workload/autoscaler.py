@@ -1,79 +1,346 @@
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 import numpy as np
 
+class ScaleEventRing:
+    """定长扩缩容事件环，写满后覆盖最旧事件"""
+
+    DTYPE = np.dtype([
+        ('timestamp', 'f8'), ('row', 'i8'), ('direction', 'i1'), ('cpu', 'f8'), ('memory', 'f8')
+    ])
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.events = np.zeros(capacity, dtype=self.DTYPE)
+        self.count = 0  # 累计写入次数
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def extend(self, timestamp, rows, directions, cpu, memory):
+        """批量写入事件"""
+        n = len(rows)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # 只保留最新的 capacity 条
+            rows, directions, cpu, memory = rows[-self.capacity:], directions[-self.capacity:], \
+                cpu[-self.capacity:], memory[-self.capacity:]
+            self.count += n - self.capacity
+            n = self.capacity
+        positions = (self.count + np.arange(n)) % self.capacity
+        self.events['timestamp'][positions] = timestamp
+        self.events['row'][positions] = rows
+        self.events['direction'][positions] = directions
+        self.events['cpu'][positions] = cpu
+        self.events['memory'][positions] = memory
+        self.count += n
+
+    def ordered(self):
+        """按写入顺序返回事件"""
+        n = len(self)
+        positions = (np.arange(self.count - n, self.count)) % self.capacity
+        return self.events[positions]
+
+
+class PredictivePolicy:
+    """预测式比例扩缩容策略
+
+    每个工作负载、每个指标维护 Holt 线性平滑（水平 + 趋势）和预测残差的指数加权方差；
+    新限制 = (短期预测 + z × 残差标准差) / 目标利用率，一步调整到位。
+    使用率接近上限时实际需求不可见，按 saturation_boost 放大观测值
+    """
+
+    def __init__(self, target_utilization=0.6, horizon=2, alpha=0.5, beta=0.3, variance_decay=0.1,
+                 confidence_z=1.64, deadband=0.25, max_step_down=0.5, saturation=95,
+                 saturation_boost=1.5, min_limits=(0.1, 64)):
+        self.target_utilization = target_utilization
+        self.horizon = horizon  # 预测步数（以扩缩容周期计）
+        self.alpha = alpha
+        self.beta = beta
+        self.variance_decay = variance_decay
+        self.confidence_z = confidence_z
+        self.deadband = deadband  # 相对变化小于该比例时保持不变
+        self.max_step_down = max_step_down  # 单次缩容最多减少的比例
+        self.saturation = saturation
+        self.saturation_boost = saturation_boost
+        self.min_limits = np.asarray(min_limits, dtype=float)
+        self._level = np.zeros((0, 2))
+        self._trend = np.zeros((0, 2))
+        self._variance = np.zeros((0, 2))
+        self._seen = np.zeros(0, dtype=bool)
+
+    def propose(self, rows, metrics, current_limits):
+        """根据使用率矩阵和当前限制计算建议限制"""
+        self._ensure_rows(rows.max() + 1 if len(rows) else 0)
+        observed = metrics / 100 * current_limits
+        saturated = metrics >= self.saturation
+        observed = np.where(saturated, observed * self.saturation_boost, observed)
+
+        forecast = self._update(rows, observed)
+        upper = forecast + self.confidence_z * np.sqrt(self._variance[rows])
+        target = np.maximum(upper / self.target_utilization, self.min_limits)
+        target = np.maximum(target, current_limits * (1 - self.max_step_down))
+
+        within_deadband = np.abs(target - current_limits) <= self.deadband * current_limits
+        return np.where(within_deadband, current_limits, target)
+
+    def _update(self, rows, observed):
+        """更新平滑状态并返回 horizon 步后的预测"""
+        seen = self._seen[rows]
+        level = self._level[rows]
+        trend = self._trend[rows]
+        variance = self._variance[rows]
+
+        error = observed - (level + trend)
+        new_level = self.alpha * observed + (1 - self.alpha) * (level + trend)
+        new_trend = self.beta * (new_level - level) + (1 - self.beta) * trend
+        new_variance = (1 - self.variance_decay) * variance + self.variance_decay * error ** 2
+
+        first = ~seen[:, None]
+        self._level[rows] = np.where(first, observed, new_level)
+        self._trend[rows] = np.where(first, 0.0, new_trend)
+        self._variance[rows] = np.where(first, 0.0, new_variance)
+        self._seen[rows] = True
+        return np.maximum(self._level[rows] + self.horizon * self._trend[rows], 0.0)
+
+    def forget(self, row):
+        """清除状态行，行被复用时重新初始化"""
+        if row < len(self._seen):
+            self._seen[row] = False
+
+    def _ensure_rows(self, n):
+        """按需扩容状态数组"""
+        if n <= len(self._seen):
+            return
+        extra = max(16, n - len(self._seen), len(self._seen))
+        self._level = np.pad(self._level, ((0, extra), (0, 0)))
+        self._trend = np.pad(self._trend, ((0, extra), (0, 0)))
+        self._variance = np.pad(self._variance, ((0, extra), (0, 0)))
+        self._seen = np.pad(self._seen, (0, extra))
+
+
 class AutoScaler:
-    def __init__(self, resource_limiter):
+    """自动扩缩容
+
+    每个工作负载一行状态（上次扩缩容时间），工作负载结束后 forget 归还状态行供复用；
+    扩缩容事件写入定长环；
+    scale_fleet 对所有工作负载的指标矩阵一次性计算方向、冷却和新限制，并批量下发。
+    policy 为空时按阈值和固定倍数调整，也可以使用 PredictivePolicy
+    """
+
+    METRICS = ('cpu_usage', 'memory_usage')
+
+    def __init__(self, resource_limiter, history_size=4096, clock=time.time, policy=None):
         self.resource_limiter = resource_limiter
+        self.policy = policy
         self.logger = logging.getLogger(__name__)
         self.scale_cooldown = 300  # 5分钟冷却时间
-        self.last_scale = {}
-        self.scale_history = {}
-        
+        self.scale_up_threshold = 80
+        self.scale_down_threshold = 20
+        self.scale_up_factor = 1.5
+        self.scale_down_factor = 0.75
+        self.clock = clock
+        self.scale_history = ScaleEventRing(history_size)
+        self._slot = {}   # 工作负载ID -> 状态行
+        self._ids = []    # 状态行 -> 工作负载ID，已归还的行为 None
+        self._free_rows = []  # 已归还、可复用的状态行
+        self._last_scale = np.full(0, -np.inf)
+
     def check_and_scale(self, workload_id, metrics):
         """检查并执行自动扩缩容"""
+        if self.policy is not None:
+            row = [[metrics.get(name, 0) for name in self.METRICS]]
+            result = self.scale_fleet([workload_id], row).get(workload_id)
+            return bool(result and result['success'])
+
         if not self._can_scale(workload_id):
             return False
-            
+
         scale_decision = self._make_scale_decision(metrics)
         if scale_decision == 0:
             return False
-            
+
         return self._execute_scaling(workload_id, scale_decision)
-        
+
+    def scale_fleet(self, workload_ids, metrics, current_limits=None, now=None):
+        """批量扩缩容
+
+        metrics 为 (工作负载数, 2) 矩阵，列依次为 cpu_usage、memory_usage；
+        current_limits 为同形状的 (cpu, memory) 矩阵，为空时从 resource_limiter 读取。
+        返回 {工作负载ID: {'direction', 'limits', 'success'}}，只包含发生调整的工作负载
+        """
+        now = self.clock() if now is None else now
+        metrics = np.asarray(metrics, dtype=float).reshape(len(workload_ids), len(self.METRICS))
+        rows = self._rows(workload_ids)
+        if current_limits is None:
+            current_limits = self._gather_limits(workload_ids)
+        current_limits = np.asarray(current_limits, dtype=float).reshape(len(workload_ids), 2)
+
+        # 没有已知限制的工作负载无法按比例调整
+        known = ~np.isnan(current_limits).any(axis=1)
+        proposed = self._propose(rows[known], metrics[known], current_limits[known])
+        direction = np.zeros(len(workload_ids), dtype=np.int8)
+        direction[known] = np.where((proposed > current_limits[known]).any(axis=1), 1,
+                                    np.where((proposed < current_limits[known]).any(axis=1), -1, 0))
+        all_proposed = np.array(current_limits)
+        all_proposed[known] = proposed
+
+        eligible = now - self._last_scale[rows] > self.scale_cooldown
+        changed = np.flatnonzero((direction != 0) & eligible)
+        if len(changed) == 0:
+            return {}
+        new_limits = all_proposed[changed]
+
+        changed_ids = [workload_ids[i] for i in changed]
+        results = self.resource_limiter.apply_limits_many({
+            workload_id: {'cpu': float(cpu), 'memory': float(memory)}
+            for workload_id, (cpu, memory) in zip(changed_ids, new_limits)
+        })
+
+        succeeded = np.fromiter(
+            (results.get(workload_id, {}).get('success', False) for workload_id in changed_ids),
+            dtype=bool, count=len(changed_ids)
+        )
+        applied_rows = rows[changed][succeeded]
+        self._last_scale[applied_rows] = now
+        self.scale_history.extend(
+            now, applied_rows, direction[changed][succeeded],
+            new_limits[succeeded, 0], new_limits[succeeded, 1]
+        )
+
+        return {
+            workload_id: {
+                'direction': int(direction[i]),
+                'limits': {'cpu': float(new_limits[k, 0]), 'memory': float(new_limits[k, 1])},
+                'success': bool(succeeded[k])
+            }
+            for k, (i, workload_id) in enumerate(zip(changed, changed_ids))
+        }
+
+    def forget(self, workload_id):
+        """工作负载结束后归还状态行，并丢弃该行的扩缩容事件"""
+        row = self._slot.pop(workload_id, None)
+        if row is None:
+            return False
+        self._ids[row] = None
+        self._last_scale[row] = -np.inf
+        events = self.scale_history.events
+        events['row'][events['row'] == row] = -1
+        if self.policy is not None and hasattr(self.policy, 'forget'):
+            self.policy.forget(row)
+        self._free_rows.append(row)
+        return True
+
+    def get_scale_history(self, workload_id=None):
+        """按时间顺序返回扩缩容事件"""
+        events = self.scale_history.ordered()
+        if workload_id is not None:
+            row = self._slot.get(workload_id)
+            if row is None:
+                return []
+            events = events[events['row'] == row]
+        else:
+            events = events[events['row'] >= 0]
+        return [
+            {
+                'workload_id': self._ids[event['row']],
+                'timestamp': datetime.fromtimestamp(event['timestamp']),
+                'direction': int(event['direction']),
+                'new_limits': {'cpu': float(event['cpu']), 'memory': float(event['memory'])}
+            }
+            for event in events
+        ]
+
     def _can_scale(self, workload_id):
         """检查是否可以进行扩缩容"""
-        if workload_id not in self.last_scale:
+        row = self._slot.get(workload_id)
+        if row is None:
             return True
-            
-        cooldown_passed = datetime.now() - self.last_scale[workload_id] > timedelta(seconds=self.scale_cooldown)
-        return cooldown_passed
-        
+        return self.clock() - self._last_scale[row] > self.scale_cooldown
+
+    def _propose(self, rows, metrics, current_limits):
+        """计算建议限制"""
+        if self.policy is not None:
+            return self.policy.propose(rows, metrics, current_limits)
+        direction = self._decide(metrics)
+        factor = np.where(direction > 0, self.scale_up_factor,
+                          np.where(direction < 0, self.scale_down_factor, 1.0))
+        return current_limits * factor[:, None]
+
+    def _decide(self, metrics):
+        """向量化计算扩缩容方向：1 扩容，-1 缩容，0 不变"""
+        cpu_usage = metrics[:, 0]
+        memory_usage = metrics[:, 1]
+        scale_up = (cpu_usage > self.scale_up_threshold) | (memory_usage > self.scale_up_threshold)
+        scale_down = (cpu_usage < self.scale_down_threshold) & (memory_usage < self.scale_down_threshold)
+        return np.where(scale_up, 1, np.where(scale_down, -1, 0)).astype(np.int8)
+
     def _make_scale_decision(self, metrics):
         """决定扩缩容行为"""
-        cpu_usage = metrics.get('cpu_usage', 0)
-        memory_usage = metrics.get('memory_usage', 0)
-        
-        # 扩容条件
-        if cpu_usage > 80 or memory_usage > 80:
-            return 1
-        # 缩容条件
-        elif cpu_usage < 20 and memory_usage < 20:
-            return -1
-        return 0
-        
+        row = np.array([[metrics.get(name, 0) for name in self.METRICS]], dtype=float)
+        return int(self._decide(row)[0])
+
     def _execute_scaling(self, workload_id, scale_direction):
         """执行扩缩容"""
         try:
             current_limits = self.resource_limiter.get_resource_limits(workload_id)
+            if not current_limits or current_limits.get('cpu') is None or current_limits.get('memory') is None:
+                # 没有已知上限时无法按比例调整
+                return False
             new_limits = self._calculate_new_limits(current_limits, scale_direction)
-            
+
             success = self.resource_limiter.apply_limits(workload_id, new_limits)
             if success:
-                self.last_scale[workload_id] = datetime.now()
                 self._record_scaling(workload_id, scale_direction, new_limits)
-                
+
             return success
-            
+
         except Exception as e:
             self.logger.error(f"执行扩缩容失败: {e}")
             return False
-            
+
     def _calculate_new_limits(self, current_limits, scale_direction):
         """计算新的资源限制"""
-        scale_factor = 1.5 if scale_direction > 0 else 0.75
+        scale_factor = self.scale_up_factor if scale_direction > 0 else self.scale_down_factor
         return {
             'cpu': current_limits['cpu'] * scale_factor,
             'memory': current_limits['memory'] * scale_factor
         }
-        
+
     def _record_scaling(self, workload_id, direction, new_limits):
-        """记录扩缩容历史"""
-        if workload_id not in self.scale_history:
-            self.scale_history[workload_id] = []
-            
-        self.scale_history[workload_id].append({
-            'timestamp': datetime.now(),
-            'direction': direction,
-            'new_limits': new_limits
-        })
\ No newline at end of file
+        """记录扩缩容时间和事件"""
+        now = self.clock()
+        row = self._rows([workload_id])
+        self._last_scale[row] = now
+        self.scale_history.extend(
+            now, row, np.array([direction]),
+            np.array([new_limits['cpu']]), np.array([new_limits['memory']])
+        )
+
+    def _gather_limits(self, workload_ids):
+        """从资源限制器读取当前限制，缺失时为 NaN"""
+        limits = np.full((len(workload_ids), 2), np.nan)
+        for i, workload_id in enumerate(workload_ids):
+            current = self.resource_limiter.get_resource_limits(workload_id)
+            if current and current.get('cpu') is not None and current.get('memory') is not None:
+                limits[i] = (current['cpu'], current['memory'])
+        return limits
+
+    def _rows(self, workload_ids):
+        """工作负载ID映射为状态行号，新工作负载按需扩容"""
+        slot = self._slot
+        for workload_id in workload_ids:
+            if workload_id not in slot:
+                if self._free_rows:
+                    row = slot[workload_id] = self._free_rows.pop()
+                    self._ids[row] = workload_id
+                else:
+                    slot[workload_id] = len(self._ids)
+                    self._ids.append(workload_id)
+        if len(self._ids) > len(self._last_scale):
+            extra = max(16, len(self._ids) - len(self._last_scale), len(self._last_scale))
+            self._last_scale = np.pad(self._last_scale, (0, extra), constant_values=-np.inf)
+        return np.fromiter((slot[workload_id] for workload_id in workload_ids),
+                           dtype=np.int64, count=len(workload_ids))
@@ -0,0 +1,110 @@
+import logging
+import os
+import time
+
+class CgroupLimitBackend:
+    """直接写入 cgroup v2 接口文件的资源限制后端
+
+    cpu.max 写入 “配额 周期”，memory.max 写入字节数，memory.swap.max 控制交换；
+    写入后回读校验，内核会把内存上限按页大小向下取整
+    """
+
+    MIN_CPU_QUOTA = 1000  # 内核允许的最小 CPU 配额（微秒）
+
+    def __init__(self, root='/sys/fs/cgroup', path_template='system.slice/docker-{workload_id}.scope',
+                 cpu_period=100000, swap_max=0):
+        self.root = root
+        self.path_template = path_template
+        self.cpu_period = cpu_period
+        self.swap_max = swap_max  # 0 表示禁用交换，None 表示不修改
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self.paths = {}  # 工作负载ID -> 显式登记的 cgroup 目录
+        self.logger = logging.getLogger(__name__)
+
+    def register(self, workload_id, path):
+        """登记工作负载的 cgroup 目录，path 为相对 root 的路径"""
+        self.paths[workload_id] = os.path.join(self.root, path)
+
+    def cgroup_path(self, workload_id):
+        """工作负载的 cgroup 目录"""
+        path = self.paths.get(workload_id)
+        if path is None:
+            path = os.path.join(self.root, self.path_template.format(workload_id=workload_id))
+        return path
+
+    def write_limits(self, workload_id, limits):
+        """写入限制并回读校验，失败时抛出异常"""
+        path = self.cgroup_path(workload_id)
+        files = self._render(limits)
+        for name, value in files.items():
+            self._write(os.path.join(path, name), value)
+        self._verify(path, files)
+
+    def write_many(self, limits_by_workload):
+        """批量写入，返回 {工作负载ID: (是否成功, 耗时)}"""
+        results = {}
+        for workload_id, limits in limits_by_workload.items():
+            start = time.perf_counter()
+            try:
+                self.write_limits(workload_id, limits)
+                success = True
+            except Exception as e:
+                self.logger.error(f"写入工作负载 {workload_id} 的 cgroup 限制失败: {e}")
+                success = False
+            results[workload_id] = (success, time.perf_counter() - start)
+        return results
+
+    def read_limits(self, workload_id):
+        """读取当前限制，无上限时对应值为 None"""
+        path = self.cgroup_path(workload_id)
+        quota, period = self._read(os.path.join(path, 'cpu.max')).split()
+        memory = self._read(os.path.join(path, 'memory.max'))
+        return {
+            'cpu': None if quota == 'max' else int(quota) / int(period),
+            'memory': None if memory == 'max' else int(memory) // (1024 * 1024)
+        }
+
+    def _render(self, limits):
+        """把限制转换为接口文件内容"""
+        cpu = limits.get('cpu')
+        memory = limits.get('memory')
+        # None 表示不限制；0 或负数不能当作不限制
+        if cpu is not None and cpu <= 0:
+            raise ValueError(f"CPU 限制必须为正数: {cpu}")
+        if memory is not None and memory <= 0:
+            raise ValueError(f"内存限制必须为正数: {memory}")
+        quota = 'max' if cpu is None else max(int(cpu * self.cpu_period), self.MIN_CPU_QUOTA)
+        files = {
+            'cpu.max': f"{quota} {self.cpu_period}",
+            'memory.max': 'max' if memory is None else str(int(memory * 1024 * 1024))
+        }
+        if self.swap_max is not None:
+            files['memory.swap.max'] = str(self.swap_max)
+        return files
+
+    def _verify(self, path, files):
+        """回读校验写入结果"""
+        for name, expected in files.items():
+            actual = self._read(os.path.join(path, name))
+            if actual == expected:
+                continue
+            if name == 'memory.max' and expected != 'max' and actual != 'max':
+                # 内核按页对齐内存上限
+                if int(expected) - self.page_size < int(actual) <= int(expected):
+                    continue
+            raise ValueError(f"{name} 校验失败: 期望 {expected}，实际 {actual}")
+
+    @staticmethod
+    def _write(file_path, value):
+        """单次写入接口文件"""
+        fd = os.open(file_path, os.O_WRONLY | os.O_TRUNC)
+        try:
+            os.write(fd, value.encode())
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _read(file_path):
+        """读取接口文件内容"""
+        with open(file_path) as f:
+            return f.read().strip()
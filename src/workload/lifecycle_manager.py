@@ -5,11 +5,13 @@ from .resource_limiter import ResourceLimiter
 from .workload_monitor import WorkloadMonitor
 
 class WorkloadLifecycleManager:
-    def __init__(self, workload_manager):
+    def __init__(self, workload_manager, config=None, resource_limiter=None):
         self.workload_manager = workload_manager
         self.scheduler = WorkloadScheduler(workload_manager)
-        self.resource_limiter = ResourceLimiter()
-        self.monitor = WorkloadMonitor(workload_manager)
+        # 按 resources.limit_backend 选择 Docker 或 cgroup 后端
+        self.resource_limiter = resource_limiter or ResourceLimiter.from_config(config or {})
+        # 监控器的自动扩缩容共用同一个资源限制器，释放资源时一并清除限制缓存
+        self.monitor = WorkloadMonitor(workload_manager, config=config, resource_limiter=self.resource_limiter)
         self.logger = logging.getLogger(__name__)
         
     def submit_workload(self, workload_id, requirements, priority='normal'):
@@ -60,6 +62,9 @@ class WorkloadLifecycleManager:
         try:
             # 更新状态
             self.workload_manager.update_workload_status(workload_id, 'stopping')
+
+            # 停止监控
+            self.monitor.stop_monitoring(workload_id)
             
             # 释放资源
             self.resource_limiter.release_resources(workload_id)
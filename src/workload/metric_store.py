@@ -0,0 +1,201 @@
+from collections import deque
+from collections.abc import Mapping
+import numpy as np
+
+class MetricRingStore:
+    """所有工作负载共享的定长指标环形缓冲区
+
+    每个工作负载占用二维数组中的一行（槽位），每个指标一个定长环；
+    累计和维护均值，单调队列维护窗口内最小/最大值，统计查询 O(1)。
+    缺失的指标记为 NaN，不计入累计和、最小/最大值和返回的样本
+    """
+
+    def __init__(self, metrics=('cpu_usage', 'memory_usage'), capacity=100, initial_slots=64):
+        self.metric_names = tuple(metrics)
+        self.metric_index = {name: i for i, name in enumerate(self.metric_names)}
+        self.capacity = capacity
+        n_metrics = len(self.metric_names)
+
+        self.values = np.zeros((initial_slots, n_metrics, capacity))
+        self.timestamps = np.zeros((initial_slots, capacity))
+        self.sequence = np.zeros(initial_slots, dtype=np.int64)  # 累计写入次数
+        self.counts = np.zeros(initial_slots, dtype=np.int64)    # 当前环内样本数
+        self.sums = np.zeros((initial_slots, n_metrics))
+        self.valid = np.zeros((initial_slots, n_metrics), dtype=np.int64)  # 环内各指标的有效样本数
+        self._min_queues = [None] * initial_slots
+        self._max_queues = [None] * initial_slots
+        self._free_slots = list(range(initial_slots - 1, -1, -1))
+
+    def allocate(self):
+        """分配一个空槽位"""
+        if not self._free_slots:
+            self._grow()
+        slot = self._free_slots.pop()
+        self.sequence[slot] = 0
+        self.counts[slot] = 0
+        self.sums[slot] = 0
+        self.valid[slot] = 0
+        n_metrics = len(self.metric_names)
+        self._min_queues[slot] = [deque() for _ in range(n_metrics)]
+        self._max_queues[slot] = [deque() for _ in range(n_metrics)]
+        return slot
+
+    def release(self, slot):
+        """释放槽位"""
+        self._min_queues[slot] = None
+        self._max_queues[slot] = None
+        self._free_slots.append(slot)
+
+    def append(self, slot, metrics, timestamp):
+        """写入一组指标"""
+        seq = int(self.sequence[slot])
+        pos = seq % self.capacity
+        if self.counts[slot] == self.capacity:
+            # 覆盖最旧样本前先从累计和中扣除
+            self._subtract(slot, pos)
+        else:
+            self.counts[slot] += 1
+
+        for name, i in self.metric_index.items():
+            value = metrics.get(name)
+            value = np.nan if value is None else float(value)
+            self.values[slot, i, pos] = value
+            if np.isnan(value):
+                continue
+            self.sums[slot, i] += value
+            self.valid[slot, i] += 1
+            min_queue = self._min_queues[slot][i]
+            while min_queue and min_queue[-1][1] >= value:
+                min_queue.pop()
+            min_queue.append((seq, value))
+            max_queue = self._max_queues[slot][i]
+            while max_queue and max_queue[-1][1] <= value:
+                max_queue.pop()
+            max_queue.append((seq, value))
+        self.timestamps[slot, pos] = timestamp
+        self.sequence[slot] = seq + 1
+        self._evict_queues(slot)
+
+        # 定期重算累计和，避免浮点误差累积
+        if (seq + 1) % (self.capacity * 64) == 0:
+            self._resum(slot)
+
+    def expire(self, slot, cutoff):
+        """删除时间早于 cutoff 的样本，返回删除数量"""
+        removed = 0
+        seq = int(self.sequence[slot])
+        while self.counts[slot] > 0:
+            pos = (seq - int(self.counts[slot])) % self.capacity
+            if self.timestamps[slot, pos] >= cutoff:
+                break
+            self._subtract(slot, pos)
+            self.counts[slot] -= 1
+            removed += 1
+        if removed:
+            self._evict_queues(slot)
+            if self.counts[slot] == 0:
+                self.sums[slot] = 0
+                self.valid[slot] = 0
+        return removed
+
+    def get_values(self, slot, metric):
+        """按时间顺序返回环内的有效样本"""
+        count = int(self.counts[slot])
+        if count == 0:
+            return []
+        seq = int(self.sequence[slot])
+        positions = np.arange(seq - count, seq) % self.capacity
+        values = self.values[slot, self.metric_index[metric], positions]
+        return values[~np.isnan(values)].tolist()
+
+    def get_stats(self, slot, metric):
+        """O(1) 返回均值、最大值、最小值"""
+        i = self.metric_index[metric]
+        count = int(self.valid[slot, i])
+        if count == 0:
+            return {'avg': 0, 'max': 0, 'min': 0}
+        return {
+            'avg': float(self.sums[slot, i] / count),
+            'max': self._max_queues[slot][i][0][1],
+            'min': self._min_queues[slot][i][0][1]
+        }
+
+    def _subtract(self, slot, pos):
+        """从累计和与有效样本数中扣除一个位置的样本"""
+        values = self.values[slot, :, pos]
+        present = ~np.isnan(values)
+        self.sums[slot, present] -= values[present]
+        self.valid[slot] -= present
+
+    def _evict_queues(self, slot):
+        """移除已离开窗口的队首元素"""
+        start = int(self.sequence[slot] - self.counts[slot])
+        for queues in (self._min_queues[slot], self._max_queues[slot]):
+            for queue in queues:
+                while queue and queue[0][0] < start:
+                    queue.popleft()
+
+    def _resum(self, slot):
+        """重新计算累计和"""
+        seq = int(self.sequence[slot])
+        count = int(self.counts[slot])
+        positions = np.arange(seq - count, seq) % self.capacity
+        window = self.values[slot][:, positions]
+        self.sums[slot] = np.nansum(window, axis=1)
+        self.valid[slot] = (~np.isnan(window)).sum(axis=1)
+
+    def _grow(self):
+        """按倍数扩容槽位"""
+        old = len(self.sequence)
+        extra = max(old, 64)
+        self.values = np.concatenate([self.values, np.zeros((extra,) + self.values.shape[1:])])
+        self.timestamps = np.concatenate([self.timestamps, np.zeros((extra, self.capacity))])
+        self.sequence = np.concatenate([self.sequence, np.zeros(extra, dtype=np.int64)])
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+        self.sums = np.concatenate([self.sums, np.zeros((extra, self.sums.shape[1]))])
+        self.valid = np.concatenate([self.valid, np.zeros((extra, self.valid.shape[1]), dtype=np.int64)])
+        self._min_queues.extend([None] * extra)
+        self._max_queues.extend([None] * extra)
+        self._free_slots.extend(range(old + extra - 1, old - 1, -1))
+
+
+class MetricsView(Mapping):
+    """工作负载指标的只读视图，保持 record['metrics']['cpu_usage'] 的访问方式
+
+    槽位释放后视图保留释放时的样本快照，不再读取可能已分配给其他工作负载的槽位
+    """
+    __slots__ = ('store', 'slot', 'execution_time', '_released')
+
+    def __init__(self, store, slot, execution_time=0):
+        self.store = store
+        self.slot = slot
+        self.execution_time = execution_time
+        self._released = None
+
+    def __getitem__(self, key):
+        if key == 'execution_time':
+            return self.execution_time
+        if key in self.store.metric_index:
+            if self.slot is None:
+                return list(self._released[key])
+            return self.store.get_values(self.slot, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self.store.metric_names
+        yield 'execution_time'
+
+    def __len__(self):
+        return len(self.store.metric_names) + 1
+
+    def release(self):
+        """保存样本快照并归还槽位"""
+        if self.slot is None:
+            return
+        self._released = {name: self.store.get_values(self.slot, name) for name in self.store.metric_names}
+        self.store.release(self.slot)
+        self.slot = None
+
+    def to_dict(self):
+        """转换为普通字典"""
+        return {key: self[key] for key in self}
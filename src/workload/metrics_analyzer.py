@@ -1,6 +1,9 @@
+import math
+from collections import deque
 import numpy as np
 from datetime import datetime, timedelta
 import pandas as pd
+from ..analysis.quantile_sketch import P2Quantile
 
 class MetricsAnalyzer:
     def __init__(self):
@@ -59,4 +62,132 @@ class MetricsAnalyzer:
                 'count': len(df[df[metric] > threshold]),
                 'timestamps': df[df[metric] > threshold].index.tolist()
             }
-        return anomalies
\ No newline at end of file
+        return anomalies
+
+class StreamingMetricsAnalyzer:
+    """流式指标分析
+
+    每个样本 O(1) 更新：Welford 维护均值/标准差，协方差递推维护全历史回归斜率
+    （slope_window 设置后改为滑动窗口斜率），定长窗口维护移动平均，
+    EWMA 平滑，P² 草图估计 p95；analyze() 只读取状态，不依赖历史长度
+    """
+
+    def __init__(self, metrics=('cpu_usage', 'memory_usage'), ma_window=12, slope_window=None,
+                 ewma_alpha=0.1, quantile=0.95):
+        self.metrics = tuple(metrics)
+        self.ma_window = ma_window
+        self.slope_window = slope_window
+        self.ewma_alpha = ewma_alpha
+        self.quantile = quantile
+        self.count = 0
+        self._state = {metric: self._new_state() for metric in self.metrics}
+
+    def _new_state(self):
+        """单个指标的流式状态"""
+        return {
+            'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': math.inf, 'max': -math.inf,
+            'x_mean': 0.0, 'x_m2': 0.0, 'co_moment': 0.0,
+            'ma_values': deque(maxlen=self.ma_window), 'ma_sum': 0.0,
+            'slope_values': deque(maxlen=self.slope_window) if self.slope_window else None,
+            'slope_sum': 0.0, 'slope_weighted': 0.0,
+            'ewma': None,
+            'sketch': P2Quantile(self.quantile)
+        }
+
+    def ingest(self, sample):
+        """加入一个样本（包含各指标值的字典）"""
+        x = float(self.count)  # 与批量路径一致，以样本序号为自变量
+        for metric in self.metrics:
+            value = sample.get(metric)
+            if value is None:
+                continue
+            state = self._state[metric]
+            state['count'] += 1
+            self._update(state, float(value), x, state['count'])
+        self.count += 1
+
+    def ingest_many(self, samples):
+        """批量加入样本"""
+        for sample in samples:
+            self.ingest(sample)
+
+    def _update(self, state, y, x, n):
+        """更新单个指标"""
+        # Welford 均值和方差
+        delta = y - state['mean']
+        state['mean'] += delta / n
+        state['m2'] += delta * (y - state['mean'])
+        state['min'] = min(state['min'], y)
+        state['max'] = max(state['max'], y)
+
+        # 全历史回归斜率的协方差递推
+        dx = x - state['x_mean']
+        state['x_mean'] += dx / n
+        state['x_m2'] += dx * (x - state['x_mean'])
+        state['co_moment'] += dx * (y - state['mean'])
+
+        # 移动平均
+        ma_values = state['ma_values']
+        if len(ma_values) == self.ma_window:
+            state['ma_sum'] -= ma_values[0]
+        ma_values.append(y)
+        state['ma_sum'] += y
+
+        # 滑动窗口斜率：维护 Σy 与 Σ(j·y)，j 为窗口内位置
+        slope_values = state['slope_values']
+        if slope_values is not None:
+            if len(slope_values) == self.slope_window:
+                oldest = slope_values[0]
+                state['slope_weighted'] -= state['slope_sum'] - oldest
+                state['slope_sum'] -= oldest
+            # 新样本位于窗口末尾（deque 追加时自动移除最旧样本）
+            state['slope_weighted'] += min(len(slope_values), self.slope_window - 1) * y
+            state['slope_sum'] += y
+            slope_values.append(y)
+
+        state['ewma'] = y if state['ewma'] is None else \
+            self.ewma_alpha * y + (1 - self.ewma_alpha) * state['ewma']
+        state['sketch'].add(y)
+
+        # 定期重算累计和，避免浮点误差累积
+        if n % 4096 == 0:
+            state['ma_sum'] = math.fsum(ma_values)
+            if slope_values is not None:
+                state['slope_sum'] = math.fsum(slope_values)
+                state['slope_weighted'] = math.fsum(j * v for j, v in enumerate(slope_values))
+
+    def _slope(self, state):
+        """当前回归斜率"""
+        slope_values = state['slope_values']
+        if slope_values is None:
+            return state['co_moment'] / state['x_m2'] if state['x_m2'] > 0 else 0.0
+        n = len(slope_values)
+        if n < 2:
+            return 0.0
+        sum_j = n * (n - 1) / 2
+        sum_j2 = (n - 1) * n * (2 * n - 1) / 6
+        return (n * state['slope_weighted'] - sum_j * state['slope_sum']) / (n * sum_j2 - sum_j * sum_j)
+
+    def analyze(self):
+        """返回当前统计结果，O(1)"""
+        basic_stats = {}
+        trends = {}
+        for metric, state in self._state.items():
+            n = state['count']
+            ma_values = state['ma_values']
+            basic_stats[metric] = {
+                'mean': state['mean'] if n else None,
+                'std': math.sqrt(state['m2'] / (n - 1)) if n > 1 else None,  # 与 pandas 一致（ddof=1）
+                'min': state['min'] if n else None,
+                'max': state['max'] if n else None,
+                'p95': state['sketch'].value()
+            }
+            slope = self._slope(state)
+            trends[metric] = {
+                'slope': slope,
+                'trend': 'increasing' if slope > 0.1 else 'decreasing' if slope < -0.1 else 'stable',
+                'moving_average': state['ma_sum'] / len(ma_values)
+                if len(ma_values) == self.ma_window else None,
+                'ewma': state['ewma']
+            }
+        return {'basic_stats': basic_stats, 'trends': trends, 'count': self.count}
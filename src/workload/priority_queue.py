@@ -1,37 +1,125 @@
 import heapq
-from datetime import datetime
+import itertools
 import logging
 
 class WorkloadPriorityQueue:
+    """可按工作负载ID取消、调整优先级的优先级队列
+
+    堆条目为 [负优先级, 序号, 工作负载ID, 资源需求, 是否有效]；
+    删除和调整只把旧条目标记为无效（惰性删除），序号单调递增保证同优先级先进先出
+    """
+
     def __init__(self):
         self.queue = []
+        self.entries = {}  # 工作负载ID -> 堆条目
         self.priority_levels = {
             'high': 3,
             'normal': 2,
             'low': 1
         }
+        self._counter = itertools.count()
+        self._stale = 0
         self.logger = logging.getLogger(__name__)
-        
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, workload_id):
+        return workload_id in self.entries
+
     def enqueue(self, workload_id, priority, requirements):
-        """将工作负载加入队列"""
+        """将工作负载加入队列，已在队列中时更新其优先级"""
         try:
-            priority_value = self.priority_levels.get(priority, 1)
-            timestamp = datetime.now().timestamp()
-            
+            if workload_id in self.entries:
+                self._invalidate(workload_id)
+                self._compact()
+            entry = self._make_entry(workload_id, priority, requirements)
+            self.entries[workload_id] = entry
+
             # 使用负优先级确保高优先级在前
-            heapq.heappush(self.queue, (-priority_value, timestamp, workload_id, requirements))
+            heapq.heappush(self.queue, entry)
             return True
         except Exception as e:
             self.logger.error(f"加入队列失败: {e}")
             return False
-            
-    def dequeue(self):
-        """获取最高优先级的工作负载"""
+
+    def bulk_enqueue(self, items):
+        """批量加入队列，items 为 (workload_id, priority, requirements) 序列"""
+        try:
+            count = 0
+            for workload_id, priority, requirements in items:
+                if workload_id in self.entries:
+                    self._invalidate(workload_id)
+                entry = self._make_entry(workload_id, priority, requirements)
+                self.entries[workload_id] = entry
+                self.queue.append(entry)
+                count += 1
+            # 追加后一次性堆化，代价 O(n + k)
+            heapq.heapify(self.queue)
+            return count
+        except Exception as e:
+            self.logger.error(f"批量加入队列失败: {e}")
+            return 0
+
+    def update_priority(self, workload_id, priority):
+        """调整队列中工作负载的优先级"""
+        entry = self.entries.get(workload_id)
+        if entry is None:
+            return False
+        return self.enqueue(workload_id, priority, entry[3])
+
+    def remove(self, workload_id):
+        """从队列中取消工作负载"""
+        if workload_id not in self.entries:
+            return False
+        self._invalidate(workload_id)
+        self._compact()
+        return True
+
+    def peek(self):
+        """查看最高优先级的工作负载但不出队"""
+        self._discard_stale_head()
         if not self.queue:
             return None
+        _, _, workload_id, requirements, _ = self.queue[0]
+        return workload_id, requirements
+
+    def dequeue(self):
+        """获取最高优先级的工作负载"""
         try:
-            _, _, workload_id, requirements = heapq.heappop(self.queue)
+            self._discard_stale_head()
+            if not self.queue:
+                return None
+            _, _, workload_id, requirements, _ = heapq.heappop(self.queue)
+            del self.entries[workload_id]
             return workload_id, requirements
         except Exception as e:
             self.logger.error(f"出队列失败: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def _make_entry(self, workload_id, priority, requirements):
+        """构造堆条目"""
+        if isinstance(priority, str):
+            priority_value = self.priority_levels.get(priority, 1)
+        else:
+            priority_value = priority
+        return [-priority_value, next(self._counter), workload_id, requirements, True]
+
+    def _invalidate(self, workload_id):
+        """标记条目无效"""
+        entry = self.entries.pop(workload_id)
+        entry[4] = False
+        self._stale += 1
+
+    def _discard_stale_head(self):
+        """弹出堆顶的无效条目"""
+        while self.queue and not self.queue[0][4]:
+            heapq.heappop(self.queue)
+            self._stale -= 1
+
+    def _compact(self):
+        """无效条目超过一半时重建堆"""
+        if self._stale > 64 and self._stale > len(self.entries):
+            self.queue = [entry for entry in self.queue if entry[4]]
+            heapq.heapify(self.queue)
+            self._stale = 0
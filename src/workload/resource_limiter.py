@@ -1,43 +1,225 @@
 import psutil
 import docker
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .cgroup_limits import CgroupLimitBackend
 
 class ResourceLimiter:
-    def __init__(self):
-        self.docker_client = docker.from_env()
+    """容器资源限制
+
+    缓存每个容器最近一次成功应用的限制，相同限制不再下发；
+    apply_limits_many 通过有界线程池并发下发并返回每个容器的耗时。
+    backend 为空时通过 Docker API 下发，也可以使用直接写 cgroup 的后端
+    """
+
+    def __init__(self, docker_client=None, stats_streamer=None, max_workers=16, backend=None,
+                 fallback_interval=5.0):
+        self.backend = backend
+        # 使用 cgroup 后端时不依赖 Docker 守护进程
+        self.docker_client = docker_client or (docker.from_env() if backend is None else None)
+        self.stats_streamer = stats_streamer  # 配置后从统计流读取使用情况
+        self.fallback_interval = fallback_interval  # 统计流不可用时一次性查询的最小间隔（秒）
+        self._fallback_usage = {}  # 工作负载ID -> (查询时间, 使用情况)
+        self.max_workers = max_workers
+        self.applied_limits = {}  # 工作负载ID -> 最近一次应用的限制
         self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """按配置 resources.limit_backend（docker 或 cgroup）创建"""
+        resources = config.get('resources', {})
+        backend_name = resources.get('limit_backend', 'docker')
+        if backend_name == 'cgroup':
+            backend = CgroupLimitBackend(
+                root=resources.get('cgroup_root', '/sys/fs/cgroup'),
+                path_template=resources.get('cgroup_path_template', 'system.slice/docker-{workload_id}.scope'),
+                swap_max=resources.get('cgroup_swap_max', 0)
+            )
+            return cls(backend=backend, **kwargs)
+        if backend_name != 'docker':
+            raise ValueError(f"未知的资源限制后端: {backend_name}")
+        return cls(**kwargs)
         
     def apply_limits(self, workload_id, limits):
-        """应用资源限制"""
+        """应用资源限制，与已应用的限制相同时直接返回"""
         try:
-            container = self.docker_client.containers.get(workload_id)
-            
-            update_config = {
-                'cpu_period': 100000,
-                'cpu_quota': int(limits['cpu'] * 100000),
-                'memory': limits['memory'] * 1024 * 1024,  # 转换为字节
-                'memory_swap': -1  # 禁用交换
-            }
-            
-            container.update(**update_config)
+            limits = self._normalize(limits)
+            with self._lock:
+                if self.applied_limits.get(workload_id) == limits:
+                    return True
+
+            self._write_limits(workload_id, limits)
+            with self._lock:
+                self.applied_limits[workload_id] = limits
             self.logger.info(f"已为工作负载 {workload_id} 应用资源限制")
             return True
             
         except Exception as e:
             self.logger.error(f"应用资源限制失败: {e}")
             return False
+
+    def apply_limits_many(self, limits_by_workload):
+        """并发应用多个容器的限制，返回 {工作负载ID: {'success', 'skipped', 'latency'}}"""
+        results = {}
+        pending = {}
+        for workload_id, limits in limits_by_workload.items():
+            try:
+                normalized = self._normalize(limits)
+            except Exception as e:
+                self.logger.error(f"资源限制 {workload_id} 无效: {e}")
+                results[workload_id] = {'success': False, 'skipped': False, 'latency': 0.0}
+                continue
+            with self._lock:
+                unchanged = self.applied_limits.get(workload_id) == normalized
+            if unchanged:
+                results[workload_id] = {'success': True, 'skipped': True, 'latency': 0.0}
+            else:
+                pending[workload_id] = normalized
+
+        if self.backend is not None:
+            # 直接写文件只需微秒级，无需线程池
+            for workload_id, (success, latency) in self.backend.write_many(pending).items():
+                if success:
+                    with self._lock:
+                        self.applied_limits[workload_id] = pending[workload_id]
+                results[workload_id] = {'success': success, 'skipped': False, 'latency': latency}
+            return results
+
+        futures = {
+            workload_id: self._get_executor().submit(self._timed_apply, workload_id, limits)
+            for workload_id, limits in pending.items()
+        }
+        for workload_id, future in futures.items():
+            success, latency = future.result()
+            results[workload_id] = {'success': success, 'skipped': False, 'latency': latency}
+        return results
+
+    def get_resource_limits(self, workload_id):
+        """获取容器当前的资源限制，优先使用缓存；未设置上限的维度为 None
+
+        缓存只记录成功下发的限制，读取结果不写入缓存
+        """
+        with self._lock:
+            cached = self.applied_limits.get(workload_id)
+        if cached is not None:
+            return dict(cached)
+        try:
+            return self._read_limits(workload_id)
+        except Exception as e:
+            self.logger.error(f"获取资源限制失败: {e}")
+            return None
+
+    def release_resources(self, workload_id):
+        """释放工作负载的限制缓存和统计流"""
+        with self._lock:
+            self.applied_limits.pop(workload_id, None)
+            self._fallback_usage.pop(workload_id, None)
+        if self.stats_streamer:
+            self.stats_streamer.unwatch(workload_id)
+        return True
+
+    def shutdown(self):
+        """关闭下发线程池"""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _timed_apply(self, workload_id, limits):
+        """应用限制并计时"""
+        start = time.perf_counter()
+        success = self.apply_limits(workload_id, limits)
+        return success, time.perf_counter() - start
+
+    def _get_executor(self):
+        """按需创建下发线程池"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='limit-apply'
+                )
+            return self._executor
+
+    @staticmethod
+    def _normalize(limits):
+        """统一限制格式：cpu 为核数，memory 为 MB，缺失或 None 表示不限制"""
+        cpu = limits.get('cpu')
+        return {'cpu': None if cpu is None else float(cpu), 'memory': limits.get('memory')}
+
+    def _write_limits(self, workload_id, limits):
+        """通过 Docker API 或 cgroup 后端下发限制"""
+        if self.backend is not None:
+            self.backend.write_limits(workload_id, limits)
+            return
+
+        container = self.docker_client.containers.get(workload_id)
+        
+        update_config = {
+            'cpu_period': 100000,
+            'cpu_quota': -1 if limits['cpu'] is None else int(limits['cpu'] * 100000)  # -1 为不限制
+        }
+        if limits['memory'] is not None:
+            # Docker 更新时无法解除已有的内存上限，None 时保持原配置
+            update_config['memory'] = int(limits['memory'] * 1024 * 1024)  # 转换为字节
+            update_config['memory_swap'] = -1  # 禁用交换
+        
+        container.update(**update_config)
+
+    def _read_limits(self, workload_id):
+        """从容器配置或 cgroup 读取当前限制，未设置上限的维度为 None"""
+        if self.backend is not None:
+            return self.backend.read_limits(workload_id)
+
+        container = self.docker_client.containers.get(workload_id)
+        host_config = container.attrs.get('HostConfig', {})
+        period = host_config.get('CpuPeriod') or 100000
+        quota = host_config.get('CpuQuota') or 0
+        nano_cpus = host_config.get('NanoCpus') or 0
+        memory = host_config.get('Memory') or 0
+        if quota > 0:
+            cpu = quota / period
+        else:
+            cpu = nano_cpus / 1e9 if nano_cpus > 0 else None
+        return {
+            'cpu': cpu,
+            'memory': memory // (1024 * 1024) if memory > 0 else None
+        }
             
     def get_resource_usage(self, workload_id):
         """获取资源使用情况"""
         try:
+            if self.stats_streamer:
+                stats = self.stats_streamer.get_stats(workload_id)
+                if stats is not None:
+                    return {
+                        'cpu_usage': stats['cpu_usage'],
+                        'memory_usage': stats['memory_usage'],
+                        'network_io': stats['network_io']
+                    }
+                # 尚未收到数据时开始读取（达到流数量上限时 watch 返回 False）；
+                # 本次退回一次性查询，并按 fallback_interval 限流
+                if not self.stats_streamer.is_watching(workload_id):
+                    self.stats_streamer.watch(workload_id)
+                with self._lock:
+                    cached = self._fallback_usage.get(workload_id)
+                if cached and time.monotonic() - cached[0] < self.fallback_interval:
+                    return dict(cached[1])
+
             container = self.docker_client.containers.get(workload_id)
             stats = container.stats(stream=False)
             
-            return {
+            usage = {
                 'cpu_usage': stats['cpu_stats']['cpu_usage']['total_usage'],
                 'memory_usage': stats['memory_stats']['usage'],
                 'network_io': stats['networks']
             }
+            if self.stats_streamer:
+                with self._lock:
+                    self._fallback_usage[workload_id] = (time.monotonic(), usage)
+            return usage
             
         except Exception as e:
             self.logger.error(f"获取资源使用情况失败: {e}")
@@ -0,0 +1,96 @@
+import math
+
+class TimingWheel:
+    """分层时间轮，用于延迟执行和重试退避
+
+    第 L 层每个槽位覆盖 slots**L 个刻度；到期时间落在当前层范围内才放入该层，
+    低层转完一圈时把上一层对应槽位的条目重新分配到下层（级联）。
+    插入、取消均为 O(1)，到期处理按条目均摊 O(层数)
+    """
+
+    def __init__(self, tick=0.1, slots=256, levels=4, start=0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._overflow = {}  # 超出最大范围的条目
+        self._location = {}  # 条目ID -> 所在槽位字典
+        self._current = math.floor(start / tick)  # 下一个待处理的刻度
+
+    def __len__(self):
+        return len(self._location)
+
+    def __contains__(self, item_id):
+        return item_id in self._location
+
+    def schedule(self, item_id, when, payload=None):
+        """在时间 when 之后触发条目，已存在时覆盖原到期时间"""
+        if item_id in self._location:
+            self.cancel(item_id)
+        deadline = max(math.ceil(when / self.tick), self._current)
+        self._place(item_id, deadline, payload)
+
+    def cancel(self, item_id):
+        """取消条目，返回是否存在"""
+        bucket = self._location.pop(item_id, None)
+        if bucket is None:
+            return False
+        del bucket[item_id]
+        return True
+
+    def get_deadline(self, item_id):
+        """条目的到期时间"""
+        bucket = self._location.get(item_id)
+        if bucket is None:
+            return None
+        return bucket[item_id][0] * self.tick
+
+    def advance(self, now):
+        """推进到时间 now，返回到期的 (条目ID, 附带数据) 列表"""
+        target = math.floor(now / self.tick)
+        due = []
+        while self._current <= target:
+            if not self._location:
+                # 没有待处理条目时直接跳到目标刻度
+                self._current = target + 1
+                break
+            self._cascade()
+            bucket = self._wheels[0][self._current % self.slots]
+            if bucket:
+                for item_id, (_, payload) in bucket.items():
+                    del self._location[item_id]
+                    due.append((item_id, payload))
+                bucket.clear()
+            self._current += 1
+        return due
+
+    def _place(self, item_id, deadline, payload):
+        """按剩余刻度数选择层级和槽位"""
+        delta = deadline - self._current
+        for level in range(self.levels):
+            if delta < self._spans[level + 1]:
+                bucket = self._wheels[level][(deadline // self._spans[level]) % self.slots]
+                break
+        else:
+            bucket = self._overflow
+        bucket[item_id] = (deadline, payload)
+        self._location[item_id] = bucket
+
+    def _cascade(self):
+        """到达层边界时把上层槽位中的条目重新分配，先处理高层"""
+        current = self._current
+        if self._overflow and current % self._spans[self.levels] == 0:
+            self._redistribute(self._overflow)
+        for level in range(self.levels - 1, 0, -1):
+            if current % self._spans[level] == 0:
+                bucket = self._wheels[level][(current // self._spans[level]) % self.slots]
+                if bucket:
+                    self._redistribute(bucket)
+
+    def _redistribute(self, bucket):
+        """重新放置槽位中的全部条目"""
+        items = list(bucket.items())
+        bucket.clear()
+        for item_id, (deadline, payload) in items:
+            self._place(item_id, deadline, payload)
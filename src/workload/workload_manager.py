@@ -1,50 +1,91 @@
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 import json
 import logging
+import threading
 from typing import Dict, Optional
+from .workload_record import WorkloadRecord, WorkloadStateView, status_name, to_epoch
+from .metric_store import MetricRingStore, MetricsView
 
 class WorkloadManager:
     def __init__(self):
+        # 工作负载ID -> WorkloadRecord，生命周期状态直接存放在记录中
         self.workloads = {}
-        self.workload_states = {}
+        self.workload_states = WorkloadStateView(self.workloads)
+        # 所有工作负载共享的指标环形缓冲区，每个负载保留最近100个数据点
+        self.metric_store = MetricRingStore(capacity=100)
+        # 状态索引：status -> 工作负载ID集合，生命周期状态单独索引
+        self.status_index = defaultdict(set)
+        self.state_index = defaultdict(set)
+        # 监控线程和调用方线程都会修改索引和指标环，统一加锁
+        self._lock = threading.RLock()
         self.logger = logging.getLogger(__name__)
         
     def create_workload(self, workload_id, requirements, priority='normal'):
         """创建新工作负载"""
         try:
-            if workload_id in self.workloads:
-                self.logger.warning(f"工作负载 {workload_id} 已存在")
-                return False
-                
-            self.workloads[workload_id] = {
-                'id': workload_id,
-                'requirements': requirements,
-                'created_at': datetime.now(),
-                'status': 'pending',
-                'retries': 0,
-                'priority': priority,
-                'metrics': {
-                    'cpu_usage': [],
-                    'memory_usage': [],
-                    'execution_time': 0
-                }
-            }
+            with self._lock:
+                if workload_id in self.workloads:
+                    self.logger.warning(f"工作负载 {workload_id} 已存在")
+                    return False
+                    
+                self.workloads[workload_id] = WorkloadRecord(workload_id, requirements, priority)
+                self.status_index['pending'].add(workload_id)
             self.logger.info(f"创建工作负载 {workload_id}, 优先级: {priority}")
             return True
         except Exception as e:
             self.logger.error(f"创建工作负载失败: {e}")
             return False
             
+    def create_many(self, workloads):
+        """批量创建工作负载
+
+        workloads 为 (workload_id, requirements[, priority]) 元组或同名键的字典；
+        单个条目校验失败只记录错误，不影响其他条目。返回 (已创建ID列表, {ID: 错误信息})
+        """
+        created = []
+        errors = {}
+        for item in workloads:
+            try:
+                if isinstance(item, dict):
+                    workload_id = item.get('workload_id', item.get('id'))
+                    requirements = item.get('requirements')
+                    priority = item.get('priority', 'normal')
+                else:
+                    workload_id, requirements, *rest = item
+                    priority = rest[0] if rest else 'normal'
+                    
+                if workload_id is None:
+                    raise ValueError("缺少工作负载ID")
+                if not isinstance(requirements, dict):
+                    errors[workload_id] = "资源需求必须为字典"
+                    continue
+                    
+                with self._lock:
+                    if workload_id in self.workloads:
+                        errors[workload_id] = "工作负载已存在"
+                        continue
+                    self.workloads[workload_id] = WorkloadRecord(workload_id, requirements, priority)
+                    self.status_index['pending'].add(workload_id)
+                created.append(workload_id)
+            except Exception as e:
+                errors[repr(item)] = f"无效的工作负载条目: {e}"
+                
+        self.logger.info(f"批量创建工作负载 {len(created)} 个, 失败 {len(errors)} 个")
+        return created, errors
+            
     def delete_workload(self, workload_id):
         """删除工作负载"""
         try:
-            if workload_id in self.workloads:
-                del self.workloads[workload_id]
-                if workload_id in self.workload_states:
-                    del self.workload_states[workload_id]
-                self.logger.info(f"删除工作负载 {workload_id}")
-                return True
-            return False
+            with self._lock:
+                workload = self.workloads.pop(workload_id, None)
+                if workload is None:
+                    return False
+                self._unindex(workload)
+                if isinstance(workload.metrics, MetricsView):
+                    workload.metrics.release()
+            self.logger.info(f"删除工作负载 {workload_id}")
+            return True
         except Exception as e:
             self.logger.error(f"删除工作负载失败: {e}")
             return False
@@ -63,16 +104,13 @@ class WorkloadManager:
     def update_workload_status(self, workload_id, status, message=None):
         """更新工作负载状态"""
         try:
-            if workload_id in self.workloads:
-                self.workloads[workload_id]['status'] = status
-                self.workload_states[workload_id] = {
-                    'state': status,
-                    'message': message,
-                    'updated_at': datetime.now()
-                }
-                self.logger.info(f"工作负载 {workload_id} 状态更新为 {status}")
-                return True
-            return False
+            with self._lock:
+                workload = self.workloads.get(workload_id)
+                if workload is None:
+                    return False
+                self._set_status(workload, status, message)
+            self.logger.info(f"工作负载 {workload_id} 状态更新为 {status}")
+            return True
         except Exception as e:
             self.logger.error(f"更新工作负载状态失败: {e}")
             return False
@@ -81,8 +119,9 @@ class WorkloadManager:
         """增加重试次数"""
         try:
             if workload_id in self.workloads:
-                self.workloads[workload_id]['retries'] += 1
-                return self.workloads[workload_id]['retries']
+                workload = self.workloads[workload_id]
+                workload.retries += 1
+                return workload.retries
             return 0
         except Exception as e:
             self.logger.error(f"增加重试次数失败: {e}")
@@ -90,30 +129,92 @@ class WorkloadManager:
         
     def get_workload_state(self, workload_id):
         """获取工作负载状态"""
-        return self.workload_states.get(workload_id, {})
+        workload = self.workloads.get(workload_id)
+        return workload.get_state() if workload else {}
         
     def update_workload_state(self, workload_id, state):
         """更新工作负载状态"""
-        if workload_id in self.workloads:
-            self.workload_states[workload_id] = {
-                'state': state,
-                'updated_at': datetime.now()
-            }
-            return True
-        return False
+        with self._lock:
+            if workload_id in self.workloads:
+                self._set_state(self.workloads[workload_id], state)
+                return True
+            return False
+        
+    def bulk_update_status(self, workload_ids, status, message=None):
+        """批量更新工作负载状态，返回更新数量"""
+        try:
+            updated = 0
+            with self._lock:
+                for workload_id in list(workload_ids):
+                    workload = self.workloads.get(workload_id)
+                    if workload is not None:
+                        self._set_status(workload, status, message)
+                        updated += 1
+            self.logger.info(f"批量更新 {updated} 个工作负载状态为 {status}")
+            return updated
+        except Exception as e:
+            self.logger.error(f"批量更新工作负载状态失败: {e}")
+            return 0
+            
+    def get_workloads_by_status(self, status):
+        """获取指定状态的工作负载"""
+        with self._lock:
+            return {wid: self.workloads[wid] for wid in self.status_index.get(status, ())}
+        
+    def get_workloads_by_state(self, state):
+        """获取指定生命周期状态的工作负载"""
+        with self._lock:
+            return {wid: self.workloads[wid] for wid in self.state_index.get(state, ())}
+        
+    def _set_status(self, workload, status, message=None):
+        """更新状态并维护状态索引"""
+        old_status = workload.status
+        if old_status != status:
+            self.status_index[old_status].discard(workload.id)
+            self.status_index[status].add(workload.id)
+            workload.status = status
+        self._set_state(workload, status, message)
+        
+    def _set_state(self, workload, state, message=None):
+        """更新生命周期状态并维护索引"""
+        if workload.has_state():
+            self.state_index[status_name(workload.state_code)].discard(workload.id)
+        workload.set_state(state, message)
+        self.state_index[state].add(workload.id)
+        
+    def _index(self, workload):
+        """将工作负载加入索引"""
+        self.status_index[workload.status].add(workload.id)
+        if workload.has_state():
+            self.state_index[status_name(workload.state_code)].add(workload.id)
+            
+    def _unindex(self, workload):
+        """从索引中移除工作负载"""
+        self.status_index[workload.status].discard(workload.id)
+        if workload.has_state():
+            self.state_index[status_name(workload.state_code)].discard(workload.id)
         
     def save_workload_snapshot(self, workload_id):
         """保存工作负载快照"""
         if workload_id not in self.workloads:
             return None
             
+        workload = self.workloads[workload_id]
         snapshot = {
-            'workload': self.workloads[workload_id],
-            'state': self.workload_states.get(workload_id, {}),
+            'workload': workload.to_dict(),
+            'state': workload.get_state(),
             'timestamp': datetime.now().isoformat()
         }
         
-        return json.dumps(snapshot)
+        return json.dumps(snapshot, default=self._json_default)
+        
+    def _json_default(self, obj):
+        """处理快照中的日期序列化"""
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        if hasattr(obj, 'to_dict'):
+            return obj.to_dict()
+        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
         
     def restore_workload(self, snapshot):
         """从快照恢复工作负载"""
@@ -122,9 +223,15 @@ class WorkloadManager:
             workload = data['workload']
             state = data['state']
             
-            self.workloads[workload['id']] = workload
+            record = WorkloadRecord.from_dict(workload)
             if state:
-                self.workload_states[workload['id']] = state
+                record.set_state(state['state'], state.get('message'), state.get('updated_at'))
+            with self._lock:
+                if record.id in self.workloads:
+                    self.delete_workload(record.id)
+                self.workloads[record.id] = record
+                self._index(record)
+                self._attach_metric_ring(record)
                 
             return True
         except:
@@ -133,27 +240,17 @@ class WorkloadManager:
     def update_workload_metrics(self, workload_id, metrics):
         """更新工作负载指标"""
         try:
-            if workload_id not in self.workloads:
-                self.logger.warning(f"工作负载 {workload_id} 不存在")
-                return False
-                
-            if 'metrics' not in self.workloads[workload_id]:
-                self.workloads[workload_id]['metrics'] = {
-                    'cpu_usage': [],
-                    'memory_usage': []
-                }
+            timestamp = to_epoch(metrics.get('timestamp')) or datetime.now().timestamp()
+            with self._lock:
+                workload = self.workloads.get(workload_id)
+                if workload is None:
+                    self.logger.warning(f"工作负载 {workload_id} 不存在")
+                    return False
+                    
+                view = self._attach_metric_ring(workload)
                 
-            # 更新指标
-            self.workloads[workload_id]['metrics']['cpu_usage'].append(metrics['cpu_usage'])
-            self.workloads[workload_id]['metrics']['memory_usage'].append(metrics['memory_usage'])
-            
-            # 限制历史数据点数量
-            max_points = 100
-            for metric_type in ['cpu_usage', 'memory_usage']:
-                if len(self.workloads[workload_id]['metrics'][metric_type]) > max_points:
-                    self.workloads[workload_id]['metrics'][metric_type] = \
-                        self.workloads[workload_id]['metrics'][metric_type][-max_points:]
-                        
+                # 写入环形缓冲区，超过容量时覆盖最旧数据点
+                self.metric_store.append(view.slot, metrics, timestamp)
             return True
             
         except Exception as e:
@@ -163,59 +260,76 @@ class WorkloadManager:
     def get_workload_statistics(self, workload_id):
         """获取工作负载统计信息"""
         try:
-            workload = self.workloads.get(workload_id)
-            if not workload:
-                return None
-                
-            metrics = workload['metrics']
-            cpu_usage = metrics['cpu_usage']
-            memory_usage = metrics['memory_usage']
-            
-            return {
-                'cpu_stats': {
-                    'avg': sum(cpu_usage) / len(cpu_usage) if cpu_usage else 0,
-                    'max': max(cpu_usage) if cpu_usage else 0,
-                    'min': min(cpu_usage) if cpu_usage else 0
-                },
-                'memory_stats': {
-                    'avg': sum(memory_usage) / len(memory_usage) if memory_usage else 0,
-                    'max': max(memory_usage) if memory_usage else 0,
-                    'min': min(memory_usage) if memory_usage else 0
-                },
-                'execution_time': metrics['execution_time'],
-                'status': workload['status'],
-                'retries': workload['retries']
-            }
+            with self._lock:
+                workload = self.workloads.get(workload_id)
+                if not workload:
+                    return None
+                    
+                # 直接读取维护中的聚合值，尚未写入过指标时不分配槽位
+                metrics = workload.metrics
+                if isinstance(metrics, MetricsView):
+                    cpu_stats = self.metric_store.get_stats(metrics.slot, 'cpu_usage')
+                    memory_stats = self.metric_store.get_stats(metrics.slot, 'memory_usage')
+                else:
+                    cpu_stats = self._list_stats(metrics.get('cpu_usage', []))
+                    memory_stats = self._list_stats(metrics.get('memory_usage', []))
+                return {
+                    'cpu_stats': cpu_stats,
+                    'memory_stats': memory_stats,
+                    'execution_time': metrics.get('execution_time', 0),
+                    'status': workload['status'],
+                    'retries': workload['retries']
+                }
         except Exception as e:
             self.logger.error(f"获取工作负载统计信息失败: {e}")
             return None
             
     def get_all_active_workloads(self):
         """获取所有活跃的工作负载"""
-        return {
-            wid: workload for wid, workload in self.workloads.items()
-            if workload['status'] in ['pending', 'running']
-        }
+        active = {}
+        with self._lock:
+            for status in ['pending', 'running']:
+                for wid in self.status_index.get(status, ()):
+                    active[wid] = self.workloads[wid]
+        return active
         
     def cleanup_old_metrics(self, workload_id, max_age_hours=24):
         """清理旧的指标数据"""
         try:
-            workload = self.workloads.get(workload_id)
-            if not workload:
-                return False
-                
             current_time = datetime.now()
             cutoff_time = current_time - timedelta(hours=max_age_hours)
             
-            # 清理超过指定时间的指标数据
-            metrics = workload['metrics']
-            for metric_type in ['cpu_usage', 'memory_usage']:
-                metrics[metric_type] = [
-                    m for m in metrics[metric_type]
-                    if m['timestamp'] > cutoff_time
-                ]
+            with self._lock:
+                workload = self.workloads.get(workload_id)
+                if not workload:
+                    return False
+                    
+                # 从环的最旧端清理超过指定时间的指标数据；未分配环时没有带时间戳的样本
+                if isinstance(workload.metrics, MetricsView):
+                    self.metric_store.expire(workload.metrics.slot, cutoff_time.timestamp())
                 
             return True
         except Exception as e:
             self.logger.error(f"清理旧指标数据失败: {e}")
-            return False
\ No newline at end of file
+            return False
+            
+    def _list_stats(self, values):
+        """计算列表形式指标的均值、最大值、最小值"""
+        if not values:
+            return {'avg': 0, 'max': 0, 'min': 0}
+        return {'avg': sum(values) / len(values), 'max': max(values), 'min': min(values)}
+            
+    def _attach_metric_ring(self, workload):
+        """为工作负载分配指标环，已有的列表数据迁移到环中"""
+        metrics = workload.metrics
+        if isinstance(metrics, MetricsView):
+            return metrics
+            
+        slot = self.metric_store.allocate()
+        view = MetricsView(self.metric_store, slot, metrics.get('execution_time', 0))
+        history = [metrics.get(name, []) for name in self.metric_store.metric_names]
+        now = datetime.now().timestamp()
+        for values in zip(*history):
+            self.metric_store.append(slot, dict(zip(self.metric_store.metric_names, values)), now)
+        workload.metrics = view
+        return view
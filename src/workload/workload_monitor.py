@@ -1,46 +1,320 @@
-import psutil
-import time
-from datetime import datetime
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+import random
+import threading
 import logging
+import numpy as np
+from .alert_manager import AlertManager
+from .autoscaler import AutoScaler
+from .resource_limiter import ResourceLimiter
+from .anomaly_detector import AnomalyDetector
+from ..monitoring.collectors.cgroup_reader import CgroupReader
+from ..monitoring.collectors.host_sampler import get_host_sampler
 
 class WorkloadMonitor:
-    def __init__(self, workload_manager):
+    """工作负载监控器
+
+    所有工作负载共用一个后台事件循环，每个工作负载一个协程；
+    采集间隔带随机抖动以错开采集时刻，信号量限制同时进行的采集数量。
+    采集结果按 tick_interval 合并为一批处理，扩缩容可能阻塞在 Docker 调用上，放到单独的线程执行；
+    每个周期还在线程池中推进 retry_handlers（如 FailureHandler、RecoveryManager）的到期重试
+    """
+    FINISHED_STATUSES = ('completed', 'failed')
+
+    def __init__(self, workload_manager, monitoring_interval=5, jitter=0.1, max_concurrency=64,
+                 collector=None, alert_manager=None, autoscaler=None, seed=None, host_sampler=None,
+                 cgroup_reader=None, anomaly_detector=None, tick_interval=0.1, resource_limiter=None,
+                 config=None, retry_handlers=None):
         self.workload_manager = workload_manager
         self.logger = logging.getLogger(__name__)
-        self.monitoring_interval = 5  # 秒
-        self.alert_manager = AlertManager()
-        self.autoscaler = AutoScaler(ResourceLimiter())
-        
+        self.monitoring_interval = monitoring_interval  # 秒
+        self.jitter = jitter  # 间隔的随机抖动比例
+        self.max_concurrency = max_concurrency
+        self.tick_interval = tick_interval  # 批量处理周期，秒
+        # 自定义采集函数时不需要主机采样器
+        self.host_sampler = host_sampler or (None if collector else get_host_sampler())
+        # 配置后优先读取工作负载自身的 cgroup 指标（monitoring.metrics_source: cgroup）
+        self.cgroup_reader = cgroup_reader or (None if collector else CgroupReader.from_config(config or {}))
+        self.anomaly_detector = anomaly_detector or AnomalyDetector()
+        self.collector = collector or self._collect_metrics  # 可为普通函数或协程函数
+        self.alert_manager = alert_manager or AlertManager()
+        # 与生命周期管理共用同一个资源限制器，限制缓存只有一份
+        self.autoscaler = autoscaler or AutoScaler(
+            resource_limiter or ResourceLimiter.from_config(config or {})
+        )
+        self.monitored = set()
+        self.retry_handlers = list(retry_handlers or [])  # 提供 process_due_retries() 的对象
+        self._retrying = set()  # 正在执行重试的处理器，仅在事件循环线程中访问
+        self._rng = random.Random(seed)
+        self._loop = None
+        self._thread = None
+        self._tasks = {}  # 工作负载ID -> 协程任务，仅在事件循环线程中访问
+        self._semaphore = None
+        self._tick_task = None
+        self._batch = {}          # 本周期的采集结果，仅在事件循环线程中访问
+        self._scale_pending = {}  # 等待扩缩容的最新指标
+        self._scaling = False
+        self._warned = {}         # 因异常标记为 warning 的工作负载ID -> 标记前的状态
+        self._executor = None     # 扩缩容线程
+        self._lock = threading.Lock()
+
+    def start(self):
+        """启动后台事件循环"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='workload-scaler')
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_loop, args=(ready,), name='workload-monitor', daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+
+    def stop(self):
+        """停止所有监控并关闭事件循环"""
+        with self._lock:
+            if not self._thread:
+                return
+            self.monitored.clear()
+            self._loop.call_soon_threadsafe(self._shutdown)
+            self._thread.join()
+            self._executor.shutdown(wait=True)
+            self._loop.close()
+            self._thread = None
+            self._loop = None
+            self._executor = None
+            self._batch.clear()
+            self._scale_pending.clear()
+            self._scaling = False
+            self._retrying.clear()
+
     def start_monitoring(self, workload_id):
-        """开始监控工作负载"""
+        """开始监控工作负载，立即返回"""
         try:
-            while True:
-                metrics = self._collect_metrics(workload_id)
-                self._update_workload_metrics(workload_id, metrics)
-                
-                # 检查告警
-                self.alert_manager.check_alerts(workload_id, metrics)
-                
-                # 检查自动扩缩容
-                self.autoscaler.check_and_scale(workload_id, metrics)
-                
-                time.sleep(self.monitoring_interval)
-                
+            self.start()
+            if workload_id in self.monitored:
+                return True
+            self.monitored.add(workload_id)
+            self._loop.call_soon_threadsafe(self._spawn, workload_id)
+            return True
         except Exception as e:
-            self.logger.error(f"监控工作负载 {workload_id} 失败: {e}")
-            
+            self.logger.error(f"启动监控工作负载 {workload_id} 失败: {e}")
+            return False
+
+    def stop_monitoring(self, workload_id):
+        """停止监控工作负载"""
+        if workload_id not in self.monitored:
+            return False
+        self.monitored.discard(workload_id)
+        # 检测器状态和 cgroup 文件描述符只在事件循环线程中修改
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._cancel, workload_id)
+        else:
+            self._forget(workload_id)
+        return True
+
+    def add_retry_handler(self, handler):
+        """登记需要每个周期推进到期重试的处理器"""
+        if handler not in self.retry_handlers:
+            self.retry_handlers.append(handler)
+
+    def is_monitoring(self, workload_id):
+        """工作负载是否在监控中"""
+        return workload_id in self.monitored
+
+    def _run_loop(self, ready):
+        """事件循环线程入口"""
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tick_task = self._loop.create_task(self._tick())
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def _spawn(self, workload_id):
+        """在事件循环中创建监控协程"""
+        if workload_id in self._tasks or workload_id not in self.monitored:
+            return
+        self._tasks[workload_id] = self._loop.create_task(self._monitor_workload(workload_id))
+
+    def _cancel(self, workload_id):
+        """在事件循环中取消监控协程并清除工作负载的监控状态"""
+        task = self._tasks.pop(workload_id, None)
+        if task:
+            task.cancel()
+        self._forget(workload_id)
+
+    def _forget(self, workload_id):
+        """清除异常基线、warning 标记、cgroup 文件描述符和扩缩容状态行"""
+        self._batch.pop(workload_id, None)
+        self._scale_pending.pop(workload_id, None)
+        self._warned.pop(workload_id, None)
+        self.anomaly_detector.reset(workload_id)
+        if self.cgroup_reader:
+            self.cgroup_reader.unwatch(workload_id)
+        forget = getattr(self.autoscaler, 'forget', None)
+        if forget:
+            # 与扩缩容在同一线程中执行，避免状态行在计算过程中被复用
+            if self._executor is not None:
+                self._executor.submit(forget, workload_id)
+            else:
+                forget(workload_id)
+
+    def _shutdown(self):
+        """取消全部协程后停止事件循环"""
+        tasks = list(self._tasks.values()) + [self._tick_task]
+        self._tasks.clear()
+        self._tick_task = None
+        for task in tasks:
+            task.cancel()
+
+        async def drain():
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._loop.shutdown_default_executor()
+            self._loop.stop()
+
+        self._loop.create_task(drain())
+
+    def _next_interval(self):
+        """带抖动的采集间隔"""
+        return self.monitoring_interval * (1 + self._rng.uniform(-self.jitter, self.jitter))
+
+    async def _monitor_workload(self, workload_id):
+        """单个工作负载的监控协程"""
+        # 首次采集随机错开，避免同时提交的工作负载同一时刻采集
+        await asyncio.sleep(self._rng.uniform(0, self.monitoring_interval))
+        while True:
+            try:
+                async with self._semaphore:
+                    metrics = await self._collect(workload_id)
+                self._process_metrics(workload_id, metrics)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"监控工作负载 {workload_id} 失败: {e}")
+            await asyncio.sleep(self._next_interval())
+
+    async def _tick(self):
+        """批量处理协程，每个周期处理一次本周期的采集结果"""
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            try:
+                self._flush()
+            except Exception as e:
+                self.logger.error(f"批量处理监控指标失败: {e}")
+            self._drive_retries()
+
+    def _drive_retries(self):
+        """在线程池中执行各处理器已到期的重试，同一处理器同时只执行一次"""
+        for handler in list(self.retry_handlers):
+            if handler in self._retrying:
+                continue
+            self._retrying.add(handler)
+            future = self._loop.run_in_executor(None, handler.process_due_retries)
+            future.add_done_callback(lambda f, handler=handler: self._retry_done(handler, f))
+
+    def _retry_done(self, handler, future):
+        """一轮重试结束"""
+        self._retrying.discard(handler)
+        if not future.cancelled() and future.exception():
+            self.logger.error(f"执行到期重试失败: {future.exception()}")
+
+    async def _collect(self, workload_id):
+        """调用采集函数，同步采集函数放到线程池执行"""
+        if self.collector == self._collect_metrics:
+            # 默认采集只读取采样器快照，不会阻塞事件循环
+            return self.collector(workload_id)
+        if (inspect.iscoroutinefunction(self.collector)
+                or inspect.iscoroutinefunction(getattr(self.collector, '__call__', None))):
+            return await self.collector(workload_id)
+        return await self._loop.run_in_executor(None, self.collector, workload_id)
+
+    def _process_metrics(self, workload_id, metrics):
+        """暂存采集结果，等待本周期批量处理"""
+        if not metrics:
+            return
+        self._batch[workload_id] = metrics
+
+    def _flush(self):
+        """在事件循环中处理本周期的采集结果：更新指标、检查异常和告警，提交扩缩容"""
+        batch, self._batch = self._batch, {}
+        batch = {wid: metrics for wid, metrics in batch.items() if wid in self.monitored}
+        # 已删除或已结束的工作负载停止监控，释放 cgroup 文件描述符等状态
+        for workload_id in [wid for wid in batch if self._finished(wid)]:
+            batch.pop(workload_id)
+            self.stop_monitoring(workload_id)
+        if not batch:
+            return
+
+        for workload_id, metrics in batch.items():
+            self._update_workload_metrics(workload_id, metrics)
+
+        # 检查异常：整批指标一次更新基线，恢复正常后撤销 warning 标记
+        anomalies = self._check_anomalies(batch)
+        for workload_id, workload_anomalies in anomalies.items():
+            self._handle_anomaly(workload_id, workload_anomalies)
+        for workload_id in [wid for wid in self._warned if wid in batch and wid not in anomalies]:
+            if not self.anomaly_detector.is_anomalous(workload_id):
+                self._clear_anomaly(workload_id)
+
+        # 检查告警
+        for workload_id, metrics in batch.items():
+            self.alert_manager.check_alerts(workload_id, metrics)
+
+        # 检查自动扩缩容
+        self._scale_pending.update(batch)
+        self._start_scaling()
+
+    def _finished(self, workload_id):
+        """工作负载是否已删除或处于结束状态"""
+        workload = self.workload_manager.workloads.get(workload_id)
+        return workload is None or workload['status'] in self.FINISHED_STATUSES
+
+    def _start_scaling(self):
+        """在扩缩容线程中执行一批扩缩容，同一时刻只有一批在执行"""
+        if self._scaling or not self._scale_pending or self._executor is None:
+            return
+        pending, self._scale_pending = self._scale_pending, {}
+        self._scaling = True
+        future = self._loop.run_in_executor(self._executor, self._scale, pending)
+        future.add_done_callback(self._scaling_done)
+
+    def _scaling_done(self, future):
+        """一批扩缩容结束后提交期间积累的指标"""
+        self._scaling = False
+        if not future.cancelled() and future.exception():
+            self.logger.error(f"自动扩缩容失败: {future.exception()}")
+        self._start_scaling()
+
+    def _scale(self, batch):
+        """对一批工作负载执行扩缩容，运行在扩缩容线程中"""
+        workload_ids = [wid for wid in batch if wid in self.monitored]
+        if not workload_ids:
+            return {}
+        metrics = [
+            [batch[wid].get(name, 0) for name in AutoScaler.METRICS] for wid in workload_ids
+        ]
+        return self.autoscaler.scale_fleet(workload_ids, metrics)
+
     def _collect_metrics(self, workload_id):
-        """收集工作负载指标"""
+        """收集工作负载指标，配置 cgroup 时读取 cgroup，否则读取共享主机采样器的快照，不阻塞"""
         try:
-            # 获取系统资源使用情况
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            
+            if self.cgroup_reader:
+                # 只使用工作负载自身的指标：读取失败时跳过本次采集，不退回主机指标；
+                # 首次读取没有差值，CPU 使用率为 0，同样跳过
+                first = not self.cgroup_reader.has_baseline(workload_id)
+                metrics = self.cgroup_reader.read(workload_id)
+                return None if first else metrics
+
+            snapshot = self.host_sampler.get_snapshot()
+
             return {
-                'timestamp': datetime.now(),
-                'cpu_usage': cpu_percent,
-                'memory_usage': memory.percent,
-                'io_counters': psutil.disk_io_counters()
+                'timestamp': snapshot['timestamp'],
+                'cpu_usage': snapshot['cpu_usage'],
+                'memory_usage': snapshot['memory_usage'],
+                'io_counters': snapshot['io_counters']
             }
         except Exception as e:
             self.logger.error(f"收集指标失败: {e}")
@@ -51,35 +325,47 @@ class WorkloadMonitor:
         if not metrics:
             return
             
-        workload = self.workload_manager.workloads.get(workload_id)
-        if workload:
-            workload['metrics']['cpu_usage'].append(metrics['cpu_usage'])
-            workload['metrics']['memory_usage'].append(metrics['memory_usage'])
-            
-            # 保持最近100个数据点
-            if len(workload['metrics']['cpu_usage']) > 100:
-                workload['metrics']['cpu_usage'] = workload['metrics']['cpu_usage'][-100:]
-                workload['metrics']['memory_usage'] = workload['metrics']['memory_usage'][-100:]
+        # 指标环形缓冲区自动保留最近100个数据点
+        self.workload_manager.update_workload_metrics(workload_id, metrics)
                 
-    def _check_anomalies(self, workload_id, metrics):
-        """检查异常情况"""
-        if not metrics:
-            return False
-            
-        # 定义阈值
-        thresholds = {
-            'cpu_usage': 90,
-            'memory_usage': 90
-        }
-        
-        return (metrics['cpu_usage'] > thresholds['cpu_usage'] or
-                metrics['memory_usage'] > thresholds['memory_usage'])
+    def _check_anomalies(self, batch):
+        """检查一批指标的异常情况，返回 {工作负载ID: 新出现的异常列表}"""
+        if not batch:
+            return {}
+
+        # 基于 EWMA 基线的 z 分数，(工作负载 × 指标) 矩阵一次更新，持续异常只在首次出现时返回
+        workload_ids = list(batch)
+        values = [
+            [batch[wid].get(name, np.nan) for name in self.anomaly_detector.metrics]
+            for wid in workload_ids
+        ]
+        anomalies = {}
+        for anomaly in self.anomaly_detector.update(workload_ids, values):
+            anomalies.setdefault(anomaly['workload_id'], []).append(anomaly)
+        return anomalies
                 
-    def _handle_anomaly(self, workload_id):
+    def _handle_anomaly(self, workload_id, anomalies=None):
         """处理异常情况"""
-        self.logger.warning(f"工作负载 {workload_id} 出现异常")
+        detail = ', '.join(
+            f"{a['metric']}={a['value']:.1f} (z={a['zscore']:.1f})" for a in anomalies or []
+        )
+        self.logger.warning(f"工作负载 {workload_id} 出现异常 {detail}")
+        workload = self.workload_manager.workloads.get(workload_id)
+        if workload is None:
+            return
+        if workload_id not in self._warned:
+            self._warned[workload_id] = workload['status']
         self.workload_manager.update_workload_status(
             workload_id, 
             'warning',
-            '资源使用超过阈值'
-        )
\ No newline at end of file
+            f"资源使用偏离基线: {detail}" if detail else '资源使用偏离基线'
+        )
+
+    def _clear_anomaly(self, workload_id):
+        """异常消失后恢复标记前的状态，期间状态已被其他流程修改时不覆盖"""
+        previous = self._warned.pop(workload_id, None)
+        workload = self.workload_manager.workloads.get(workload_id)
+        if previous is None or workload is None or workload['status'] != 'warning':
+            return
+        self.logger.info(f"工作负载 {workload_id} 异常已恢复")
+        self.workload_manager.update_workload_status(workload_id, previous, '资源使用恢复正常')
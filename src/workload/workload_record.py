@@ -0,0 +1,196 @@
+import sys
+from collections.abc import Mapping, MutableMapping
+from datetime import datetime
+
+# 状态字符串驻留为小整数编码，所有记录共享同一份字符串
+_STATUS_NAMES = []
+_STATUS_CODES = {}
+
+def status_code(status):
+    """获取状态编码，未知状态自动注册"""
+    code = _STATUS_CODES.get(status)
+    if code is None:
+        code = _STATUS_CODES[status] = len(_STATUS_NAMES)
+        _STATUS_NAMES.append(sys.intern(status) if isinstance(status, str) else status)
+    return code
+
+def status_name(code):
+    """根据编码获取状态字符串"""
+    return _STATUS_NAMES[code]
+
+for _status in ('pending', 'running', 'completed', 'failed', 'stopping', 'warning'):
+    status_code(_status)
+
+
+def to_epoch(value):
+    """时间值统一转换为 epoch 浮点数"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+class WorkloadRecord(MutableMapping):
+    """紧凑的工作负载记录
+
+    使用 __slots__ 存储字段，状态为驻留的整数编码，时间为 epoch 浮点数；
+    对外仍按原字典方式读写（record['status'] 等）；status 与 state 需经
+    WorkloadManager 更新以维护索引，映射接口中只读
+    """
+    __slots__ = (
+        'id', 'requirements', 'created_at', 'status_code', 'retries', 'priority',
+        '_metrics', 'state_code', 'state_message', 'state_updated_at', '_extra'
+    )
+    FIELDS = ('id', 'requirements', 'created_at', 'status', 'retries', 'priority', 'metrics')
+    READ_ONLY = ('status', 'state')
+
+    def __init__(self, workload_id, requirements, priority='normal', created_at=None,
+                 status='pending', retries=0):
+        self.id = workload_id
+        self.requirements = requirements
+        self.created_at = to_epoch(created_at) if created_at is not None else datetime.now().timestamp()
+        self.status_code = status_code(status)
+        self.retries = retries
+        self.priority = sys.intern(priority) if isinstance(priority, str) else priority
+        self._metrics = None  # 首次访问时才创建
+        self.state_code = -1
+        self.state_message = None
+        self.state_updated_at = None
+        self._extra = None
+
+    @property
+    def status(self):
+        return _STATUS_NAMES[self.status_code]
+
+    @status.setter
+    def status(self, value):
+        self.status_code = status_code(value)
+
+    @property
+    def metrics(self):
+        if self._metrics is None:
+            self._metrics = {
+                'cpu_usage': [],
+                'memory_usage': [],
+                'execution_time': 0
+            }
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, value):
+        self._metrics = value
+
+    def __getitem__(self, key):
+        if key == 'created_at':
+            return datetime.fromtimestamp(self.created_at)
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.READ_ONLY:
+            raise TypeError(f"'{key}' is read-only, update it through WorkloadManager")
+        if key == 'created_at':
+            self.created_at = to_epoch(value)
+        elif key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        yield from self.FIELDS
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return len(self.FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self._extra and key in self._extra)
+
+    def __repr__(self):
+        return f"WorkloadRecord({self.to_dict()!r})"
+
+    def has_state(self):
+        """是否记录过生命周期状态"""
+        return self.state_updated_at is not None
+
+    def set_state(self, state, message=None, updated_at=None):
+        """设置生命周期状态"""
+        self.state_code = status_code(state)
+        self.state_message = message
+        self.state_updated_at = to_epoch(updated_at) if updated_at is not None else datetime.now().timestamp()
+
+    def clear_state(self):
+        """清除生命周期状态"""
+        self.state_code = -1
+        self.state_message = None
+        self.state_updated_at = None
+
+    def get_state(self):
+        """以字典形式返回生命周期状态"""
+        if not self.has_state():
+            return {}
+        return {
+            'state': _STATUS_NAMES[self.state_code],
+            'message': self.state_message,
+            'updated_at': datetime.fromtimestamp(self.state_updated_at)
+        }
+
+    def to_dict(self):
+        """转换为普通字典"""
+        return {key: self[key] for key in self}
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典（含快照反序列化结果）创建记录"""
+        record = cls(
+            data['id'],
+            data.get('requirements'),
+            priority=data.get('priority', 'normal'),
+            created_at=data.get('created_at'),
+            status=data.get('status', 'pending'),
+            retries=data.get('retries', 0)
+        )
+        if 'metrics' in data:
+            record.metrics = data['metrics']
+        for key, value in data.items():
+            if key not in cls.FIELDS and key not in cls.READ_ONLY:
+                record[key] = value
+        return record
+
+
+class WorkloadStateView(Mapping):
+    """按工作负载ID只读访问生命周期状态，替代单独维护的状态字典"""
+
+    def __init__(self, workloads):
+        self._workloads = workloads
+
+    def __getitem__(self, workload_id):
+        record = self._workloads[workload_id]
+        if not record.has_state():
+            raise KeyError(workload_id)
+        return record.get_state()
+
+    def __iter__(self):
+        return (wid for wid, record in self._workloads.items() if record.has_state())
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, workload_id):
+        record = self._workloads.get(workload_id)
+        return record is not None and record.has_state()
@@ -1,44 +1,159 @@
 from datetime import datetime
 import heapq
 import logging
+import time
+from .timing_wheel import TimingWheel
+
+# 各优先级的基础分值
+PRIORITY_SCORES = {
+    'high': 100,
+    'normal': 50,
+    'low': 10
+}
 
 class WorkloadScheduler:
-    def __init__(self, workload_manager):
+    """工作负载调度器
+
+    aging_rate 为空时沿用入队时一次性计算优先级的方式；
+    设置后进入老化模式：有效优先级 = 基础优先级 + aging_rate × 排队秒数。
+    由于所有排队任务随时间增加的量相同，按 基础优先级 - aging_rate × 入队时间
+    排序即可保持顺序不变，无需每个周期重新堆化。
+
+    指定 not_before 或重试退避的工作负载先进入时间轮，到期后才进入优先级堆。
+    重新调度已排队的工作负载时旧堆条目作废，出堆时跳过
+    """
+
+    def __init__(self, workload_manager, aging_rate=None, clock=time.time,
+                 defer_tick=0.1, retry_base_delay=1.0, retry_max_delay=300.0):
         self.workload_manager = workload_manager
         self.priority_queue = []
+        self.queued_keys = {}  # 工作负载ID -> 排序键
+        self._entries = {}  # 工作负载ID -> 当前有效的堆条目
+        self._stale = 0  # 堆中已作废的条目数
+        self.aging_rate = aging_rate  # 每秒增加的优先级分值
+        self.clock = clock
+        self._epoch = clock()  # 排序键的参考时间，避免数值过大
+        self.deferred = TimingWheel(tick=defer_tick, start=self._epoch)
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
         self.logger = logging.getLogger(__name__)
-        
-    def schedule_workload(self, workload_id):
-        """调度工作负载"""
+
+    def schedule_workload(self, workload_id, not_before=None):
+        """调度工作负载，not_before 为最早可执行时间（与 clock 同一时间基准）"""
         workload = self.workload_manager.workloads.get(workload_id)
         if not workload:
             return False
-            
-        priority = self._calculate_priority(workload)
-        heapq.heappush(self.priority_queue, (-priority, workload_id))
+
+        if not_before is not None and not_before > self.clock():
+            self._dequeue(workload_id)
+            self.deferred.schedule(workload_id, not_before)
+            return True
+        self.deferred.cancel(workload_id)
+        self._push(workload_id, workload)
         return True
-        
+
+    def retry_workload(self, workload_id):
+        """按指数退避延迟重新调度失败的工作负载，返回重新可执行的时间"""
+        workload = self.workload_manager.workloads.get(workload_id)
+        if not workload:
+            return None
+
+        retries = self.workload_manager.increment_retry_count(workload_id)
+        delay = min(self.retry_base_delay * 2 ** (retries - 1), self.retry_max_delay)
+        not_before = self.clock() + delay
+        self._dequeue(workload_id)
+        self.deferred.schedule(workload_id, not_before)
+        return not_before
+
+    def cancel_deferred(self, workload_id):
+        """取消尚未到期的延迟调度"""
+        return self.deferred.cancel(workload_id)
+
+    def release_due(self):
+        """把已到期的延迟工作负载移入优先级堆，返回数量"""
+        released = 0
+        for workload_id, _ in self.deferred.advance(self.clock()):
+            workload = self.workload_manager.workloads.get(workload_id)
+            if workload:
+                self._push(workload_id, workload)
+                released += 1
+        return released
+
+    def _push(self, workload_id, workload):
+        """计算排序键并入堆"""
+        if self.aging_rate is None:
+            priority = self._calculate_priority(workload)
+        else:
+            priority = self._calculate_aging_key(workload, self.clock())
+        self._dequeue(workload_id)
+        entry = (-priority, workload_id)
+        heapq.heappush(self.priority_queue, entry)
+        self.queued_keys[workload_id] = priority
+        self._entries[workload_id] = entry
+
+    def _dequeue(self, workload_id):
+        """作废工作负载在堆中的条目"""
+        self.queued_keys.pop(workload_id, None)
+        if self._entries.pop(workload_id, None) is not None:
+            self._stale += 1
+            self._compact()
+
+    def _compact(self):
+        """作废条目超过一半时重建堆（与 WorkloadPriorityQueue 相同的阈值）"""
+        if self._stale > 64 and self._stale > len(self._entries):
+            self.priority_queue = [
+                entry for entry in self.priority_queue if self._entries.get(entry[1]) is entry
+            ]
+            heapq.heapify(self.priority_queue)
+            self._stale = 0
+
     def get_next_workload(self):
         """获取下一个要执行的工作负载"""
-        if not self.priority_queue:
+        self.release_due()
+        while self.priority_queue:
+            entry = heapq.heappop(self.priority_queue)
+            workload_id = entry[1]
+            # 跳过重新调度后作废的旧条目
+            if self._entries.get(workload_id) is not entry:
+                self._stale -= 1
+                continue
+            del self._entries[workload_id]
+            self.queued_keys.pop(workload_id, None)
+            return workload_id
+        return None
+
+    def get_effective_priority(self, workload_id):
+        """排队工作负载的当前有效优先级"""
+        key = self.queued_keys.get(workload_id)
+        if key is None or self.aging_rate is None:
+            return key
+        return key + self.aging_rate * (self.clock() - self._epoch)
+
+    def starvation_bound(self, low='low', high='high'):
+        """低优先级任务最长等待时间（秒）：超过后有效优先级高于新到达的高优先级任务"""
+        if not self.aging_rate:
             return None
-            
-        _, workload_id = heapq.heappop(self.priority_queue)
-        return workload_id
-        
+        return (self._base_priority(high) - self._base_priority(low)) / self.aging_rate
+
+    def _base_priority(self, priority):
+        """基础优先级分值"""
+        return PRIORITY_SCORES.get(priority, PRIORITY_SCORES['normal'])
+
+    def _calculate_aging_key(self, workload, enqueue_time):
+        """计算老化模式的排序键（不随时间变化）"""
+        base_priority = self._base_priority(workload.get('priority', 'normal'))
+        retry_penalty = workload.get('retries', 0) * 5
+        return base_priority - retry_penalty - self.aging_rate * (enqueue_time - self._epoch)
+
     def _calculate_priority(self, workload):
         """计算工作负载优先级"""
-        base_priority = {
-            'high': 100,
-            'normal': 50,
-            'low': 10
-        }.get(workload.get('priority', 'normal'))
-        
+        base_priority = self._base_priority(workload.get('priority', 'normal'))
+
         # 等待时间权重
         wait_time = (datetime.now() - workload['created_at']).total_seconds()
         wait_factor = min(wait_time / 3600, 1)  # 最多等待1小时
-        
+
         # 重试次数权重
         retry_penalty = workload.get('retries', 0) * 5
-        
-        return base_priority + (wait_factor * 20) - retry_penalty
\ No newline at end of file
+
+        return base_priority + (wait_factor * 20) - retry_penalty
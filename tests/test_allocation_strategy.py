@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.resource.allocation_strategy import ResourceAllocationStrategy
+
+class TestResourceAllocationStrategy(unittest.TestCase):
+    def setUp(self):
+        self.strategy = ResourceAllocationStrategy()
+        self.strategy.update_resource('fast', {
+            'available': {'cpu': 8, 'memory': 16384},
+            'performance': 10, 'load': 0.7, 'cost': 5
+        })
+        self.strategy.update_resource('idle', {
+            'available': {'cpu': 4, 'memory': 8192},
+            'performance': 5, 'load': 0.1, 'cost': 3
+        })
+        self.strategy.update_resource('cheap', {
+            'available': {'cpu': 2, 'memory': 4096},
+            'performance': 1, 'load': 0.5, 'cost': 1
+        })
+
+    def _allocate(self, priority, requirements, resources=None):
+        workload = {'priority': priority, 'requirements': requirements}
+        return self.strategy.allocate_resources(workload, resources)
+
+    def test_priority_tiers(self):
+        """测试各优先级选择对应排名的资源"""
+        requirements = {'cpu': 2, 'memory': 2048}
+        self.assertEqual(self._allocate('high', requirements), 'fast')
+        self.assertEqual(self._allocate('normal', requirements), 'idle')
+        self.assertEqual(self._allocate('low', requirements), 'cheap')
+
+    def test_requirements_filter(self):
+        """测试跳过容量不足的资源"""
+        self.assertEqual(self._allocate('low', {'cpu': 4}), 'idle')
+        self.assertEqual(self._allocate('normal', {'cpu': 6}), 'fast')
+        self.assertIsNone(self._allocate('high', {'cpu': 16}))
+
+    def test_incremental_update(self):
+        """测试资源状态变化后索引同步更新"""
+        self.strategy.update_resource('fast', {
+            'available': {'cpu': 8, 'memory': 16384},
+            'performance': 0.5, 'load': 0.9, 'cost': 5
+        })
+        self.assertEqual(self._allocate('high', {'cpu': 1}), 'idle')
+
+        self.strategy.remove_resource('cheap')
+        self.assertEqual(self._allocate('low', {'cpu': 1}), 'idle')
+
+    def test_candidate_set(self):
+        """测试仅在候选资源中选择"""
+        self.assertEqual(self._allocate('high', {'cpu': 1}, {'cheap', 'idle'}), 'idle')
+
+    def test_stale_entries_compacted(self):
+        """测试频繁更新不会无限增长堆"""
+        for i in range(1000):
+            self.strategy.update_resource('idle', {
+                'available': {'cpu': 4}, 'performance': i, 'load': 0.1, 'cost': 3
+            })
+        classes = self.strategy._classes.values()
+        self.assertLess(sum(len(c.performance_heap) for c in classes), 100)
+        self.assertEqual(sum(len(c.cost_list) for c in classes), 3)
+        self.assertEqual(self._allocate('high', {'cpu': 1}), 'idle')
+
+    def test_ineligible_resources_not_visited(self):
+        """测试容量不足的资源不参与排名遍历"""
+        strategy = ResourceAllocationStrategy()
+        for i in range(1000):
+            strategy.update_resource(f'small_{i}', {
+                'available': {'cpu': 1}, 'performance': 100 + i, 'load': 0.0, 'cost': 0.1
+            })
+        strategy.update_resource('big', {
+            'available': {'cpu': 64}, 'performance': 1, 'load': 0.9, 'cost': 9
+        })
+
+        checked = []
+        is_eligible = strategy._is_eligible
+        strategy._is_eligible = lambda rid, *args: checked.append(rid) or is_eligible(rid, *args)
+        for priority in ('high', 'normal', 'low'):
+            workload = {'priority': priority, 'requirements': {'cpu': 32}}
+            self.assertEqual(strategy.allocate_resources(workload), 'big')
+        self.assertEqual(checked, [])
+        self.assertEqual(len(strategy._classes[(('cpu', 0),)].performance_heap), 1000)
+
+    def test_partial_class_and_boundary(self):
+        """测试同一容量等级内部分满足需求时逐个检查"""
+        self.strategy.update_resource('tight', {
+            'available': {'cpu': 5}, 'performance': 20, 'load': 0.0, 'cost': 0.5
+        })
+        self.assertEqual(self._allocate('high', {'cpu': 6}), 'fast')
+        self.assertEqual(self._allocate('low', {'cpu': 5}), 'tight')
+        self.assertEqual(self._allocate('normal', {'cpu': 4, 'memory': 8192}), 'idle')
+        self.assertEqual(self._allocate('high', {'cpu': 1}, ['cheap', 'idle', 'fast', 'tight']), 'tight')
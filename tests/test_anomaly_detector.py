@@ -0,0 +1,192 @@
+import unittest
+import threading
+import time
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.anomaly_detector import AnomalyDetector
+from src.workload.workload_manager import WorkloadManager
+from src.workload.workload_monitor import WorkloadMonitor
+
+class TestAnomalyDetector(unittest.TestCase):
+    def _warm(self, detector, workload_id='w1', n=50, start=0):
+        rng = np.random.default_rng(0)
+        for t in range(start, start + n):
+            detector.update_one(workload_id, {
+                'cpu_usage': 40 + rng.normal(0, 2),
+                'memory_usage': 50 + rng.normal(0, 2)
+            }, timestamp=t)
+        return start + n
+
+    def test_spike_reported_once(self):
+        """测试突增只在首次出现时上报，持续异常不重复上报"""
+        detector = AnomalyDetector()
+        t = self._warm(detector)
+        events = detector.update_one('w1', {'cpu_usage': 95, 'memory_usage': 50}, timestamp=t)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['metric'], 'cpu_usage')
+        self.assertGreater(events[0]['zscore'], 3)
+        self.assertTrue(detector.is_anomalous('w1'))
+
+        self.assertEqual(detector.update_one('w1', {'cpu_usage': 96, 'memory_usage': 50}, timestamp=t + 1), [])
+
+        # 恢复正常后再次异常会重新上报
+        detector.update_one('w1', {'cpu_usage': 40, 'memory_usage': 50}, timestamp=t + 2)
+        self.assertFalse(detector.is_anomalous('w1'))
+        self.assertEqual(len(detector.update_one('w1', {'cpu_usage': 99, 'memory_usage': 50}, timestamp=t + 3)), 1)
+
+    def test_no_anomaly_during_warmup(self):
+        """测试基线样本不足时不判断"""
+        detector = AnomalyDetector(warmup=10)
+        for t, value in enumerate([10, 90, 10, 90, 10]):
+            self.assertEqual(detector.update_one('w1', {'cpu_usage': value, 'memory_usage': 10}, timestamp=t), [])
+
+    def test_missing_values(self):
+        """测试缺失指标不更新基线"""
+        detector = AnomalyDetector()
+        t = self._warm(detector)
+        before = detector.get_baseline('w1', timestamp=t)
+        self.assertEqual(detector.update_one('w1', {'cpu_usage': 41}, timestamp=t), [])
+        after = detector.get_baseline('w1', timestamp=t)
+        self.assertEqual(before['memory_usage'], after['memory_usage'])
+
+    def test_seasonal_baseline(self):
+        """测试季节性基线不把每天固定时段的高峰判为异常"""
+        hour = 3600
+        plain = AnomalyDetector(alpha=0.05, threshold=4.0)
+        seasonal = AnomalyDetector(alpha=0.05, threshold=4.0, seasonal_buckets=24, bucket_seconds=hour)
+        rng = np.random.default_rng(1)
+        plain_events = seasonal_events = 0
+        for day in range(20):
+            for h in range(24):
+                timestamp = (day * 24 + h) * hour
+                cpu = (85 if h == 12 else 30) + rng.normal(0, 2)
+                metrics = {'cpu_usage': cpu, 'memory_usage': 50 + rng.normal(0, 2)}
+                plain_count = len(plain.update_one('w1', metrics, timestamp=timestamp))
+                seasonal_count = len(seasonal.update_one('w1', metrics, timestamp=timestamp))
+                if day >= 15:
+                    plain_events += plain_count
+                    seasonal_events += seasonal_count
+        self.assertGreater(plain_events, 0)
+        self.assertEqual(seasonal_events, 0)
+
+    def test_reset(self):
+        """测试清除基线后重新预热"""
+        detector = AnomalyDetector()
+        t = self._warm(detector)
+        self.assertTrue(detector.reset('w1'))
+        self.assertFalse(detector.reset('unknown'))
+        self.assertEqual(detector.update_one('w1', {'cpu_usage': 95, 'memory_usage': 50}, timestamp=t), [])
+
+    def test_fleet_matrix_update(self):
+        """测试一万个工作负载的矩阵一次更新"""
+        n = 10000
+        ids = [f'w{i}' for i in range(n)]
+        detector = AnomalyDetector(threshold=6.0, warmup=30)
+        rng = np.random.default_rng(2)
+        for t in range(40):
+            events = detector.update(ids, rng.normal(50, 2, size=(n, 2)), timestamp=t)
+            self.assertLess(len(events), n * 0.001)
+
+        values = rng.normal(50, 2, size=(n, 2))
+        values[[3, 7], 0] = 99
+        start = time.perf_counter()
+        events = detector.update(ids, values, timestamp=40)
+        elapsed = time.perf_counter() - start
+        spikes = sorted(e['workload_id'] for e in events if e['metric'] == 'cpu_usage' and e['value'] == 99)
+        self.assertEqual(spikes, ['w3', 'w7'])
+        self.assertLess(len(events), 10)
+        self.assertLess(elapsed, 0.1)
+
+class CountingAlertManager:
+    def check_alerts(self, workload_id, metrics):
+        return []
+
+class RecordingDetector(AnomalyDetector):
+    """记录每次批量更新的工作负载数和调用线程"""
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.threads = set()
+
+    def update(self, workload_ids, values, timestamp=None):
+        self.batches.append(len(workload_ids))
+        self.threads.add(threading.current_thread().name)
+        return super().update(workload_ids, values, timestamp)
+
+    def reset(self, workload_id):
+        self.threads.add(threading.current_thread().name)
+        return super().reset(workload_id)
+
+class TestMonitorAnomalies(unittest.TestCase):
+    def test_monitor_marks_new_anomaly(self):
+        """测试监控器基于基线偏离标记工作负载"""
+        manager = WorkloadManager()
+        manager.create_workload('w1', {'cpu': 1}, 'normal')
+        monitor = WorkloadMonitor(manager, alert_manager=object(), autoscaler=object())
+        for _ in range(30):
+            self.assertEqual(monitor._check_anomalies({'w1': {'cpu_usage': 95, 'memory_usage': 95}}), {})
+        anomalies = monitor._check_anomalies({'w1': {'cpu_usage': 10, 'memory_usage': 95}})['w1']
+        self.assertEqual([a['metric'] for a in anomalies], ['cpu_usage'])
+
+        monitor._handle_anomaly('w1', anomalies)
+        self.assertEqual(manager.workloads['w1'].status, 'warning')
+
+    def test_monitor_restores_status_after_recovery(self):
+        """测试异常恢复后工作负载重新计入活跃集合"""
+        manager = WorkloadManager()
+        manager.create_workload('w1', {'cpu': 1}, 'normal')
+        manager.update_workload_status('w1', 'running')
+        monitor = WorkloadMonitor(manager, alert_manager=CountingAlertManager(), autoscaler=object())
+        monitor.monitored.add('w1')
+
+        def tick(cpu):
+            monitor._batch['w1'] = {'cpu_usage': cpu, 'memory_usage': 50}
+            monitor._flush()
+
+        for _ in range(30):
+            tick(40)
+        tick(99)
+        self.assertEqual(manager.workloads['w1'].status, 'warning')
+        self.assertNotIn('w1', manager.get_all_active_workloads())
+
+        tick(40)
+        self.assertEqual(manager.workloads['w1'].status, 'running')
+        self.assertIn('w1', manager.get_all_active_workloads())
+
+    def test_monitor_batches_detector_updates(self):
+        """测试每个周期用一次矩阵更新处理所有工作负载，重置在事件循环线程中执行"""
+        n = 50
+        manager = WorkloadManager()
+        for i in range(n):
+            manager.create_workload(f'w{i}', {'cpu': 1}, 'normal')
+        detector = RecordingDetector()
+
+        async def collector(workload_id):
+            return {'cpu_usage': 40.0, 'memory_usage': 50.0}
+
+        class NoopAutoScaler:
+            def scale_fleet(self, workload_ids, metrics):
+                return {}
+
+        monitor = WorkloadMonitor(manager, monitoring_interval=0.05, tick_interval=0.2,
+                                  collector=collector, alert_manager=CountingAlertManager(),
+                                  autoscaler=NoopAutoScaler(), anomaly_detector=detector, seed=0)
+        try:
+            for i in range(n):
+                monitor.start_monitoring(f'w{i}')
+            time.sleep(0.7)
+            monitor.stop_monitoring('w0')
+            time.sleep(0.1)
+        finally:
+            monitor.stop()
+        # 0.7 秒内只有少数几次批量更新，每次覆盖全部工作负载
+        self.assertLessEqual(len(detector.batches), 4)
+        self.assertEqual(max(detector.batches), n)
+        self.assertEqual(detector.threads, {'workload-monitor'})
+        self.assertEqual(detector.get_baseline('w0')['cpu_usage'], (0.0, 0.0))
+
+if __name__ == '__main__':
+    unittest.main()
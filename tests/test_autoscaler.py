@@ -0,0 +1,162 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.autoscaler import AutoScaler, ScaleEventRing, PredictivePolicy
+
+class FakeLimiter:
+    """记录批量下发的资源限制器"""
+    def __init__(self, limits, failing=()):
+        self.limits = limits
+        self.failing = set(failing)
+        self.batches = []
+
+    def get_resource_limits(self, workload_id):
+        limits = self.limits.get(workload_id)
+        return dict(limits) if limits else None
+
+    def apply_limits(self, workload_id, limits):
+        return self.apply_limits_many({workload_id: limits})[workload_id]['success']
+
+    def apply_limits_many(self, limits_by_workload):
+        self.batches.append(dict(limits_by_workload))
+        results = {}
+        for workload_id, limits in limits_by_workload.items():
+            success = workload_id not in self.failing
+            if success:
+                self.limits[workload_id] = limits
+            results[workload_id] = {'success': success, 'skipped': False, 'latency': 0.0}
+        return results
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+class TestFleetAutoScaler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.ids = ['up', 'down', 'steady', 'unknown', 'broken']
+        self.limiter = FakeLimiter({
+            'up': {'cpu': 2, 'memory': 512},
+            'down': {'cpu': 4, 'memory': 1024},
+            'steady': {'cpu': 1, 'memory': 256},
+            'broken': {'cpu': 1, 'memory': 256}
+        }, failing={'broken'})
+        self.scaler = AutoScaler(self.limiter, history_size=8, clock=self.clock)
+        self.metrics = np.array([
+            [95, 50],   # 扩容
+            [10, 10],   # 缩容
+            [50, 50],   # 不变
+            [95, 95],   # 没有已知限制
+            [95, 10]    # 下发失败
+        ])
+
+    def test_single_batched_pass(self):
+        """测试一次计算全部方向并批量下发"""
+        results = self.scaler.scale_fleet(self.ids, self.metrics)
+        self.assertEqual(len(self.limiter.batches), 1)
+        self.assertEqual(set(self.limiter.batches[0]), {'up', 'down', 'broken'})
+        self.assertEqual(results['up']['direction'], 1)
+        self.assertEqual(results['up']['limits'], {'cpu': 3.0, 'memory': 768.0})
+        self.assertEqual(results['down']['limits'], {'cpu': 3.0, 'memory': 768.0})
+        self.assertFalse(results['broken']['success'])
+        self.assertNotIn('steady', results)
+
+    def test_cooldown(self):
+        """测试冷却期内不重复调整，失败的调整不进入冷却"""
+        self.scaler.scale_fleet(self.ids, self.metrics)
+        self.clock.now += 60
+        results = self.scaler.scale_fleet(self.ids, self.metrics)
+        self.assertEqual(set(results), {'broken'})
+
+        self.clock.now += self.scaler.scale_cooldown
+        results = self.scaler.scale_fleet(self.ids, self.metrics)
+        self.assertIn('up', results)
+
+    def test_history_ring_bounded(self):
+        """测试扩缩容事件环有上限"""
+        for _ in range(10):
+            self.scaler.scale_fleet(self.ids, self.metrics)
+            self.clock.now += self.scaler.scale_cooldown + 1
+        self.assertEqual(len(self.scaler.scale_history), 8)
+        history = self.scaler.get_scale_history('up')
+        self.assertEqual(len(history), 4)
+        self.assertTrue(all(event['direction'] == 1 for event in history))
+        timestamps = [event['timestamp'] for event in self.scaler.get_scale_history()]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_single_workload_path_shares_state(self):
+        """测试单个工作负载的检查与批量路径共享冷却状态"""
+        self.assertTrue(self.scaler.check_and_scale('up', {'cpu_usage': 90, 'memory_usage': 10}))
+        self.assertFalse(self.scaler.check_and_scale('up', {'cpu_usage': 90, 'memory_usage': 10}))
+        results = self.scaler.scale_fleet(['up'], [[95, 50]])
+        self.assertEqual(results, {})
+        self.assertEqual(len(self.scaler.get_scale_history('up')), 1)
+
+    def test_forget_reuses_rows(self):
+        """测试工作负载结束后状态行被复用，状态数组不随工作负载数增长"""
+        for generation in range(50):
+            workload_id = f'job_{generation}'
+            self.limiter.limits[workload_id] = {'cpu': 2, 'memory': 512}
+            results = self.scaler.scale_fleet([workload_id], [[95, 50]])
+            self.assertEqual(results[workload_id]['direction'], 1)
+            self.assertTrue(self.scaler.forget(workload_id))
+        self.assertEqual(len(self.scaler._ids), 1)
+        self.assertEqual(self.scaler.get_scale_history(), [])
+        self.assertFalse(self.scaler.forget('job_0'))
+
+        # 复用的行不继承上一个工作负载的冷却状态和事件
+        self.scaler.scale_fleet(['up'], [[95, 50]])
+        self.assertEqual(self.scaler._slot['up'], 0)
+        self.assertEqual([event['workload_id'] for event in self.scaler.get_scale_history()], ['up'])
+
+class TestPredictivePolicy(unittest.TestCase):
+    def setUp(self):
+        self.limiter = FakeLimiter({
+            'hot': {'cpu': 2, 'memory': 1000},
+            'idle': {'cpu': 4, 'memory': 1000},
+            'ok': {'cpu': 1, 'memory': 1000}
+        })
+        self.scaler = AutoScaler(self.limiter, clock=FakeClock(), policy=PredictivePolicy(target_utilization=0.6))
+
+    def test_proportional_single_step(self):
+        """测试一步把限制调整到目标利用率"""
+        results = self.scaler.scale_fleet(['hot'], [[90, 60]])
+        # 1.8 核 / 0.6 = 3 核；内存使用率已在目标附近，保持不变
+        self.assertAlmostEqual(results['hot']['limits']['cpu'], 3.0)
+        self.assertAlmostEqual(results['hot']['limits']['memory'], 1000)
+        self.assertEqual(results['hot']['direction'], 1)
+
+    def test_scale_down_is_bounded(self):
+        """测试单次缩容幅度受限"""
+        results = self.scaler.scale_fleet(['idle'], [[10, 60]])
+        self.assertAlmostEqual(results['idle']['limits']['cpu'], 2.0)
+        self.assertEqual(results['idle']['direction'], -1)
+
+    def test_deadband(self):
+        """测试接近目标利用率时不调整"""
+        self.assertEqual(self.scaler.scale_fleet(['ok'], [[55, 65]]), {})
+
+    def test_trend_and_noise_raise_limit(self):
+        """测试持续增长和波动会提高建议限制"""
+        policy = PredictivePolicy(target_utilization=0.6, deadband=0)
+        rows = np.array([0])
+        limits = np.array([[10.0, 1000.0]])
+        for usage in (40, 45, 50, 55):
+            proposed = policy.propose(rows, np.array([[usage, 60.0]]), limits)
+        # 仅按当前使用量计算为 5.5 / 0.6 ≈ 9.17
+        self.assertGreater(proposed[0, 0], 9.17)
+
+class TestScaleEventRing(unittest.TestCase):
+    def test_overwrite_oldest(self):
+        """测试写满后覆盖最旧事件"""
+        ring = ScaleEventRing(4)
+        ring.extend(1.0, np.arange(3), np.ones(3), np.ones(3), np.ones(3))
+        ring.extend(2.0, np.arange(3, 9), np.ones(6), np.ones(6), np.ones(6))
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.ordered()['row'].tolist(), [5, 6, 7, 8])
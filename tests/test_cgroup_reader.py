@@ -0,0 +1,206 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.monitoring.collectors.cgroup_reader import CgroupReader
+from src.workload.workload_manager import WorkloadManager
+from src.workload.workload_monitor import WorkloadMonitor
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestCgroupReader(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.reader = CgroupReader(root=self.root, path_template='{workload_id}',
+                                   memory_total=1000, clock=self.clock, cpu_count=1)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.root)
+
+    def _write_cgroup(self, workload_id, usage_usec, memory_current, rbytes, wbytes, memory_max='max',
+                      cpu_max=None):
+        """在临时目录中生成 cgroup v2 文件（原地改写，保持文件描述符有效）"""
+        path = os.path.join(self.root, workload_id)
+        os.makedirs(path, exist_ok=True)
+        files = {
+            'cpu.stat': f"usage_usec {usage_usec}\nuser_usec {usage_usec // 2}\n"
+                        f"system_usec {usage_usec // 2}\nnr_throttled 0\nthrottled_usec 7\n",
+            'memory.current': f"{memory_current}\n",
+            'memory.stat': "anon 300\nfile 100\nkernel 10\n",
+            'memory.max': f"{memory_max}\n",
+            'io.stat': f"8:0 rbytes={rbytes} wbytes={wbytes} rios=1 wios=1\n"
+                       f"8:16 rbytes={rbytes} wbytes=0 rios=1 wios=0\n"
+        }
+        if cpu_max is not None:
+            files['cpu.max'] = f"{cpu_max}\n"
+        for name, content in files.items():
+            with open(os.path.join(path, name), 'r+' if os.path.exists(os.path.join(path, name)) else 'w') as f:
+                f.seek(0)
+                f.write(content)
+                f.truncate()
+
+    def test_parse_and_rates(self):
+        """测试解析 cgroup 文件并由差值计算速率"""
+        self._write_cgroup('w1', usage_usec=1_000_000, memory_current=400, rbytes=100, wbytes=50)
+        first = self.reader.read('w1')
+        self.assertEqual(first['cpu_usage'], 0.0)
+        self.assertEqual(first['memory_bytes'], 400)
+        self.assertAlmostEqual(first['memory_usage'], 40.0)
+        self.assertEqual(first['memory_anon'], 300)
+        self.assertEqual(first['io_read_bytes'], 200)
+        self.assertEqual(first['cpu_throttled_usec'], 7)
+
+        self._write_cgroup('w1', usage_usec=2_000_000, memory_current=500, rbytes=300, wbytes=250)
+        self.clock.now += 2
+        second = self.reader.read('w1')
+        self.assertAlmostEqual(second['cpu_usage'], 50.0)
+        self.assertAlmostEqual(second['io_read_rate'], 200)
+        self.assertAlmostEqual(second['io_write_rate'], 100)
+
+    def test_file_handles_reused(self):
+        """测试重复读取复用已打开的文件描述符"""
+        self._write_cgroup('w1', 1, 1, 1, 1)
+        self.reader.read('w1')
+        fds = dict(self.reader._fds['w1'])
+        self.reader.read('w1')
+        self.assertEqual(self.reader._fds['w1'], fds)
+
+    def test_memory_limit(self):
+        """测试存在内存上限时按上限计算使用率"""
+        self._write_cgroup('w1', 1, 200, 1, 1, memory_max='400')
+        self.assertAlmostEqual(self.reader.read('w1')['memory_usage'], 50.0)
+
+    def test_cpu_relative_to_quota(self):
+        """测试 CPU 使用率按 cpu.max 配额换算为相对上限的百分比"""
+        # 0.5 核配额跑满
+        self._write_cgroup('half', 0, 1, 1, 1, cpu_max='50000 100000')
+        # 4 核配额用了 2 核
+        self._write_cgroup('quad', 0, 1, 1, 1, cpu_max='400000 100000')
+        self.reader.read_many(['half', 'quad'])
+        self.clock.now += 1
+        self._write_cgroup('half', 500_000, 1, 1, 1, cpu_max='50000 100000')
+        self._write_cgroup('quad', 2_000_000, 1, 1, 1, cpu_max='400000 100000')
+        results = self.reader.read_many(['half', 'quad'])
+        self.assertAlmostEqual(results['half']['cpu_usage'], 100.0)
+        self.assertAlmostEqual(results['half']['cpu_limit'], 0.5)
+        self.assertAlmostEqual(results['quad']['cpu_usage'], 50.0)
+
+    def test_cpu_without_quota_uses_online_cores(self):
+        """测试未设置配额时按在线核数换算"""
+        reader = CgroupReader(root=self.root, path_template='{workload_id}',
+                              memory_total=1000, clock=self.clock, cpu_count=4)
+        self._write_cgroup('w1', 0, 1, 1, 1, cpu_max='max 100000')
+        reader.read('w1')
+        self.clock.now += 1
+        self._write_cgroup('w1', 1_000_000, 1, 1, 1, cpu_max='max 100000')
+        self.assertAlmostEqual(reader.read('w1')['cpu_usage'], 25.0)
+        reader.close()
+
+    def test_open_files_bounded(self):
+        """测试缓存的文件描述符按最近读取淘汰，淘汰后保留计数器基线"""
+        reader = CgroupReader(root=self.root, path_template='{workload_id}',
+                              memory_total=1000, clock=self.clock, cpu_count=1, max_open=2)
+        for workload_id in ('w1', 'w2', 'w3'):
+            self._write_cgroup(workload_id, 0, 1, 1, 1)
+            reader.read(workload_id)
+        self.assertEqual(list(reader._fds), ['w2', 'w3'])
+        self.assertTrue(reader.has_baseline('w1'))
+
+        self.clock.now += 1
+        self._write_cgroup('w1', 1_000_000, 1, 1, 1)
+        self.assertAlmostEqual(reader.read('w1')['cpu_usage'], 100.0)
+        self.assertEqual(list(reader._fds), ['w3', 'w1'])
+
+        reader.unwatch('w1')
+        self.assertNotIn('w1', reader._fds)
+        self.assertNotIn('w1', reader.paths)
+        reader.close()
+
+    def test_from_config(self):
+        """测试按 monitoring.metrics_source 创建读取器"""
+        self.assertIsNone(CgroupReader.from_config({}))
+        reader = CgroupReader.from_config({
+            'monitoring': {'metrics_source': 'cgroup'},
+            'resources': {'cgroup_root': self.root, 'cgroup_path_template': '{workload_id}'}
+        }, memory_total=1000, cpu_count=1)
+        self._write_cgroup('w1', 1, 1, 1, 1)
+        self.assertIsNotNone(reader.read('w1'))
+        reader.close()
+
+        monitor = WorkloadMonitor(
+            WorkloadManager(), alert_manager=object(), autoscaler=object(), host_sampler=object(),
+            config={'monitoring': {'metrics_source': 'cgroup'}}
+        )
+        self.assertIsInstance(monitor.cgroup_reader, CgroupReader)
+
+    def test_read_many_skips_missing(self):
+        """测试批量读取跳过不存在的 cgroup"""
+        self._write_cgroup('w1', 1, 1, 1, 1)
+        self._write_cgroup('w2', 1, 1, 1, 1)
+        results = self.reader.read_many(['w1', 'w2', 'gone'])
+        self.assertEqual(set(results), {'w1', 'w2'})
+        self.assertNotIn('gone', self.reader._fds)
+
+    def test_release_after_removal(self):
+        """测试 cgroup 删除后释放并在重建后重新读取"""
+        self._write_cgroup('w1', 1, 1, 1, 1)
+        self.reader.read('w1')
+        self.reader.release('w1')
+        self.assertNotIn('w1', self.reader._fds)
+        self.assertIsNotNone(self.reader.read('w1'))
+
+    def test_monitor_uses_cgroup_metrics(self):
+        """测试监控器优先使用工作负载自身的 cgroup 指标"""
+        self._write_cgroup('w1', 1_000_000, 250, 1, 1)
+        monitor = WorkloadMonitor(
+            WorkloadManager(), collector=None, alert_manager=object(), autoscaler=object(),
+            host_sampler=object(), cgroup_reader=self.reader
+        )
+        # 首次读取只记录计数器
+        self.assertIsNone(monitor._collect_metrics('w1'))
+        self._write_cgroup('w1', 1_500_000, 250, 1, 1)
+        self.clock.now += 1
+        metrics = monitor._collect_metrics('w1')
+        self.assertAlmostEqual(metrics['memory_usage'], 25.0)
+        self.assertAlmostEqual(metrics['cpu_usage'], 50.0)
+
+    def test_monitor_releases_finished_workload(self):
+        """测试工作负载结束后监控器停止监控并关闭文件描述符"""
+        manager = WorkloadManager()
+        manager.create_workload('w1', {'cpu': 1})
+        self._write_cgroup('w1', 1, 1, 1, 1)
+        monitor = WorkloadMonitor(
+            manager, alert_manager=object(), autoscaler=object(),
+            host_sampler=object(), cgroup_reader=self.reader
+        )
+        monitor.monitored.add('w1')
+        metrics = self.reader.read('w1')
+        manager.update_workload_status('w1', 'completed')
+        monitor._batch['w1'] = metrics
+        monitor._flush()
+        self.assertFalse(monitor.is_monitoring('w1'))
+        self.assertNotIn('w1', self.reader._fds)
+        self.assertNotIn('w1', self.reader.paths)
+
+    def test_monitor_skips_missing_cgroup(self):
+        """测试 cgroup 读取失败时跳过本次采集，不退回主机指标"""
+        class HostSampler:
+            def get_snapshot(self):
+                raise AssertionError('不应读取主机指标')
+
+        monitor = WorkloadMonitor(
+            WorkloadManager(), collector=None, alert_manager=object(), autoscaler=object(),
+            host_sampler=HostSampler(), cgroup_reader=self.reader
+        )
+        self.assertIsNone(monitor._collect_metrics('gone'))
+        self.assertIsNone(monitor._collect_metrics('gone'))
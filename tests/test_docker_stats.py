@@ -0,0 +1,249 @@
+import unittest
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sys
+import os
+import docker
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.monitoring.collectors.docker_stats import DockerStatsStreamer
+from src.workload.resource_limiter import ResourceLimiter
+
+def make_stats(seq, usage_step=50, system_step=1000):
+    """构造 Docker stats 响应"""
+    return {
+        'cpu_stats': {
+            'cpu_usage': {'total_usage': seq * usage_step},
+            'system_cpu_usage': seq * system_step,
+            'online_cpus': 2
+        },
+        'precpu_stats': {
+            'cpu_usage': {'total_usage': (seq - 1) * usage_step},
+            'system_cpu_usage': (seq - 1) * system_step
+        },
+        'memory_stats': {'usage': 256, 'limit': 1024},
+        'networks': {'eth0': {'rx_bytes': seq, 'tx_bytes': 2 * seq}}
+    }
+
+class FakeContainer:
+    """模拟容器：流式接口按周期产出统计，可在指定条数后断开"""
+    def __init__(self, api, container_id):
+        self.api = api
+        self.id = container_id
+
+    def stats(self, stream=True, decode=False):
+        if not stream:
+            time.sleep(self.api.oneshot_latency)
+            self.api.oneshot_calls += 1
+            return make_stats(1)
+        return FakeStream(self.api, self.id)
+
+class FakeStream:
+    """模拟 HTTP 统计流：按周期产出，close 可从其他线程中断等待"""
+    def __init__(self, api, container_id):
+        self.api = api
+        self.id = container_id
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+    def __iter__(self):
+        with self.api.lock:
+            self.api.open_streams += 1
+            attempt = self.api.connects[self.id] = self.api.connects.get(self.id, 0) + 1
+        try:
+            seq = 0
+            while not self.closed.is_set():
+                seq += 1
+                if attempt <= self.api.fail_first.get(self.id, 0) and seq > 2:
+                    raise ConnectionError('stream reset')
+                yield make_stats(seq)
+                if self.closed.wait(self.api.interval):
+                    raise ConnectionError('stream closed')
+        finally:
+            with self.api.lock:
+                self.api.open_streams -= 1
+
+class FakeContainers:
+    def __init__(self, api):
+        self.api = api
+
+    def get(self, container_id):
+        return FakeContainer(self.api, container_id)
+
+class FakeApiClient:
+    """APIClient 替身，只实现 stats 接口"""
+    def __init__(self, client):
+        self.client = client
+
+    def stats(self, container, decode=None, stream=True):
+        return self.client.containers.get(container).stats(stream=stream, decode=decode)
+
+class StatsHandler(BaseHTTPRequestHandler):
+    """模拟 Docker 守护进程的 /containers/{id}/stats 分块流"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.server.paths.append(self.path)
+        seq = 0
+        try:
+            while not self.server.stopped.is_set():
+                seq += 1
+                body = (json.dumps(make_stats(seq)) + '\n').encode()
+                self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+                self.wfile.flush()
+                time.sleep(self.server.interval)
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.disconnects.append(self.path)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeDockerClient:
+    """本地 Docker API 替身"""
+    def __init__(self, interval=0.01, oneshot_latency=0.0):
+        self.interval = interval
+        self.oneshot_latency = oneshot_latency
+        self.oneshot_calls = 0
+        self.fail_first = {}  # 容器ID -> 前几次连接在产出两条后断开
+        self.connects = {}
+        self.open_streams = 0
+        self.lock = threading.Lock()
+        self.containers = FakeContainers(self)
+        self.api = FakeApiClient(self)
+
+class TestDockerStatsStreamer(unittest.TestCase):
+    def test_parse_stats(self):
+        """测试解析 CPU、内存和网络统计"""
+        stats = DockerStatsStreamer.parse_stats(make_stats(3))
+        self.assertEqual(stats['cpu_usage'], 150)
+        self.assertAlmostEqual(stats['cpu_percent'], 50 / 1000 * 2 * 100)
+        self.assertAlmostEqual(stats['memory_percent'], 25.0)
+        self.assertEqual(stats['rx_bytes'], 3)
+        self.assertEqual(stats['tx_bytes'], 6)
+
+    def test_hundreds_of_containers(self):
+        """测试数百个容器的统计流并发更新最新值表"""
+        n = 300
+        client = FakeDockerClient(interval=0.02)
+        streamer = DockerStatsStreamer(client, max_workers=n)
+        try:
+            start = time.perf_counter()
+            self.assertEqual(streamer.watch_many([f'c{i}' for i in range(n)]), n)
+            deadline = start + 5
+            while len(streamer.get_all_stats()) < n and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(streamer.get_all_stats()), n)
+            # 全部容器首个样本在远小于串行一次性查询所需的时间内到达
+            self.assertLess(time.perf_counter() - start, 3)
+
+            first = {cid: stats['network_io']['eth0']['rx_bytes'] for cid, stats in streamer.get_all_stats().items()}
+            time.sleep(0.3)
+            advanced = sum(
+                1 for cid, stats in streamer.get_all_stats().items()
+                if stats['network_io']['eth0']['rx_bytes'] > first[cid]
+            )
+            self.assertGreater(advanced, n * 0.9)
+        finally:
+            streamer.stop()
+        self.assertEqual(client.open_streams, 0)
+
+    def test_reconnect_after_failure(self):
+        """测试流中断后重连"""
+        client = FakeDockerClient(interval=0.005)
+        client.fail_first['c1'] = 2
+        streamer = DockerStatsStreamer(client, max_workers=4, reconnect_delay=0.01)
+        try:
+            streamer.watch('c1')
+            deadline = time.perf_counter() + 3
+            while client.connects.get('c1', 0) < 3 and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(streamer.reconnects['c1'], 2)
+            time.sleep(0.05)
+            self.assertGreater(streamer.get_stats('c1')['rx_bytes'], 2)
+        finally:
+            streamer.stop()
+
+    def test_unwatch(self):
+        """测试停止读取时直接关闭流，不等待下一条消息"""
+        client = FakeDockerClient(interval=10)
+        streamer = DockerStatsStreamer(client, max_workers=4)
+        try:
+            streamer.watch('c1')
+            deadline = time.perf_counter() + 2
+            while streamer.get_stats('c1') is None and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(streamer.unwatch('c1'))
+            self.assertFalse(streamer.is_watching('c1'))
+            time.sleep(0.05)
+            self.assertEqual(client.open_streams, 0)
+            self.assertIsNone(streamer.get_stats('c1'))
+        finally:
+            streamer.stop()
+
+    def test_real_api_client(self):
+        """测试通过真实的 docker.APIClient 读取本地 HTTP 服务模拟的统计流，停止后断开连接"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StatsHandler)
+        server.daemon_threads = True
+        server.paths, server.disconnects = [], []
+        server.stopped = threading.Event()
+        server.interval = 0.05
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = docker.DockerClient(base_url=f'tcp://127.0.0.1:{server.server_address[1]}', version='1.41')
+        streamer = DockerStatsStreamer(client, max_workers=2)
+        try:
+            self.assertTrue(streamer.watch('c1'))
+            deadline = time.perf_counter() + 5
+            while (streamer.get_stats('c1') or {}).get('rx_bytes', 0) < 2 and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            self.assertGreaterEqual(streamer.get_stats('c1')['rx_bytes'], 2)
+            self.assertEqual(server.paths, ['/v1.41/containers/c1/stats?stream=True'])
+
+            self.assertTrue(streamer.unwatch('c1'))
+            deadline = time.perf_counter() + 5
+            while not server.disconnects and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(server.disconnects, server.paths)
+        finally:
+            streamer.stop()
+            client.close()
+            server.stopped.set()
+            server.shutdown()
+            server.server_close()
+
+    def test_refuse_beyond_limit(self):
+        """测试超过流数量上限时拒绝读取，退回的一次性查询按间隔限流"""
+        client = FakeDockerClient(interval=0.005)
+        streamer = DockerStatsStreamer(client, max_workers=1)
+        limiter = ResourceLimiter(docker_client=client, stats_streamer=streamer)
+        try:
+            self.assertTrue(streamer.watch('c1'))
+            self.assertFalse(streamer.watch('c2'))
+            self.assertFalse(streamer.is_watching('c2'))
+            for _ in range(5):
+                self.assertIsNotNone(limiter.get_resource_usage('c2'))
+            self.assertEqual(client.oneshot_calls, 1)
+        finally:
+            streamer.stop()
+
+    def test_resource_limiter_reads_stream(self):
+        """测试资源限制器优先读取统计流"""
+        client = FakeDockerClient(interval=0.005)
+        streamer = DockerStatsStreamer(client, max_workers=4)
+        limiter = ResourceLimiter(docker_client=client, stats_streamer=streamer)
+        try:
+            self.assertIsNotNone(limiter.get_resource_usage('c1'))
+            self.assertEqual(client.oneshot_calls, 1)
+            time.sleep(0.05)
+            usage = limiter.get_resource_usage('c1')
+            self.assertEqual(client.oneshot_calls, 1)
+            self.assertEqual(usage['memory_usage'], 256)
+        finally:
+            streamer.stop()
@@ -0,0 +1,128 @@
+import unittest
+import time
+import sys
+import os
+from collections import namedtuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.monitoring.collectors import host_sampler
+from src.monitoring.collectors.host_sampler import HostSampler, get_host_sampler
+from src.monitoring.collectors.metrics_collector import MetricsCollector
+from src.workload.workload_manager import WorkloadManager
+from src.workload.workload_monitor import WorkloadMonitor
+
+CpuTimes = namedtuple('CpuTimes', 'user system idle iowait')
+Memory = namedtuple('Memory', 'percent')
+DiskIO = namedtuple('DiskIO', 'read_bytes write_bytes')
+NetIO = namedtuple('NetIO', 'bytes_sent bytes_recv')
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class ScriptedSampler(HostSampler):
+    """按脚本返回计数器的采样器"""
+    def __init__(self, readings, clock):
+        super().__init__(interval=1.0, max_staleness=5.0, clock=clock, prime_delay=0)
+        self.readings = iter(readings)
+
+    def _read_counters(self):
+        cpu, disk, net = next(self.readings)
+        return {
+            'sampled_at': self.clock(),
+            'cpu_times': cpu,
+            'memory': Memory(42.0),
+            'disk_usage': 10.0,
+            'disk_io': disk,
+            'net_io': net
+        }
+
+class TestHostSampler(unittest.TestCase):
+    def test_rates_from_counter_deltas(self):
+        """测试使用率和速率由计数器差值计算"""
+        clock = FakeClock()
+        sampler = ScriptedSampler([
+            (CpuTimes(0, 0, 0, 0), DiskIO(0, 0), NetIO(0, 0)),
+            (CpuTimes(10, 10, 70, 10), DiskIO(0, 0), NetIO(0, 0)),
+            (CpuTimes(40, 20, 120, 20), DiskIO(4000, 2000), NetIO(1000, 3000)),
+        ], clock)
+
+        # 首次采样先读取基线，第一份快照的 CPU 使用率即有效
+        first = sampler.sample()
+        self.assertAlmostEqual(first['cpu_usage'], 20.0)
+        self.assertEqual(first['memory_usage'], 42.0)
+
+        clock.now += 2
+        second = sampler.sample()
+        # 总计增加 100，其中空闲 50 + iowait 10
+        self.assertAlmostEqual(second['cpu_usage'], 40.0)
+        self.assertAlmostEqual(second['disk_read_rate'], 2000)
+        self.assertAlmostEqual(second['disk_write_rate'], 1000)
+        self.assertAlmostEqual(second['net_sent_rate'], 500)
+        self.assertAlmostEqual(second['net_recv_rate'], 1500)
+
+    def test_snapshot_reused_until_stale(self):
+        """测试快照在陈旧上限内直接复用"""
+        clock = FakeClock()
+        reading = (CpuTimes(1, 1, 1, 1), DiskIO(0, 0), NetIO(0, 0))
+        sampler = ScriptedSampler([reading] * 3, clock)
+
+        snapshot = sampler.get_snapshot()
+        clock.now += 4
+        self.assertIs(sampler.get_snapshot(), snapshot)
+        clock.now += 2
+        self.assertIsNot(sampler.get_snapshot(), snapshot)
+
+    def test_shared_sampler_interval(self):
+        """测试共享采样器的周期与之后的调用不一致时报错"""
+        shared = HostSampler(interval=2.0)
+        previous, host_sampler._shared_sampler = host_sampler._shared_sampler, shared
+        try:
+            self.assertIs(get_host_sampler(), shared)
+            self.assertIs(get_host_sampler(2.0), shared)
+            with self.assertRaises(ValueError):
+                get_host_sampler(0.5)
+        finally:
+            host_sampler._shared_sampler = previous
+
+    def test_background_thread(self):
+        """测试后台线程持续刷新快照"""
+        sampler = HostSampler(interval=0.05)
+        try:
+            sampler.start()
+            first = sampler.get_snapshot()
+            time.sleep(0.2)
+            self.assertGreater(sampler.get_snapshot()['sampled_at'], first['sampled_at'])
+        finally:
+            sampler.stop()
+
+class TestNonBlockingCollection(unittest.TestCase):
+    def setUp(self):
+        self.sampler = HostSampler(interval=0.05)
+        self.sampler.start()
+
+    def tearDown(self):
+        self.sampler.stop()
+
+    def test_workload_monitor_collect(self):
+        """测试工作负载指标采集不阻塞"""
+        monitor = WorkloadMonitor(
+            WorkloadManager(), alert_manager=object(), autoscaler=object(),
+            host_sampler=self.sampler
+        )
+        start = time.perf_counter()
+        for i in range(100):
+            metrics = monitor._collect_metrics(f'w{i}')
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIn('cpu_usage', metrics)
+
+    def test_metrics_collector_latency(self):
+        """测试延迟指标读取快照而不是阻塞采样"""
+        collector = MetricsCollector(host_sampler=self.sampler)
+        start = time.perf_counter()
+        metrics = collector.collect_metrics()
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertGreaterEqual(metrics['latency'], 0)
@@ -1,6 +1,9 @@
 import unittest
 import os
 import tempfile
+import sqlite3
+import json
+from unittest import mock
 from src.system.system_manager import SystemManager
 from src.config.config_manager import ConfigManager
 
@@ -46,4 +49,64 @@ class TestSystemIntegration(unittest.TestCase):
             workload,
             metrics
         )
-        self.assertTrue(success)
\ No newline at end of file
+        self.assertTrue(success)
+
+class TestBatchSubmission(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = {
+            'system': {
+                'db_path': os.path.join(self.tmp_dir, 'test.db'),
+                'report_dir': os.path.join(self.tmp_dir, 'reports')
+            },
+            'resources': {'cpu_threshold': 80, 'memory_threshold': 85},
+            'alerts': {'enabled': False, 'channels': []}
+        }
+        self.system = SystemManager(self.config)
+        
+    def test_submit_many(self):
+        """测试批量提交工作负载"""
+        workloads = [(f'batch_{i}', {'cpu': 1, 'memory': 512}, 'low') for i in range(20000)]
+        workloads.append(('batch_1', {'cpu': 1}, 'high'))
+        workloads.append({'workload_id': 'bad', 'requirements': None})
+        workloads.append({'workload_id': 'urgent', 'requirements': {'cpu': 4}, 'priority': 'high'})
+        
+        result = self.system.submit_many(workloads)
+        self.assertEqual(len(result['submitted']), 20001)
+        self.assertEqual(set(result['errors']), {'batch_1', 'bad'})
+        self.assertTrue(result['persisted'])
+        
+        with sqlite3.connect(self.config['system']['db_path']) as conn:
+            count = conn.execute('SELECT COUNT(*) FROM workloads').fetchone()[0]
+        self.assertEqual(count, 20001)
+        
+        self.assertEqual(self.system.priority_queue.dequeue()[0], 'urgent')
+        self.assertEqual(
+            len(self.system.workload_manager.get_workloads_by_status('pending')), 20001
+        )
+
+    def test_persist_failure_aborts_batch(self):
+        """测试持久化失败时整批不加入队列"""
+        workloads = [(f'batch_{i}', {'cpu': 1}, 'low') for i in range(10)]
+        with mock.patch.object(self.system.persistence_manager, 'save_workloads', return_value=False):
+            result = self.system.submit_many(workloads)
+        self.assertEqual(result['submitted'], [])
+        self.assertFalse(result['persisted'])
+        self.assertIn('batch', result['errors'])
+        self.assertEqual(len(self.system.priority_queue), 0)
+        self.assertEqual(self.system.workload_manager.workloads, {})
+
+    def test_persist_without_metrics(self):
+        """测试持久化工作负载时不展开指标环"""
+        self.system.submit_many([('m1', {'cpu': 1}, 'low')])
+        manager = self.system.workload_manager
+        manager.update_workload_metrics('m1', {'cpu_usage': 10, 'memory_usage': 20})
+        with mock.patch.object(type(manager.workloads['m1'].metrics), 'to_dict',
+                               side_effect=AssertionError('不应展开指标')):
+            self.assertTrue(self.system.persistence_manager.save_workloads(
+                [('m1', manager.workloads['m1'])]
+            ))
+        with sqlite3.connect(self.config['system']['db_path']) as conn:
+            data = json.loads(conn.execute("SELECT data FROM workloads WHERE id = 'm1'").fetchone()[0])
+        self.assertNotIn('metrics', data)
+        self.assertEqual(data['requirements'], {'cpu': 1})
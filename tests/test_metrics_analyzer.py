@@ -0,0 +1,75 @@
+import unittest
+import time
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.metrics_analyzer import MetricsAnalyzer, StreamingMetricsAnalyzer
+
+def make_samples(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {'cpu_usage': 50 + 0.01 * i + rng.normal(0, 5), 'memory_usage': 60 + rng.normal(0, 3)}
+        for i in range(n)
+    ]
+
+class TestStreamingMetricsAnalyzer(unittest.TestCase):
+    def test_matches_batch_analysis(self):
+        """测试流式结果与批量 DataFrame 结果一致"""
+        samples = make_samples(5000)
+        batch = MetricsAnalyzer().analyze_metrics(samples)
+        stream = StreamingMetricsAnalyzer()
+        stream.ingest_many(samples)
+        result = stream.analyze()
+
+        for metric in ('cpu_usage', 'memory_usage'):
+            expected = batch['basic_stats'][metric]
+            actual = result['basic_stats'][metric]
+            for key in ('mean', 'std', 'min', 'max'):
+                self.assertAlmostEqual(actual[key], expected[key], places=6)
+            # P² 为近似分位数
+            self.assertAlmostEqual(actual['p95'], expected['p95'], delta=abs(expected['p95']) * 0.03)
+
+            self.assertAlmostEqual(result['trends'][metric]['slope'], batch['trends'][metric]['slope'], places=9)
+            self.assertEqual(result['trends'][metric]['trend'], batch['trends'][metric]['trend'])
+            self.assertAlmostEqual(result['trends'][metric]['moving_average'],
+                                   batch['trends'][metric]['moving_average'][-1], places=6)
+
+    def test_ewma_matches_pandas(self):
+        """测试 EWMA 与 pandas ewm(adjust=False) 一致"""
+        samples = make_samples(1000)
+        stream = StreamingMetricsAnalyzer(ewma_alpha=0.2)
+        stream.ingest_many(samples)
+        expected = pd.DataFrame(samples)['cpu_usage'].ewm(alpha=0.2, adjust=False).mean().iloc[-1]
+        self.assertAlmostEqual(stream.analyze()['trends']['cpu_usage']['ewma'], expected, places=9)
+
+    def test_windowed_slope(self):
+        """测试滑动窗口斜率与窗口内 polyfit 一致"""
+        samples = make_samples(3000)
+        stream = StreamingMetricsAnalyzer(slope_window=200)
+        stream.ingest_many(samples)
+        values = pd.DataFrame(samples)['cpu_usage'].values[-200:]
+        expected = np.polyfit(range(200), values, 1)[0]
+        self.assertAlmostEqual(stream.analyze()['trends']['cpu_usage']['slope'], expected, places=9)
+
+    def test_analyze_cost_independent_of_history(self):
+        """测试 analyze 耗时不随历史长度增长"""
+        stream = StreamingMetricsAnalyzer()
+        stream.ingest_many(make_samples(20000))
+        start = time.perf_counter()
+        for _ in range(100):
+            stream.analyze()
+        self.assertLess((time.perf_counter() - start) / 100, 0.001)
+
+    def test_empty_and_partial(self):
+        """测试样本不足时的结果"""
+        stream = StreamingMetricsAnalyzer()
+        self.assertIsNone(stream.analyze()['basic_stats']['cpu_usage']['mean'])
+        stream.ingest({'cpu_usage': 10})
+        result = stream.analyze()
+        self.assertEqual(result['basic_stats']['cpu_usage']['mean'], 10)
+        self.assertIsNone(result['basic_stats']['cpu_usage']['std'])
+        self.assertIsNone(result['trends']['cpu_usage']['moving_average'])
+        self.assertIsNone(result['basic_stats']['memory_usage']['mean'])
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.priority_queue import WorkloadPriorityQueue
+
+class TestWorkloadPriorityQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = WorkloadPriorityQueue()
+
+    def _drain(self):
+        order = []
+        while len(self.queue):
+            order.append(self.queue.dequeue()[0])
+        return order
+
+    def test_priority_and_fifo_order(self):
+        """测试优先级排序与同优先级先进先出"""
+        for i, priority in enumerate(['low', 'normal', 'high', 'normal', 'high', 'low']):
+            self.queue.enqueue(f'w{i}', priority, {})
+        self.assertEqual(self._drain(), ['w2', 'w4', 'w1', 'w3', 'w0', 'w5'])
+        self.assertIsNone(self.queue.dequeue())
+
+    def test_cancel_and_reprioritize(self):
+        """测试取消与调整优先级"""
+        for i in range(5):
+            self.queue.enqueue(f'w{i}', 'normal', {'cpu': i})
+        self.assertTrue(self.queue.remove('w0'))
+        self.assertFalse(self.queue.remove('w0'))
+        self.assertTrue(self.queue.update_priority('w4', 'high'))
+        self.assertEqual(len(self.queue), 4)
+        self.assertEqual(self.queue.peek(), ('w4', {'cpu': 4}))
+        self.assertEqual(self._drain(), ['w4', 'w1', 'w2', 'w3'])
+
+    def test_bulk_enqueue(self):
+        """测试批量加入队列"""
+        self.queue.enqueue('existing', 'normal', {})
+        count = self.queue.bulk_enqueue((f'w{i}', 'high' if i % 3 == 0 else 'low', {}) for i in range(300))
+        self.assertEqual(count, 300)
+        self.assertEqual(len(self.queue), 301)
+        order = self._drain()
+        self.assertEqual(order[:100], [f'w{i}' for i in range(0, 300, 3)])
+        self.assertEqual(order[100], 'existing')
+
+    def test_stale_entries_compacted(self):
+        """测试反复调整优先级后堆大小受控"""
+        for i in range(100):
+            self.queue.enqueue(f'w{i}', 'normal', {})
+        for round_ in range(50):
+            for i in range(100):
+                self.queue.update_priority(f'w{i}', round_ % 3 + 1)
+        self.assertLessEqual(len(self.queue.queue), 300)
+        self.assertEqual(len(self._drain()), 100)
@@ -0,0 +1,84 @@
+import unittest
+import random
+from datetime import datetime, timedelta
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.resource_manager.reservation_calendar import IntervalTree, ReservationCalendar
+from src.resource_manager.resource_manager import ResourceManager
+from src.resource_manager.resource_reserve import ResourceReserve
+
+BASE = datetime(2025, 1, 6, 0, 0)
+
+def at(hours):
+    return BASE + timedelta(hours=hours)
+
+class TestIntervalTree(unittest.TestCase):
+    def test_overlap_matches_brute_force(self):
+        """测试重叠查询与暴力扫描一致"""
+        rng = random.Random(3)
+        tree = IntervalTree(seed=3)
+        intervals = {}
+        for i in range(2000):
+            start = rng.uniform(0, 1000)
+            intervals[i] = (start, start + rng.uniform(0.1, 20))
+            tree.insert(intervals[i][0], intervals[i][1], i)
+        for i in range(0, 2000, 3):
+            self.assertTrue(tree.remove(intervals.pop(i)[0], i))
+        self.assertEqual(len(tree), len(intervals))
+
+        for _ in range(100):
+            start = rng.uniform(0, 1000)
+            end = start + rng.uniform(0.1, 50)
+            expected = {i for i, (s, e) in intervals.items() if s < end and e > start}
+            self.assertEqual({b for _, _, b in tree.overlapping(start, end)}, expected)
+
+
+class TestReservationCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = ReservationCalendar()
+        self.calendar.set_capacity('node-1', {'cpu': 8, 'memory': 16384})
+
+    def test_admission(self):
+        """测试预约准入检查"""
+        first = self.calendar.reserve('node-1', at(1), at(3), {'cpu': 6}, now=BASE)
+        self.assertIsNotNone(first)
+        # 重叠时段容量不足
+        self.assertIsNone(self.calendar.reserve('node-1', at(2), at(4), {'cpu': 4}, now=BASE))
+        # 相邻时段不重叠
+        self.assertIsNotNone(self.calendar.reserve('node-1', at(3), at(4), {'cpu': 8}, now=BASE))
+        self.assertEqual(self.calendar.free_capacity('node-1', at(0), at(5))['cpu'], 0)
+        self.assertEqual(self.calendar.free_capacity('node-1', at(0), at(1))['cpu'], 8)
+
+    def test_peak_over_range(self):
+        """测试时间段内的峰值并发预约量"""
+        self.calendar.reserve('node-1', at(1), at(3), {'cpu': 2}, now=BASE)
+        self.calendar.reserve('node-1', at(2), at(5), {'cpu': 3}, now=BASE)
+        self.calendar.reserve('node-1', at(4), at(6), {'cpu': 1}, now=BASE)
+        self.assertEqual(self.calendar.booked_peak('node-1', at(0), at(6))['cpu'], 5)
+        self.assertEqual(self.calendar.booked_peak('node-1', at(3), at(6))['cpu'], 4)
+
+    def test_expiry_and_cancel(self):
+        """测试过期预约自动释放与取消"""
+        expired = self.calendar.reserve('node-1', at(1), at(2), {'cpu': 8}, now=BASE)
+        pending = self.calendar.reserve('node-1', at(3), at(4), {'cpu': 8}, now=BASE)
+        self.assertEqual(self.calendar.release_expired(at(2)), [expired])
+        self.assertNotIn(expired, self.calendar.bookings)
+
+        self.assertTrue(self.calendar.cancel(pending))
+        self.assertEqual(self.calendar.release_expired(at(5)), [])
+        self.assertEqual(len(self.calendar.trees['node-1']), 0)
+
+    def test_manager_and_reserve_integration(self):
+        """测试与 ResourceManager、ResourceReserve 共享日历"""
+        manager = ResourceManager()
+        manager.register_resource('node-1', {'cpu': 8})
+        now = datetime.now()
+        booking = manager.reserve_capacity('node-1', now - timedelta(minutes=1), now + timedelta(hours=1), {'cpu': 6})
+        self.assertIsNotNone(booking)
+
+        reserve = ResourceReserve(calendar=manager.reservations)
+        self.assertEqual(reserve._calculate_booked_reserve('node-1'), 6)
+        manager.cancel_reservation(booking)
+        self.assertEqual(reserve._calculate_booked_reserve('node-1'), 0)
@@ -0,0 +1,49 @@
+import unittest
+import time
+from datetime import datetime
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.resource.allocator import ResourceAllocator
+from src.resource.clock import SimulatedClock
+
+class TestResourceAllocator(unittest.TestCase):
+    def _run(self, seed, duration=3600):
+        clock = SimulatedClock(start=datetime(2025, 1, 1))
+        allocator = ResourceAllocator(clock=clock, seed=seed)
+        return allocator.run_test(duration)
+
+    def test_simulated_hour(self):
+        """测试虚拟时钟下一小时的采样"""
+        start = time.perf_counter()
+        test_data = self._run(seed=42)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+        self.assertEqual(len(test_data['latency_metrics']), 3600)
+        self.assertEqual(len(test_data['throughput_metrics']), 3600)
+        self.assertEqual(len(test_data['metrics']['cpu_usage']), 3600)
+        self.assertEqual(len(test_data['metrics']['memory_usage']), 3600)
+        for event in test_data['failure_events']:
+            delay = event['recovery_time'] - event['failure_time']
+            self.assertTrue(30 <= delay <= 40)
+
+    def test_deterministic_seed(self):
+        """测试相同种子结果一致"""
+        self.assertEqual(self._run(seed=7), self._run(seed=7))
+        self.assertNotEqual(self._run(seed=7), self._run(seed=8))
+
+    def test_default_start_is_fixed(self):
+        """测试未指定起始时间时虚拟时钟不依赖系统时间"""
+        self.assertEqual(SimulatedClock().now(), SimulatedClock.DEFAULT_START)
+        runs = [ResourceAllocator(clock=SimulatedClock(), seed=3).run_test(600) for _ in range(2)]
+        self.assertEqual(runs[0], runs[1])
+
+    def test_output_schema(self):
+        """测试输出结构与真实时钟一致"""
+        test_data = self._run(seed=1, duration=5)
+        self.assertEqual(
+            set(test_data),
+            {'latency_metrics', 'throughput_metrics', 'metrics', 'failure_events'}
+        )
+        self.assertIsInstance(test_data['latency_metrics'][0], float)
@@ -0,0 +1,244 @@
+import unittest
+import shutil
+import tempfile
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.resource_limiter import ResourceLimiter
+from src.workload.cgroup_limits import CgroupLimitBackend
+from src.workload.autoscaler import AutoScaler
+
+class FakeContainer:
+    def __init__(self, client, container_id):
+        self.client = client
+        self.id = container_id
+        self.attrs = {'HostConfig': client.host_configs.get(
+            container_id, {'CpuPeriod': 100000, 'CpuQuota': 150000, 'Memory': 512 * 1024 * 1024}
+        )}
+
+    def update(self, **kwargs):
+        with self.client.lock:
+            self.client.active += 1
+            self.client.max_active = max(self.client.max_active, self.client.active)
+        time.sleep(self.client.latency)
+        with self.client.lock:
+            self.client.active -= 1
+            self.client.updates.append((self.id, kwargs))
+
+class FakeContainers:
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, container_id):
+        if container_id in self.client.missing:
+            raise KeyError(container_id)
+        return FakeContainer(self.client, container_id)
+
+class FakeDockerClient:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.updates = []
+        self.missing = set()
+        self.host_configs = {}  # 容器ID -> HostConfig
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.containers = FakeContainers(self)
+
+class TestResourceLimiter(unittest.TestCase):
+    def test_skip_unchanged_limits(self):
+        """测试相同限制不重复下发"""
+        client = FakeDockerClient()
+        limiter = ResourceLimiter(docker_client=client)
+        self.assertTrue(limiter.apply_limits('c1', {'cpu': 1, 'memory': 256}))
+        self.assertTrue(limiter.apply_limits('c1', {'cpu': 1.0, 'memory': 256}))
+        self.assertEqual(len(client.updates), 1)
+        self.assertEqual(client.updates[0][1]['cpu_quota'], 100000)
+        self.assertEqual(client.updates[0][1]['memory'], 256 * 1024 * 1024)
+
+        limiter.apply_limits('c1', {'cpu': 2, 'memory': 256})
+        self.assertEqual(len(client.updates), 2)
+
+    def test_memory_only_limits(self):
+        """测试 cpu 缺失或为 None 时只限制内存"""
+        client = FakeDockerClient()
+        limiter = ResourceLimiter(docker_client=client)
+        self.assertTrue(limiter.apply_limits('c1', {'cpu': None, 'memory': 256}))
+        self.assertTrue(limiter.apply_limits('c1', {'memory': 256}))
+        self.assertEqual(len(client.updates), 1)
+        self.assertEqual(client.updates[0][1]['cpu_quota'], -1)
+        self.assertEqual(client.updates[0][1]['memory'], 256 * 1024 * 1024)
+        self.assertEqual(limiter.get_resource_limits('c1'), {'cpu': None, 'memory': 256})
+
+        results = limiter.apply_limits_many({'c2': {'memory': 128}})
+        self.assertTrue(results['c2']['success'])
+
+    def test_get_resource_limits(self):
+        """测试读取缓存或容器配置中的限制"""
+        client = FakeDockerClient()
+        limiter = ResourceLimiter(docker_client=client)
+        self.assertEqual(limiter.get_resource_limits('c1'), {'cpu': 1.5, 'memory': 512})
+
+        limiter.apply_limits('c2', {'cpu': 0.5, 'memory': 128})
+        self.assertEqual(limiter.get_resource_limits('c2'), {'cpu': 0.5, 'memory': 128})
+
+        client.missing.add('c3')
+        self.assertIsNone(limiter.get_resource_limits('c3'))
+
+    def test_unlimited_container(self):
+        """测试未设置上限的容器读取为 None，且读取结果不进入缓存"""
+        client = FakeDockerClient()
+        client.host_configs['c1'] = {'CpuPeriod': 0, 'CpuQuota': 0, 'NanoCpus': 0, 'Memory': 0}
+        limiter = ResourceLimiter(docker_client=client)
+        self.assertEqual(limiter.get_resource_limits('c1'), {'cpu': None, 'memory': None})
+        self.assertNotIn('c1', limiter.applied_limits)
+
+        scaler = AutoScaler(limiter)
+        self.assertFalse(scaler.check_and_scale('c1', {'cpu_usage': 95, 'memory_usage': 95}))
+        self.assertEqual(scaler.get_scale_history('c1'), [])
+        self.assertEqual(client.updates, [])
+
+    def test_lifecycle_shares_limiter(self):
+        """测试生命周期管理与自动扩缩容共用限制缓存，释放后不再使用旧限制"""
+        from src.workload.workload_manager import WorkloadManager
+        from src.workload.lifecycle_manager import WorkloadLifecycleManager
+        client = FakeDockerClient()
+        limiter = ResourceLimiter(docker_client=client)
+        lifecycle = WorkloadLifecycleManager(WorkloadManager(), resource_limiter=limiter)
+        self.assertIs(lifecycle.monitor.autoscaler.resource_limiter, limiter)
+
+        lifecycle.submit_workload('c1', {'cpu': 4, 'memory': 2048})
+        lifecycle.start_workload('c1')
+        self.assertEqual(lifecycle.monitor.autoscaler.resource_limiter.get_resource_limits('c1'),
+                         {'cpu': 4.0, 'memory': 2048})
+        lifecycle.stop_workload('c1')
+        lifecycle.monitor.stop()
+        # 重新使用同一ID时读取容器的实际配置
+        self.assertEqual(limiter.get_resource_limits('c1'), {'cpu': 1.5, 'memory': 512})
+
+    def test_release_resources(self):
+        """测试释放后重新下发"""
+        client = FakeDockerClient()
+        limiter = ResourceLimiter(docker_client=client)
+        limiter.apply_limits('c1', {'cpu': 1, 'memory': 256})
+        self.assertTrue(limiter.release_resources('c1'))
+        limiter.apply_limits('c1', {'cpu': 1, 'memory': 256})
+        self.assertEqual(len(client.updates), 2)
+
+    def test_apply_limits_many(self):
+        """测试批量并发下发并报告每个容器的耗时"""
+        client = FakeDockerClient(latency=0.02)
+        limiter = ResourceLimiter(docker_client=client, max_workers=8)
+        limiter.apply_limits('c0', {'cpu': 1, 'memory': 256})
+        client.missing.add('c9')
+
+        limits = {f'c{i}': {'cpu': 1, 'memory': 256} for i in range(40)}
+        start = time.perf_counter()
+        results = limiter.apply_limits_many(limits)
+        elapsed = time.perf_counter() - start
+        limiter.shutdown()
+
+        self.assertTrue(results['c0']['skipped'])
+        self.assertFalse(results['c9']['success'])
+        self.assertTrue(all(results[f'c{i}']['success'] for i in range(1, 40) if i != 9))
+        self.assertGreaterEqual(results['c1']['latency'], 0.02)
+        self.assertLessEqual(client.max_active, 8)
+        # 38 次下发串行约需 0.76 秒
+        self.assertLess(elapsed, 0.5)
+
+
+class TestCgroupLimitBackend(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for workload_id in ('w1', 'w2'):
+            path = os.path.join(self.root, workload_id)
+            os.makedirs(path)
+            for name, content in (('cpu.max', 'max 100000'), ('memory.max', 'max'),
+                                  ('memory.swap.max', 'max')):
+                with open(os.path.join(path, name), 'w') as f:
+                    f.write(content + '\n')
+        self.config = {'resources': {
+            'limit_backend': 'cgroup',
+            'cgroup_root': self.root,
+            'cgroup_path_template': '{workload_id}'
+        }}
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _read(self, workload_id, name):
+        with open(os.path.join(self.root, workload_id, name)) as f:
+            return f.read().strip()
+
+    def test_select_backend_from_config(self):
+        """测试按配置选择后端"""
+        limiter = ResourceLimiter.from_config(self.config)
+        self.assertIsInstance(limiter.backend, CgroupLimitBackend)
+        self.assertIsNone(limiter.docker_client)
+        with self.assertRaises(ValueError):
+            ResourceLimiter.from_config({'resources': {'limit_backend': 'unknown'}})
+
+    def test_write_and_read_limits(self):
+        """测试写入 cpu.max、memory.max、memory.swap.max 并读回"""
+        limiter = ResourceLimiter.from_config(self.config)
+        self.assertTrue(limiter.apply_limits('w1', {'cpu': 1.5, 'memory': 256}))
+        self.assertEqual(self._read('w1', 'cpu.max'), '150000 100000')
+        self.assertEqual(self._read('w1', 'memory.max'), str(256 * 1024 * 1024))
+        self.assertEqual(self._read('w1', 'memory.swap.max'), '0')
+
+        limiter.release_resources('w1')
+        self.assertEqual(limiter.get_resource_limits('w1'), {'cpu': 1.5, 'memory': 256})
+
+    def test_missing_cgroup_fails(self):
+        """测试 cgroup 不存在时返回失败且不缓存"""
+        limiter = ResourceLimiter.from_config(self.config)
+        self.assertFalse(limiter.apply_limits('gone', {'cpu': 1, 'memory': 128}))
+        self.assertNotIn('gone', limiter.applied_limits)
+
+    def test_invalid_and_tiny_cpu(self):
+        """测试拒绝非正数限制，极小的 CPU 限制取内核最小配额"""
+        backend = CgroupLimitBackend(root=self.root, path_template='{workload_id}')
+        for limits in ({'cpu': 0, 'memory': 128}, {'cpu': -1, 'memory': 128}, {'cpu': 1, 'memory': 0}):
+            with self.assertRaises(ValueError):
+                backend.write_limits('w1', limits)
+        self.assertEqual(self._read('w1', 'cpu.max'), 'max 100000')
+
+        backend.write_limits('w1', {'cpu': 0.001, 'memory': 128})
+        self.assertEqual(self._read('w1', 'cpu.max'), '1000 100000')
+
+    def test_verification_detects_mismatch(self):
+        """测试回读校验发现内核未接受的写入"""
+        backend = CgroupLimitBackend(root=self.root, path_template='{workload_id}')
+        backend._write = lambda file_path, value: None
+        with self.assertRaises(ValueError):
+            backend.write_limits('w1', {'cpu': 1, 'memory': 128})
+
+    def test_lifecycle_uses_configured_backend(self):
+        """测试生命周期管理按配置使用 cgroup 后端，监控器共用同一限制器"""
+        from src.workload.workload_manager import WorkloadManager
+        from src.workload.lifecycle_manager import WorkloadLifecycleManager
+        lifecycle = WorkloadLifecycleManager(WorkloadManager(), config=self.config)
+        self.assertIsInstance(lifecycle.resource_limiter.backend, CgroupLimitBackend)
+        self.assertIs(lifecycle.monitor.autoscaler.resource_limiter, lifecycle.resource_limiter)
+
+        lifecycle.workload_manager.create_workload('w1', {'cpu': 1, 'memory': 128})
+        self.assertTrue(lifecycle.start_workload('w1'))
+        self.assertEqual(self._read('w1', 'cpu.max'), '100000 100000')
+
+    def test_apply_limits_many(self):
+        """测试批量写入并报告每个工作负载的结果"""
+        limiter = ResourceLimiter.from_config(self.config)
+        limiter.apply_limits('w1', {'cpu': 1, 'memory': 128})
+        results = limiter.apply_limits_many({
+            'w1': {'cpu': 1, 'memory': 128},
+            'w2': {'cpu': 2, 'memory': 512},
+            'gone': {'cpu': 1, 'memory': 128}
+        })
+        self.assertTrue(results['w1']['skipped'])
+        self.assertTrue(results['w2']['success'])
+        self.assertFalse(results['gone']['success'])
+        self.assertEqual(self._read('w2', 'cpu.max'), '200000 100000')
+        self.assertEqual(limiter.get_resource_limits('w2'), {'cpu': 2.0, 'memory': 512})
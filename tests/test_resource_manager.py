@@ -0,0 +1,184 @@
+import unittest
+from unittest import mock
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.resource_manager.resource_manager import ResourceManager
+
+class FakeHostSampler:
+    """返回固定快照的主机采样器，advance 模拟一次后台采样"""
+    def __init__(self):
+        self.started = False
+        self.snapshot = {'sampled_at': 0.0, 'cpu_usage': 10.0, 'memory_usage': 20.0, 'disk_usage': 30.0}
+
+    def get_snapshot(self):
+        return self.snapshot
+
+    def advance(self, **values):
+        self.snapshot = dict(self.snapshot, sampled_at=self.snapshot['sampled_at'] + 1, **values)
+
+    def start(self):
+        self.started = True
+        return True
+
+class TestResourceManagerHealth(unittest.TestCase):
+    def setUp(self):
+        self.host_sampler = FakeHostSampler()
+        self.manager = ResourceManager(health_staleness=60, host_sampler=self.host_sampler)
+        for i in range(1000):
+            self.manager.register_resource(f'node-{i}', {'cpu': 8, 'memory': 16384})
+        self.host = mock.patch.object(
+            self.manager.health_sampler, '_check_host_health', return_value=True
+        )
+        self.check_host = self.host.start()
+
+    def tearDown(self):
+        self.host.stop()
+
+    def test_single_sample_per_scan(self):
+        """测试一次扫描只采样一次主机指标"""
+        available = self.manager.get_available_resources()
+        self.assertEqual(len(available), 1000)
+        self.assertEqual(self.check_host.call_count, 1)
+
+        self.manager.get_available_resources()
+        self.assertEqual(self.check_host.call_count, 1)
+
+    def test_reads_do_not_probe(self):
+        """测试主机快照更新或结果过期后查询仍只读取缓存，不执行检查"""
+        probe = mock.Mock(return_value=True)
+        self.manager.health_sampler.register_probe('node-3', probe)
+        self.manager.health_sampler.max_staleness = 0
+        self.manager.get_available_resources()
+        self.host_sampler.advance()
+        time.sleep(0.01)
+        self.manager.get_available_resources()
+        self.assertEqual(self.check_host.call_count, 1)
+        self.assertEqual(probe.call_count, 1)
+        self.assertTrue(self.manager.health_sampler.is_stale())
+
+    def test_resource_probe(self):
+        """测试自定义资源健康检查"""
+        self.manager.health_sampler.register_probe('node-3', lambda: False)
+        self.manager.health_sampler.sample()
+        available = self.manager.get_available_resources()
+        self.assertNotIn('node-3', available)
+        self.assertEqual(len(available), 999)
+
+    def test_background_sampling(self):
+        """测试健康表由后台线程按周期刷新"""
+        self.manager.health_sampler.interval = 0.01
+        probe = mock.Mock(return_value=True)
+        self.manager.health_sampler.register_probe('node-3', probe)
+        try:
+            self.assertTrue(self.manager.start_health_sampling())
+            self.assertTrue(self.host_sampler.started)
+            self.assertFalse(self.manager.start_health_sampling())
+            deadline = time.perf_counter() + 2
+            while probe.call_count < 3 and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            self.assertGreaterEqual(probe.call_count, 3)
+
+            probe.return_value = False
+            deadline = time.perf_counter() + 2
+            while 'node-3' in self.manager.get_available_resources() and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            self.assertNotIn('node-3', self.manager.get_available_resources())
+        finally:
+            self.manager.stop_health_sampling()
+        calls = probe.call_count
+        time.sleep(0.05)
+        self.assertEqual(probe.call_count, calls)
+
+    def test_host_thresholds(self):
+        """测试主机快照超过容量阈值时资源不健康"""
+        self.host.stop()
+        try:
+            self.assertEqual(len(self.manager.get_available_resources()), 1000)
+            self.host_sampler.advance(cpu_usage=95.0)
+            self.manager.health_sampler.sample()
+            self.assertEqual(self.manager.get_available_resources(), [])
+        finally:
+            self.host.start()
+
+
+class TestResourceManagerCapacity(unittest.TestCase):
+    def setUp(self):
+        self.manager = ResourceManager(host_sampler=FakeHostSampler())
+        self.host = mock.patch.object(
+            self.manager.health_sampler, '_check_host_health', return_value=True
+        )
+        self.host.start()
+        self.manager.register_resource('small', {'cpu': 2, 'memory': 4096})
+        self.manager.register_resource('large', {'cpu': 8, 'memory': 16384})
+
+    def tearDown(self):
+        self.host.stop()
+
+    def test_headroom_tracking(self):
+        """测试分配与释放更新剩余容量"""
+        workload = {'requirements': {'cpu': 2, 'memory': 2048}}
+        self.assertTrue(self.manager.allocate_resource('small', workload))
+        self.assertEqual(self.manager.get_remaining_capacity('small'), {'cpu': 0, 'memory': 2048})
+
+        # 已放置的负载占用容量，不能重复分配
+        self.assertFalse(self.manager.allocate_resource('small', workload))
+        self.assertEqual(self.manager.find_fitting_resources({'cpu': 1}), ['large'])
+
+        self.assertTrue(self.manager.release_resource('small', workload))
+        self.assertEqual(sorted(self.manager.find_fitting_resources({'cpu': 1})), ['large', 'small'])
+
+    def test_reregister_keeps_allocations(self):
+        """测试重复注册资源时保留已放置工作负载的占用"""
+        workload = {'requirements': {'cpu': 2, 'memory': 2048}}
+        self.assertTrue(self.manager.allocate_resource('small', workload))
+        self.manager.register_resource('small', {'cpu': 4, 'memory': 4096})
+        self.assertEqual(self.manager.get_remaining_capacity('small'), {'cpu': 2, 'memory': 2048})
+        self.assertEqual(self.manager.resource_states['small']['workloads'], [workload])
+        self.assertEqual(sorted(self.manager.find_fitting_resources({'cpu': 2})), ['large', 'small'])
+        self.assertEqual(self.manager.find_fitting_resources({'cpu': 3}), ['large'])
+
+        self.assertTrue(self.manager.release_resource('small', workload))
+        self.assertEqual(self.manager.get_remaining_capacity('small'), {'cpu': 4, 'memory': 4096})
+
+    def test_place_workload(self):
+        """测试按优先级选择资源并同步剩余容量"""
+        workload = {'priority': 'normal', 'requirements': {'cpu': 1, 'memory': 1024}}
+        self.assertTrue(self.manager.allocate_resource('small', workload))
+        # 普通优先级选择负载较低的资源
+        self.assertEqual(self.manager.place_workload(workload), 'large')
+        self.assertEqual(self.manager.get_remaining_capacity('large'), {'cpu': 7, 'memory': 15360})
+
+        self.manager.set_resource_status('large', 'maintenance')
+        self.assertEqual(self.manager.place_workload(workload), 'small')
+        self.assertEqual(self.manager.get_remaining_capacity('small'), {'cpu': 0, 'memory': 2048})
+        self.assertIsNone(self.manager.place_workload(workload))
+
+    def test_available_index(self):
+        """测试资源状态变化同步可用索引"""
+        self.manager.set_resource_status('large', 'maintenance')
+        self.assertEqual(self.manager.get_available_resources(), ['small'])
+        self.assertEqual(self.manager.find_fitting_resources({'cpu': 1}), ['small'])
+
+        self.manager.set_resource_status('large', 'available')
+        self.assertEqual(sorted(self.manager.get_available_resources()), ['large', 'small'])
+
+    def test_unknown_dimension(self):
+        """测试未知资源维度不匹配任何资源"""
+        self.assertEqual(self.manager.find_fitting_resources({'gpu': 1}), [])
+
+    def test_many_resources(self):
+        """测试大量资源时的向量化过滤"""
+        for i in range(5000):
+            self.manager.register_resource(f'node-{i}', {'cpu': i % 16, 'memory': 1024})
+        fitting = self.manager.find_fitting_resources({'cpu': 15, 'memory': 512})
+        self.assertEqual(len(fitting), 312)
+        self.assertEqual(fitting, [f'node-{i}' for i in range(5000) if i % 16 == 15])
+
+        # 有序索引与剩余容量同步
+        workload = {'requirements': {'cpu': 15, 'memory': 512}}
+        self.assertTrue(self.manager.allocate_resource('node-15', workload))
+        self.assertNotIn('node-15', self.manager.find_fitting_resources({'cpu': 15}))
+        self.assertIn('node-15', self.manager.find_fitting_resources({'memory': 512}))
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.resource_manager.resource_optimizer import ResourceOptimizer
+
+class TestResourceOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = ResourceOptimizer(hysteresis=0.05, cooldown=60)
+
+    def test_sparse_diff(self):
+        """测试只返回发生变化的资源"""
+        allocation = {'a': 10.0, 'b': 10.0, 'c': 10.0}
+        usage = {'a': 0.9, 'b': 0.7, 'c': 0.3}
+        diff = self.optimizer.optimize_allocation(allocation, usage, now=0)
+        self.assertEqual(set(diff), {'a', 'c'})
+        self.assertAlmostEqual(diff['a'], 12.0)
+        self.assertAlmostEqual(diff['c'], 8.0)
+
+    def test_cooldown(self):
+        """测试冷却期内不重复调整"""
+        allocation = {'a': 10.0}
+        self.assertTrue(self.optimizer.optimize_allocation(allocation, {'a': 0.9}, now=0))
+        self.assertEqual(self.optimizer.optimize_allocation(allocation, {'a': 0.9}, now=30), {})
+        self.assertTrue(self.optimizer.optimize_allocation(allocation, {'a': 0.9}, now=61))
+
+    def test_hysteresis(self):
+        """测试扩容后需越过滞回带才会缩容"""
+        self.optimizer.optimize_allocation({'a': 10.0}, {'a': 0.9}, now=0)
+        self.assertEqual(self.optimizer.optimize_allocation({'a': 12.0}, {'a': 0.58}, now=100), {})
+        self.assertIn('a', self.optimizer.optimize_allocation({'a': 12.0}, {'a': 0.5}, now=200))
+
+    def test_min_delta(self):
+        """测试变化过小的调整被过滤"""
+        optimizer = ResourceOptimizer(min_delta=0.5)
+        self.assertEqual(optimizer.optimize_allocation({'a': 10.0}, {'a': 0.9}, now=0), {})
+
+    def test_no_op_and_small_changes_suppressed(self):
+        """测试分配为 0 的空调整和低于绝对阈值的调整被过滤"""
+        diff = self.optimizer.optimize_allocation({'zero': 0.0, 'a': 10.0}, {'zero': 0.9, 'a': 0.9}, now=0)
+        self.assertEqual(set(diff), {'a'})
+
+        optimizer = ResourceOptimizer(min_abs_delta=1.0)
+        diff = optimizer.optimize_allocation({'small': 2.0, 'large': 10.0}, {'small': 0.9, 'large': 0.9}, now=0)
+        self.assertEqual(set(diff), {'large'})
+        # 被过滤的资源不进入冷却期
+        self.assertIn('small', optimizer.optimize_allocation({'small': 6.0}, {'small': 0.9}, now=1))
+
+    def _count_updates(self, optimizer):
+        rng = np.random.default_rng(0)
+        ids = [f'r{i}' for i in range(1000)]
+        demand = rng.uniform(4, 9, 1000)
+        allocation = np.full(1000, 10.0)
+        updates = 0
+        for tick in range(50):
+            usage = demand * rng.uniform(0.85, 1.15, 1000) / allocation
+            changed, values = optimizer.optimize_arrays(ids, allocation, usage, now=tick * 30)
+            allocation[changed] = values
+            updates += len(changed)
+        return updates
+
+    def test_noisy_usage_damped(self):
+        """测试利用率抖动时调整次数明显少于固定阈值"""
+        fixed = ResourceOptimizer(hysteresis=0, cooldown=0, min_delta=0)
+        self.assertLess(self._count_updates(self.optimizer), self._count_updates(fixed) / 2)
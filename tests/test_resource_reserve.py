@@ -0,0 +1,159 @@
+import unittest
+from unittest import mock
+import sys
+import os
+import tempfile
+from datetime import datetime
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.resource_manager.rolling_window import RollingWindow
+from src.resource_manager.resource_reserve import ResourceReserve
+from src.resource_manager.seasonal_profile import SeasonalProfile
+from src.analysis.quantile_sketch import P2Quantile
+
+class TestRollingWindow(unittest.TestCase):
+    def test_matches_numpy(self):
+        """测试滑动统计与 numpy 全量计算一致"""
+        rng = np.random.default_rng(0)
+        values = rng.uniform(0, 100, 5000)
+        window = RollingWindow(24)
+        for i, value in enumerate(values):
+            window.append(value)
+            recent = values[max(0, i - 23):i + 1]
+            self.assertAlmostEqual(window.mean(), np.mean(recent), places=6)
+            self.assertAlmostEqual(window.std(), np.std(recent), places=6)
+            self.assertEqual(window.max(), recent.max())
+            if len(recent) >= 6:
+                self.assertAlmostEqual(window.trend(6), np.mean(np.diff(recent[-6:])), places=6)
+
+    def test_bounded_buffer(self):
+        """测试缓冲区有界"""
+        window = RollingWindow(10)
+        for i in range(1000):
+            window.append(i)
+        self.assertEqual(len(window), 10)
+        self.assertEqual(window.values(), list(range(990, 1000)))
+
+
+class TestResourceReserve(unittest.TestCase):
+    def setUp(self):
+        self.reserve = ResourceReserve()
+        self.resource = mock.Mock()
+        self.resource.get_capacity.return_value = 10
+
+    def test_per_resource_history(self):
+        """测试按资源独立维护历史"""
+        for i in range(30):
+            self.reserve.record_usage(i, resource_id='node-1')
+        self.assertEqual(len(self.reserve.usage_windows['node-1']), 24)
+        self.assertEqual(len(self.reserve.usage_history), 0)
+
+        reserve = self.reserve.calculate_reserve(self.resource, 100, resource_id='node-1')
+        self.assertGreater(reserve, 2)
+
+    def test_peak_reserve(self):
+        """测试高峰期预留使用窗口最大值"""
+        for value in [1, 9, 3]:
+            self.reserve.record_usage(value)
+        self.reserve.peak_hours = [(0, 24)]
+        self.assertAlmostEqual(self.reserve._calculate_peak_reserve(), 2.7)
+
+
+class TestSeasonalProfile(unittest.TestCase):
+    def test_p2_quantile_accuracy(self):
+        """测试 P² 估计与精确分位数接近"""
+        rng = np.random.default_rng(1)
+        values = rng.normal(50, 10, 20000)
+        sketch = P2Quantile(0.95)
+        for value in values:
+            sketch.add(value)
+        self.assertAlmostEqual(sketch.value(), np.percentile(values, 95), delta=0.5)
+
+    def test_hour_of_week_tables(self):
+        """测试按星期与小时区分需求"""
+        profile = SeasonalProfile(min_samples=5)
+        busy = datetime(2025, 1, 6, 10)   # 周一 10 点
+        quiet = datetime(2025, 1, 6, 3)   # 周一 3 点
+        for i in range(50):
+            profile.update('node-1', 80 + i % 10, busy)
+            profile.update('node-1', 10 + i % 3, quiet)
+
+        self.assertGreater(profile.lookup('node-1', busy), 85)
+        self.assertLess(profile.lookup('node-1', quiet), 13)
+        self.assertIsNone(profile.lookup('node-1', datetime(2025, 1, 7, 10)))
+        self.assertIsNone(profile.lookup('node-2', busy))
+
+    def test_persistence(self):
+        """测试画像持久化后重启可恢复"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'profile.json')
+            reserve = ResourceReserve(profile_path=path)
+            now = datetime(2024, 3, 4, 10, 30)
+            for i in range(20):
+                reserve.record_usage(50 + i, resource_id='node-1', timestamp=now)
+            self.assertTrue(reserve.save_profile())
+
+            restored = ResourceReserve(profile_path=path)
+            self.assertAlmostEqual(
+                restored.seasonal_profile.lookup('node-1', now),
+                reserve.seasonal_profile.lookup('node-1', now)
+            )
+            self.assertAlmostEqual(
+                restored._calculate_peak_reserve(resource_id='node-1', now=now),
+                reserve.seasonal_profile.lookup('node-1', now) * 0.3
+            )
+
+            # 恢复后继续增量学习
+            restored.record_usage(100, resource_id='node-1', timestamp=now)
+            self.assertEqual(restored.seasonal_profile.counts['node-1'][now.weekday(), now.hour], 21)
+
+    def test_autosave_and_stop(self):
+        """测试每 N 次更新自动保存，停止时保存剩余样本"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'profile.json')
+            reserve = ResourceReserve(profile_path=path, profile_save_every=10)
+            now = datetime(2024, 3, 4, 10, 30)
+            for i in range(9):
+                reserve.record_usage(50 + i, resource_id='node-1', timestamp=now)
+            self.assertFalse(os.path.exists(path))
+            reserve.record_usage(59, resource_id='node-1', timestamp=now)
+            self.assertTrue(os.path.exists(path))
+
+            reserve.record_usage(60, resource_id='node-1', timestamp=now)
+            self.assertTrue(reserve.stop())
+            restored = ResourceReserve(profile_path=path)
+            self.assertEqual(restored.seasonal_profile.counts['node-1'][now.weekday(), now.hour], 11)
+
+    def test_save_without_path(self):
+        """测试未配置存储路径时保存失败，不在当前目录写文件"""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                reserve = ResourceReserve()
+                reserve.record_usage(50, resource_id='node-1')
+                self.assertFalse(reserve.save_profile())
+                self.assertFalse(reserve.stop())
+                self.assertEqual(os.listdir(tmp), [])
+            finally:
+                os.chdir(cwd)
+
+    def test_load_with_different_quantiles(self):
+        """测试加载的分位数与配置不同时仍可按配置的分位数查询"""
+        now = datetime(2024, 3, 4, 10, 30)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'profile.json')
+            saved = SeasonalProfile(quantiles=(0.5,), storage_path=path)
+            for i in range(20):
+                saved.update('node-1', 50 + i, now)
+            self.assertTrue(saved.save())
+
+            profile = SeasonalProfile(quantiles=(0.5, 0.95), storage_path=path)
+            self.assertAlmostEqual(profile.lookup('node-1', now, quantile=0.5), saved.lookup('node-1', now, quantile=0.5))
+            # 新增的分位数样本不足前不返回结果
+            self.assertIsNone(profile.lookup('node-1', now, quantile=0.95))
+            self.assertIsNone(profile.lookup('node-1', now, quantile=0.99))
+            for i in range(5):
+                profile.update('node-1', 60, now)
+            self.assertIsNotNone(profile.lookup('node-1', now, quantile=0.95))
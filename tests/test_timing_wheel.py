@@ -0,0 +1,260 @@
+import unittest
+import random
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.timing_wheel import TimingWheel
+from src.workload.workload_manager import WorkloadManager
+from src.workload.workload_scheduler import WorkloadScheduler
+from src.recovery.failure_handler import FailureHandler, FailureType
+from src.fault_tolerance.recovery_manager import RecoveryManager
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class TestTimingWheel(unittest.TestCase):
+    def test_fires_after_deadline_across_levels(self):
+        """测试跨层级和溢出区的条目都不早于到期时间触发"""
+        wheel = TimingWheel(tick=1, slots=8, levels=2)
+        rng = random.Random(1)
+        deadlines = {i: rng.uniform(0, 500) for i in range(2000)}
+        for item_id, when in deadlines.items():
+            wheel.schedule(item_id, when)
+
+        fired = {}
+        now = 0
+        while now < 600:
+            now += rng.uniform(0, 3)
+            for item_id, _ in wheel.advance(now):
+                fired[item_id] = now
+
+        self.assertEqual(len(fired), len(deadlines))
+        self.assertEqual(len(wheel), 0)
+        for item_id, when in deadlines.items():
+            self.assertGreaterEqual(fired[item_id], when)
+            self.assertLess(fired[item_id] - when, 4)
+
+    def test_cancel_and_reschedule(self):
+        """测试取消和重新设定到期时间"""
+        wheel = TimingWheel(tick=1)
+        wheel.schedule('a', 10, payload='x')
+        wheel.schedule('b', 10)
+        self.assertTrue(wheel.cancel('b'))
+        self.assertFalse(wheel.cancel('b'))
+        wheel.schedule('a', 20, payload='y')
+        self.assertEqual(wheel.get_deadline('a'), 20)
+
+        self.assertEqual(wheel.advance(15), [])
+        self.assertEqual(wheel.advance(20), [('a', 'y')])
+
+    def test_past_deadline_fires_on_next_advance(self):
+        """测试已过期的到期时间在下一次推进时触发"""
+        wheel = TimingWheel(tick=1, start=100)
+        wheel.advance(100)
+        wheel.schedule('late', 50)
+        self.assertEqual(wheel.advance(101), [('late', None)])
+
+
+class TestDeferredScheduling(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.manager = WorkloadManager()
+        self.scheduler = WorkloadScheduler(
+            self.manager, aging_rate=0.1, clock=self.clock, retry_base_delay=2.0
+        )
+        self.manager.create_workload('w1', {'cpu': 1}, 'high')
+        self.manager.create_workload('w2', {'cpu': 1}, 'low')
+
+    def test_not_before(self):
+        """测试 not_before 之前不会被调度"""
+        self.scheduler.schedule_workload('w1', not_before=self.clock.now + 30)
+        self.scheduler.schedule_workload('w2')
+
+        self.assertEqual(self.scheduler.get_next_workload(), 'w2')
+        self.assertIsNone(self.scheduler.get_next_workload())
+        self.clock.now += 30
+        self.assertEqual(self.scheduler.get_next_workload(), 'w1')
+
+    def test_retry_backoff(self):
+        """测试重试按指数退避延迟"""
+        first = self.scheduler.retry_workload('w1')
+        self.assertEqual(first, self.clock.now + 2.0)
+        self.assertEqual(self.manager.workloads['w1']['retries'], 1)
+
+        self.clock.now += 1
+        self.assertIsNone(self.scheduler.get_next_workload())
+        self.clock.now += 1
+        self.assertEqual(self.scheduler.get_next_workload(), 'w1')
+
+        second = self.scheduler.retry_workload('w1')
+        self.assertEqual(second, self.clock.now + 4.0)
+
+    def test_cancel_deferred(self):
+        """测试取消延迟调度"""
+        self.scheduler.schedule_workload('w1', not_before=self.clock.now + 5)
+        self.assertTrue(self.scheduler.cancel_deferred('w1'))
+        self.clock.now += 10
+        self.assertIsNone(self.scheduler.get_next_workload())
+
+
+class FlakyFailureHandler(FailureHandler):
+    """前 fail_times 次恢复失败的故障处理器"""
+    def __init__(self, config, clock, fail_times):
+        super().__init__(config, clock=clock)
+        self.fail_times = fail_times
+        self.calls = 0
+
+    def _handle_general_failure(self, workload_id, context):
+        self.calls += 1
+        return self.calls > self.fail_times
+
+    def _check_failover_resources(self):
+        return []
+
+
+class TestNonBlockingRecovery(unittest.TestCase):
+    def test_failure_handler_defers_retry(self):
+        """测试恢复失败后安排重试而不是阻塞等待"""
+        clock = FakeClock()
+        handler = FlakyFailureHandler({'max_retries': 3, 'retry_interval': 5}, clock, fail_times=1)
+
+        result = handler.handle_failure('w1', FailureType.NETWORK_ERROR, {})
+        self.assertTrue(result['pending'])
+        self.assertEqual(result['retry_at'], clock.now + 5)
+
+        self.assertEqual(handler.process_due_retries(clock.now + 4), {})
+        results = handler.process_due_retries(clock.now + 5)
+        self.assertTrue(results['w1']['success'])
+        self.assertNotIn('w1', handler.pending_recoveries)
+
+    def test_failure_handler_gives_up(self):
+        """测试重试用尽后尝试故障转移并结束"""
+        clock = FakeClock()
+        handler = FlakyFailureHandler({'max_retries': 2, 'retry_interval': 1}, clock, fail_times=10)
+
+        handler.handle_failure('w1', FailureType.NETWORK_ERROR, {})
+        results = handler.process_due_retries(clock.now + 1)
+        self.assertFalse(results['w1']['success'])
+        self.assertNotIn('pending', results['w1'])
+        self.assertEqual(handler.calls, 2)
+
+    def test_recovery_manager_backoff(self):
+        """测试资源恢复失败后按指数退避重试"""
+        clock = FakeClock()
+        manager = RecoveryManager(clock=clock)
+        outcomes = iter([False, False, True])
+        manager._recover_resource = lambda resource_id, workload: next(outcomes)
+
+        self.assertFalse(manager.handle_failure('r1', {}))
+        self.assertTrue(manager.is_recovering('r1'))
+        clock.now += 1
+        self.assertEqual(manager.process_due_retries(), {'r1': False})
+        clock.now += 1
+        self.assertEqual(manager.process_due_retries(), {})
+        clock.now += 1
+        self.assertEqual(manager.process_due_retries(), {'r1': True})
+        self.assertFalse(manager.is_recovering('r1'))
+        manager.recovery_pool.shutdown()
+
+    def test_completion_callback(self):
+        """测试重试最终结束时通知调用方，中间结果与最终结果字段一致"""
+        clock = FakeClock()
+        completed = []
+        handler = FlakyFailureHandler({'max_retries': 3, 'retry_interval': 1}, clock, fail_times=1)
+        handler.on_complete = lambda workload_id, result: completed.append((workload_id, result['success']))
+
+        pending = handler.handle_failure('w1', FailureType.NETWORK_ERROR, {})
+        self.assertIn('recovery_time', pending)
+        self.assertEqual(completed, [])
+        handler.process_due_retries(clock.now + 1)
+        self.assertEqual(completed, [('w1', True)])
+
+    def test_recovery_runs_outside_lock(self):
+        """测试慢恢复不阻塞其他工作负载，回调可以重新进入处理器"""
+        clock = FakeClock()
+        release = threading.Event()
+        started = threading.Event()
+
+        class SlowHandler(FailureHandler):
+            def _handle_general_failure(self, workload_id, context):
+                if workload_id == 'slow':
+                    started.set()
+                    release.wait(5)
+                return True
+
+        handler = SlowHandler({'max_retries': 1}, clock=clock)
+        completed = []
+
+        def on_complete(workload_id, result):
+            completed.append(workload_id)
+            if workload_id == 'fast':
+                # 回调中再次进入处理器不会死锁
+                self.assertFalse(handler.cancel_recovery('other'))
+
+        handler.on_complete = on_complete
+        slow = threading.Thread(
+            target=handler.handle_failure, args=('slow', FailureType.NETWORK_ERROR, {})
+        )
+        slow.start()
+        self.assertTrue(started.wait(5))
+        self.assertTrue(handler.handle_failure('fast', FailureType.NETWORK_ERROR, {})['success'])
+        self.assertEqual(completed, ['fast'])
+        release.set()
+        slow.join(5)
+        self.assertEqual(completed, ['fast', 'slow'])
+
+    def test_cancelled_during_attempt(self):
+        """测试恢复过程中被取消时不再安排重试也不通知"""
+        clock = FakeClock()
+        completed = []
+
+        class CancellingHandler(FailureHandler):
+            def _handle_general_failure(self, workload_id, context):
+                self.cancel_recovery(workload_id)
+                return False
+
+        handler = CancellingHandler({'max_retries': 3}, clock=clock,
+                                    on_complete=lambda workload_id, result: completed.append(workload_id))
+        result = handler.handle_failure('w1', FailureType.NETWORK_ERROR, {})
+        self.assertTrue(result['superseded'])
+        self.assertEqual(handler.process_due_retries(clock.now + 100), {})
+        self.assertEqual(completed, [])
+
+    def test_monitor_drives_retries(self):
+        """测试监控周期推进故障处理器和资源恢复的到期重试"""
+        from src.workload.workload_monitor import WorkloadMonitor
+        handler = FlakyFailureHandler({'max_retries': 3, 'retry_interval': 0.05}, time.monotonic, fail_times=1)
+        completed = []
+        handler.on_complete = lambda workload_id, result: completed.append(result['success'])
+        recovered = []
+        manager = RecoveryManager(on_complete=lambda resource_id, success: recovered.append(success))
+        outcomes = iter([False, True])
+        manager._recover_resource = lambda resource_id, workload: next(outcomes)
+
+        class NoopAutoScaler:
+            def scale_fleet(self, workload_ids, metrics):
+                return {}
+
+        monitor = WorkloadMonitor(WorkloadManager(), collector=lambda workload_id: None,
+                                  alert_manager=object(), autoscaler=NoopAutoScaler(),
+                                  tick_interval=0.02, retry_handlers=[handler])
+        monitor.add_retry_handler(manager)
+        try:
+            monitor.start()
+            handler.handle_failure('w1', FailureType.NETWORK_ERROR, {})
+            self.assertFalse(manager.handle_failure('r1', {}))
+            deadline = time.monotonic() + 5
+            while (not completed or not recovered) and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            monitor.stop()
+            manager.recovery_pool.shutdown()
+        self.assertEqual(completed, [True])
+        self.assertEqual(recovered, [True])
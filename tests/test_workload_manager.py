@@ -1,10 +1,11 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.workload.workload_manager import WorkloadManager
+from src.workload.metric_store import MetricRingStore
 
 class TestWorkloadManager(unittest.TestCase):
     def setUp(self):
@@ -61,4 +62,190 @@ class TestWorkloadManager(unittest.TestCase):
             self.assertEqual(
                 self.workload_manager.workloads['test_state']['status'],
                 state
-            )
\ No newline at end of file
+            )
+            
+    def test_snapshot_restore(self):
+        """测试快照保存与恢复"""
+        requirements = {'cpu': 2, 'memory': 4096}
+        self.workload_manager.create_workload('test_snapshot', requirements, priority='high')
+        self.workload_manager.update_workload_status('test_snapshot', 'running', 'started')
+        snapshot = self.workload_manager.save_workload_snapshot('test_snapshot')
+        
+        restored = WorkloadManager()
+        self.assertTrue(restored.restore_workload(snapshot))
+        workload = restored.workloads['test_snapshot']
+        self.assertEqual(workload['status'], 'running')
+        self.assertEqual(workload['priority'], 'high')
+        self.assertIsInstance(workload['created_at'], datetime)
+        self.assertEqual(restored.get_workload_state('test_snapshot')['message'], 'started')
+        
+    def test_workload_states_view(self):
+        """测试状态视图与记录保持一致"""
+        requirements = {'cpu': 2, 'memory': 4096}
+        self.workload_manager.create_workload('test_view', requirements)
+        self.assertNotIn('test_view', self.workload_manager.workload_states)
+        self.workload_manager.update_workload_state('test_view', 'running')
+        self.assertEqual(self.workload_manager.workload_states['test_view']['state'], 'running')
+        # 状态字段不影响调度使用的 status
+        self.assertEqual(self.workload_manager.workloads['test_view']['status'], 'pending')
+        self.workload_manager.delete_workload('test_view')
+        self.assertNotIn('test_view', self.workload_manager.workload_states)
+        
+    def test_metric_ring_statistics(self):
+        """测试指标环形缓冲区与统计结果"""
+        requirements = {'cpu': 2, 'memory': 4096}
+        self.workload_manager.create_workload('test_ring', requirements)
+        values = [(i * 37) % 101 for i in range(250)]
+        for value in values:
+            self.workload_manager.update_workload_metrics(
+                'test_ring', {'cpu_usage': value, 'memory_usage': value / 2}
+            )
+        
+        recent = values[-100:]
+        workload = self.workload_manager.workloads['test_ring']
+        self.assertEqual(workload['metrics']['cpu_usage'], recent)
+        stats = self.workload_manager.get_workload_statistics('test_ring')
+        self.assertAlmostEqual(stats['cpu_stats']['avg'], sum(recent) / 100)
+        self.assertEqual(stats['cpu_stats']['max'], max(recent))
+        self.assertEqual(stats['cpu_stats']['min'], min(recent))
+        self.assertEqual(stats['memory_stats']['max'], max(recent) / 2)
+        
+    def test_missing_metric_not_recorded_as_zero(self):
+        """测试缺失的指标不按 0 计入统计"""
+        self.workload_manager.create_workload('partial', {'cpu': 1})
+        for sample in [{'cpu_usage': 40, 'memory_usage': 60}, {'cpu_usage': 20},
+                       {'cpu_usage': 30, 'memory_usage': None}, {'memory_usage': 80}]:
+            self.workload_manager.update_workload_metrics('partial', sample)
+        
+        stats = self.workload_manager.get_workload_statistics('partial')
+        self.assertEqual(stats['memory_stats'], {'avg': 70, 'max': 80, 'min': 60})
+        self.assertEqual(stats['cpu_stats'], {'avg': 30, 'max': 40, 'min': 20})
+        self.assertEqual(self.workload_manager.workloads['partial']['metrics']['memory_usage'], [60, 80])
+        
+        # 覆盖最旧样本时同样只扣除有效值
+        store = MetricRingStore(capacity=2)
+        slot = store.allocate()
+        for sample in [{'cpu_usage': 5}, {'cpu_usage': 7, 'memory_usage': 9}, {'cpu_usage': 1}]:
+            store.append(slot, sample, 0)
+        self.assertEqual(store.get_stats(slot, 'memory_usage'), {'avg': 9, 'max': 9, 'min': 9})
+        self.assertEqual(store.get_stats(slot, 'cpu_usage'), {'avg': 4, 'max': 7, 'min': 1})
+        
+    def test_cleanup_old_metrics(self):
+        """测试按时间戳清理旧指标"""
+        requirements = {'cpu': 2, 'memory': 4096}
+        self.workload_manager.create_workload('test_cleanup', requirements)
+        now = datetime.now()
+        for hours, value in [(30, 90), (25, 80), (2, 20), (1, 10)]:
+            self.workload_manager.update_workload_metrics('test_cleanup', {
+                'cpu_usage': value,
+                'memory_usage': value,
+                'timestamp': now - timedelta(hours=hours)
+            })
+        
+        self.assertTrue(self.workload_manager.cleanup_old_metrics('test_cleanup', max_age_hours=24))
+        stats = self.workload_manager.get_workload_statistics('test_cleanup')
+        self.assertEqual(stats['cpu_stats']['max'], 20)
+        self.assertEqual(stats['cpu_stats']['avg'], 15)
+        self.assertEqual(
+            self.workload_manager.workloads['test_cleanup']['metrics']['cpu_usage'],
+            [20, 10]
+        )
+        
+    def test_reads_do_not_allocate_slots(self):
+        """测试只读操作不分配槽位，删除后旧视图不读取被复用的槽位"""
+        store = self.workload_manager.metric_store
+        free_before = len(store._free_slots)
+        self.workload_manager.create_workload('idle', {'cpu': 1})
+        stats = self.workload_manager.get_workload_statistics('idle')
+        self.assertEqual(stats['cpu_stats'], {'avg': 0, 'max': 0, 'min': 0})
+        self.assertTrue(self.workload_manager.cleanup_old_metrics('idle'))
+        self.assertEqual(len(store._free_slots), free_before)
+        
+        self.workload_manager.create_workload('old', {'cpu': 1})
+        self.workload_manager.update_workload_metrics('old', {'cpu_usage': 10, 'memory_usage': 1})
+        view = self.workload_manager.workloads['old']['metrics']
+        self.workload_manager.delete_workload('old')
+        self.assertEqual(len(store._free_slots), free_before)
+        
+        self.workload_manager.create_workload('new', {'cpu': 1})
+        self.workload_manager.update_workload_metrics('new', {'cpu_usage': 99, 'memory_usage': 9})
+        self.assertEqual(view['cpu_usage'], [10])
+        self.assertEqual(self.workload_manager.workloads['new']['metrics']['cpu_usage'], [99])
+        
+    def test_status_index(self):
+        """测试状态索引与活跃工作负载查询"""
+        requirements = {'cpu': 2, 'memory': 4096}
+        for i in range(10):
+            self.workload_manager.create_workload(f'indexed_{i}', requirements)
+        self.workload_manager.update_workload_status('indexed_0', 'running')
+        self.workload_manager.update_workload_status('indexed_1', 'completed')
+        self.workload_manager.delete_workload('indexed_2')
+        
+        active = self.workload_manager.get_all_active_workloads()
+        self.assertEqual(set(active), {f'indexed_{i}' for i in range(10)} - {'indexed_1', 'indexed_2'})
+        self.assertEqual(set(self.workload_manager.get_workloads_by_status('running')), {'indexed_0'})
+        
+        self.workload_manager.update_workload_state('indexed_3', 'scheduled')
+        self.assertEqual(set(self.workload_manager.get_workloads_by_state('scheduled')), {'indexed_3'})
+        
+    def test_bulk_status_transition(self):
+        """测试批量状态转换"""
+        requirements = {'cpu': 2, 'memory': 4096}
+        for i in range(5):
+            self.workload_manager.create_workload(f'bulk_{i}', requirements)
+        pending = self.workload_manager.get_workloads_by_status('pending')
+        updated = self.workload_manager.bulk_update_status(pending, 'running')
+        
+        self.assertEqual(updated, 5)
+        self.assertEqual(self.workload_manager.get_workloads_by_status('pending'), {})
+        self.assertEqual(len(self.workload_manager.get_workloads_by_status('running')), 5)
+        self.assertEqual(self.workload_manager.workloads['bulk_0']['status'], 'running')
+
+    def test_status_read_only_through_mapping(self):
+        """测试映射接口不能绕过索引修改状态"""
+        self.workload_manager.create_workload('guarded', {'cpu': 1})
+        workload = self.workload_manager.workloads['guarded']
+        with self.assertRaises(TypeError):
+            workload['status'] = 'running'
+        with self.assertRaises(TypeError):
+            workload['state'] = 'running'
+        workload['retries'] = 2
+        
+        self.assertEqual(workload['status'], 'pending')
+        self.assertEqual(workload['retries'], 2)
+        self.assertEqual(set(self.workload_manager.get_workloads_by_status('pending')), {'guarded'})
+
+    def test_concurrent_updates_and_reads(self):
+        """测试监控线程更新状态和指标时并发读取活跃工作负载"""
+        import threading
+        requirements = {'cpu': 2, 'memory': 4096}
+        ids = [f'concurrent_{i}' for i in range(200)]
+        for workload_id in ids:
+            self.workload_manager.create_workload(workload_id, requirements)
+        stop = threading.Event()
+        errors = []
+
+        def writer():
+            n = 0
+            while not stop.is_set():
+                workload_id = ids[n % len(ids)]
+                status = ('running', 'warning', 'pending')[n % 3]
+                self.workload_manager.update_workload_status(workload_id, status)
+                self.workload_manager.update_workload_metrics(
+                    workload_id, {'cpu_usage': 50, 'memory_usage': 50}
+                )
+                n += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                try:
+                    self.workload_manager.get_all_active_workloads()
+                    self.workload_manager.get_workloads_by_status('running')
+                except RuntimeError as e:
+                    errors.append(e)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(errors, [])
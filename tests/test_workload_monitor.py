@@ -0,0 +1,164 @@
+import unittest
+import asyncio
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.workload_manager import WorkloadManager
+from src.workload.workload_monitor import WorkloadMonitor
+
+class CountingAlertManager:
+    def __init__(self):
+        self.checked = 0
+
+    def check_alerts(self, workload_id, metrics):
+        self.checked += 1
+        return []
+
+class NoopAutoScaler:
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+
+    def check_and_scale(self, workload_id, metrics):
+        return False
+
+    def scale_fleet(self, workload_ids, metrics):
+        self.batches.append(list(workload_ids))
+        self.threads.add(threading.current_thread().name)
+        return {}
+
+class FakeCollector:
+    """异步采集函数，记录调用次数和最大并发数"""
+    def __init__(self, delay=0.001):
+        self.delay = delay
+        self.calls = {}
+        self.active = 0
+        self.max_active = 0
+        self.expected = None  # (工作负载数, 每个工作负载的采集次数)
+        self.done = threading.Event()
+        self._reached = 0
+
+    def expect(self, n, k):
+        """n 个工作负载都采集到 k 次后设置 done"""
+        self.expected = (n, k)
+
+    async def __call__(self, workload_id):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        calls = self.calls[workload_id] = self.calls.get(workload_id, 0) + 1
+        if self.expected and calls == self.expected[1]:
+            self._reached += 1
+            if self._reached == self.expected[0]:
+                self.done.set()
+        return {'cpu_usage': 10.0, 'memory_usage': 20.0}
+
+class TestWorkloadMonitor(unittest.TestCase):
+    def _make_monitor(self, manager, collector, **kwargs):
+        return WorkloadMonitor(
+            manager,
+            collector=collector,
+            alert_manager=CountingAlertManager(),
+            autoscaler=NoopAutoScaler(),
+            seed=0,
+            **kwargs
+        )
+
+    def test_start_monitoring_returns_immediately(self):
+        """测试开始监控不阻塞调用方"""
+        manager = WorkloadManager()
+        manager.create_workload('w1', {'cpu': 1}, 'normal')
+        collector = FakeCollector()
+        monitor = self._make_monitor(manager, collector, monitoring_interval=0.05)
+        try:
+            start = time.perf_counter()
+            self.assertTrue(monitor.start_monitoring('w1'))
+            self.assertLess(time.perf_counter() - start, 0.5)
+
+            time.sleep(0.3)
+            self.assertGreater(collector.calls.get('w1', 0), 1)
+            self.assertGreater(len(manager.workloads['w1']['metrics']['cpu_usage']), 1)
+        finally:
+            monitor.stop()
+
+    def test_stop_monitoring(self):
+        """测试停止单个工作负载的监控"""
+        manager = WorkloadManager()
+        for workload_id in ('w1', 'w2'):
+            manager.create_workload(workload_id, {'cpu': 1}, 'normal')
+        collector = FakeCollector()
+        monitor = self._make_monitor(manager, collector, monitoring_interval=0.05)
+        try:
+            monitor.start_monitoring('w1')
+            monitor.start_monitoring('w2')
+            time.sleep(0.2)
+            self.assertTrue(monitor.stop_monitoring('w1'))
+            self.assertFalse(monitor.is_monitoring('w1'))
+            time.sleep(0.1)
+            stopped_calls = collector.calls['w1']
+            w2_calls = collector.calls['w2']
+            time.sleep(0.3)
+            self.assertEqual(collector.calls['w1'], stopped_calls)
+            self.assertGreater(collector.calls['w2'], w2_calls)
+        finally:
+            monitor.stop()
+
+    def test_slow_scaling_does_not_block_loop(self):
+        """测试扩缩容阻塞时采集照常进行，扩缩容在单独线程中批量执行"""
+        class SlowAutoScaler(NoopAutoScaler):
+            def scale_fleet(self, workload_ids, metrics):
+                result = super().scale_fleet(workload_ids, metrics)
+                time.sleep(0.3)
+                return result
+
+        manager = WorkloadManager()
+        for workload_id in ('w1', 'w2'):
+            manager.create_workload(workload_id, {'cpu': 1}, 'normal')
+        collector = FakeCollector()
+        autoscaler = SlowAutoScaler()
+        monitor = WorkloadMonitor(manager, monitoring_interval=0.02, tick_interval=0.02,
+                                  collector=collector, alert_manager=CountingAlertManager(),
+                                  autoscaler=autoscaler, seed=0)
+        try:
+            monitor.start_monitoring('w1')
+            monitor.start_monitoring('w2')
+            time.sleep(0.5)
+            # 扩缩容一次耗时 0.3 秒，期间每个工作负载仍然采集了多次
+            self.assertGreater(collector.calls['w1'], 5)
+            self.assertLessEqual(len(autoscaler.batches), 2)
+            # 执行期间积累的指标合并为下一批
+            self.assertEqual(sorted(autoscaler.batches[-1]), ['w1', 'w2'])
+            self.assertTrue(all(name.startswith('workload-scaler') for name in autoscaler.threads))
+        finally:
+            monitor.stop()
+
+    def test_many_workloads_on_one_loop(self):
+        """测试一万个工作负载在单个事件循环线程上监控，并发受限"""
+        n = 10000
+        manager = WorkloadManager()
+        for i in range(n):
+            manager.create_workload(f'w{i}', {'cpu': 1}, 'normal')
+        collector = FakeCollector()
+        collector.expect(n, 2)
+        monitor = self._make_monitor(
+            manager, collector, monitoring_interval=0.5, max_concurrency=32
+        )
+        threads_before = threading.active_count()
+        try:
+            for i in range(n):
+                monitor.start_monitoring(f'w{i}')
+            # 只新增事件循环线程和扩缩容线程
+            self.assertLessEqual(threading.active_count(), threads_before + 2)
+
+            # 等待每个工作负载都完成两次采集，而不是固定等待时间
+            self.assertTrue(collector.done.wait(timeout=60))
+            self.assertEqual(len(collector.calls), n)
+            self.assertLessEqual(collector.max_active, 32)
+            self.assertGreaterEqual(min(collector.calls.values()), 2)
+        finally:
+            monitor.stop()
+        self.assertEqual(threading.active_count(), threads_before)
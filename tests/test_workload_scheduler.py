@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.workload.workload_manager import WorkloadManager
+from src.workload.workload_scheduler import WorkloadScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+class TestAgingScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.manager = WorkloadManager()
+        self.scheduler = WorkloadScheduler(self.manager, aging_rate=0.1, clock=self.clock)
+
+    def _submit(self, workload_id, priority):
+        self.manager.create_workload(workload_id, {'cpu': 1}, priority)
+        self.scheduler.schedule_workload(workload_id)
+
+    def test_priority_order_without_waiting(self):
+        """测试同一时刻按基础优先级排序"""
+        self._submit('low', 'low')
+        self._submit('high', 'high')
+        self._submit('normal', 'normal')
+        order = [self.scheduler.get_next_workload() for _ in range(3)]
+        self.assertEqual(order, ['high', 'normal', 'low'])
+
+    def test_effective_priority_grows(self):
+        """测试排队时间越长有效优先级越高"""
+        self._submit('w', 'low')
+        self.assertAlmostEqual(self.scheduler.get_effective_priority('w'), 10)
+        self.clock.now += 100
+        self.assertAlmostEqual(self.scheduler.get_effective_priority('w'), 20)
+
+    def test_starvation_bound(self):
+        """测试持续到达高优先级任务时低优先级任务的最长等待时间"""
+        bound = self.scheduler.starvation_bound()
+        self.assertAlmostEqual(bound, 900)
+
+        self._submit('starving', 'low')
+        start = self.clock.now
+        dispatched_at = None
+        # 每秒到达一个高优先级任务并调度一个，队列中始终有新到达的高优先级任务
+        for tick in range(5000):
+            self.clock.now += 1
+            self._submit(f'high_{tick}', 'high')
+            if self.scheduler.get_next_workload() == 'starving':
+                dispatched_at = self.clock.now
+                break
+
+        self.assertIsNotNone(dispatched_at)
+        self.assertLessEqual(dispatched_at - start, bound + 1)
+
+    def test_legacy_mode_unchanged(self):
+        """测试未开启老化时沿用原有优先级计算"""
+        scheduler = WorkloadScheduler(self.manager)
+        self.manager.create_workload('legacy', {'cpu': 1}, 'high')
+        scheduler.schedule_workload('legacy')
+        self.assertAlmostEqual(scheduler.get_effective_priority('legacy'), 100, places=2)
+        self.assertIsNone(scheduler.starvation_bound())
+
+    def test_reschedule_replaces_queued_entry(self):
+        """测试重新调度已排队的工作负载只会出队一次"""
+        self._submit('w', 'low')
+        self._submit('other', 'normal')
+        self.clock.now += 10
+        self.scheduler.schedule_workload('w')
+        order = [self.scheduler.get_next_workload() for _ in range(3)]
+        self.assertEqual(order, ['other', 'w', None])
+        self.assertIsNone(self.scheduler.get_effective_priority('w'))
+
+    def test_defer_invalidates_queued_entry(self):
+        """测试延迟已排队的工作负载时移出优先级堆"""
+        self._submit('w', 'high')
+        self.scheduler.schedule_workload('w', not_before=self.clock.now + 5)
+        self.assertIsNone(self.scheduler.get_next_workload())
+        self.clock.now += 5
+        self.assertEqual(self.scheduler.get_next_workload(), 'w')
+        self.assertIsNone(self.scheduler.get_next_workload())
+
+    def test_rescheduling_compacts_heap(self):
+        """测试反复重新调度时作废条目被清理，堆大小有界"""
+        self._submit('w', 'low')
+        self._submit('other', 'normal')
+        for _ in range(1000):
+            self.clock.now += 1
+            self.scheduler.schedule_workload('w')
+        self.assertLess(len(self.scheduler.priority_queue), 140)
+        order = [self.scheduler.get_next_workload() for _ in range(3)]
+        self.assertEqual(order, ['other', 'w', None])
+        self.assertEqual(self.scheduler._stale, 0)
+
+    def test_retry_uses_manager(self):
+        """测试重试通过工作负载管理器增加重试次数"""
+        self.manager.create_workload('r', {'cpu': 1})
+        self.scheduler.retry_base_delay = 2
+        self.assertEqual(self.scheduler.retry_workload('r'), self.clock.now + 2)
+        self.assertEqual(self.scheduler.retry_workload('r'), self.clock.now + 4)
+        self.assertEqual(self.manager.workloads['r']['retries'], 2)